@@ -0,0 +1,92 @@
+"""Cold-start and warm-path cost of AWS client construction per task, before
+and after commons.aws_clients.
+
+Each task runs in a fresh interpreter. "cold" is the time of the first
+client acquisition in the process, "warm" the per-invocation cost on the
+following calls: a new boto3 client/resource per call like the handlers
+used to build, against the shared registry.
+
+Run from the repository root:  python benchmarks/bench_aws_clients.py
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# (task, lambda, kind, service) the handler used to build per invocation
+TASK_CLIENTS = [
+    ("task05", "api_handler", "resource", "dynamodb"),
+    ("task06", "audit_producer", "resource", "dynamodb"),
+    ("task08", "uuid_generator", "client", "s3"),
+    ("task10", "processor", "resource", "dynamodb"),
+    ("task12", "api_handler", "client", "cognito-idp"),
+]
+
+PROBE = """
+import importlib, json, sys, time
+sys.path.insert(0, {source!r})
+started = time.perf_counter()
+importlib.import_module("lambdas.{lambda_name}.handler")
+import_ms = (time.perf_counter() - started) * 1000
+
+import boto3
+from commons import aws_clients
+
+def legacy():
+    return getattr(boto3, {kind!r})({service!r})
+
+def registry():
+    return getattr(aws_clients, {kind!r})({service!r})
+
+result = {{"import_ms": import_ms}}
+for name, factory in (("registry", registry), ("legacy", legacy)):
+    started = time.perf_counter()
+    factory()
+    result[name + "_cold_ms"] = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    for _ in range({calls}):
+        factory()
+    result[name + "_warm_ms"] = (time.perf_counter() - started) * 1000 / {calls}
+print(json.dumps(result))
+"""
+
+
+def probe(task, lambda_name, kind, service, calls):
+    code = PROBE.format(
+        source=str(ROOT / task / "src"),
+        lambda_name=lambda_name,
+        kind=kind,
+        service=service,
+        calls=calls,
+    )
+    env = {**os.environ, "AWS_DEFAULT_REGION": os.environ.get("AWS_DEFAULT_REGION", "eu-west-1")}
+    output = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=50)
+    args = parser.parse_args()
+
+    print(
+        f"{'task':<8} {'service':<12} {'import':>9} {'cold':>9} "
+        f"{'legacy warm':>12} {'registry warm':>14}"
+    )
+    for task, lambda_name, kind, service in TASK_CLIENTS:
+        result = probe(task, lambda_name, kind, service, args.calls)
+        print(
+            f"{task:<8} {service:<12} {result['import_ms']:7.1f}ms "
+            f"{result['registry_cold_ms']:7.1f}ms {result['legacy_warm_ms']:10.2f}ms "
+            f"{result['registry_warm_ms']:12.4f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
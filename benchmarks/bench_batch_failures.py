@@ -0,0 +1,134 @@
+"""Retry volume of an SQS consumer with whole-batch retries against partial
+batch responses (batchItemFailures), under injected record failures.
+
+A simulated queue feeds task04's sqs_handler in batches. Every delivery of
+a record fails with probability --failure-rate (transient failures, as
+with throttled downstream calls). Each failed delivery makes the message
+visible again until its receive count exceeds --max-receive, after which it
+goes to the dead-letter queue. Two ways of returning failures are compared:
+
+    whole-batch  any failed record fails the invocation, so every record
+                 of the batch is delivered again (the behaviour before
+                 ReportBatchItemFailures)
+    partial      only the records listed in batchItemFailures come back
+
+The report counts invocations, record deliveries, redeliveries, duplicate
+processing of records that had already succeeded, and dead-lettered
+messages.
+
+Run from the repository root:
+    python benchmarks/bench_batch_failures.py --messages 10000
+"""
+import argparse
+import os
+import random
+import time
+from collections import deque
+
+import events
+import loadgen
+
+
+class FlakyRecords:
+    """Wraps handle_record, failing each delivery with a seeded probability"""
+
+    def __init__(self, handle_record, failure_rate, seed):
+        self.handle_record = handle_record
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.succeeded = {}
+
+    def __call__(self, record, context):
+        if self.rng.random() < self.failure_rate:
+            raise RuntimeError("injected failure")
+        self.handle_record(record, context)
+        message_id = record["messageId"]
+        self.succeeded[message_id] = self.succeeded.get(message_id, 0) + 1
+
+
+def simulate(module, mode, messages, batch_size, failure_rate, max_receive, seed):
+    handler = module.HANDLER
+    flaky = FlakyRecords(type(handler).handle_record.__get__(handler), failure_rate, seed)
+    handler.handle_record = flaky
+    context = loadgen.LambdaContext("sqs_handler")
+    queue = deque(events.sqs_batch(batch_size=messages)["Records"])
+    stats = {"invocations": 0, "deliveries": 0, "dead_lettered": 0}
+    started = time.perf_counter()
+    try:
+        while queue:
+            batch = [queue.popleft() for _ in range(min(batch_size, len(queue)))]
+            response = module.lambda_handler({"Records": batch}, context)
+            stats["invocations"] += 1
+            stats["deliveries"] += len(batch)
+            failed = {failure["itemIdentifier"] for failure in response["batchItemFailures"]}
+            if mode == "whole-batch" and failed:
+                failed = {record["messageId"] for record in batch}
+            for record in batch:
+                if record["messageId"] not in failed:
+                    continue
+                receive_count = int(record["attributes"]["ApproximateReceiveCount"])
+                if receive_count >= max_receive:
+                    stats["dead_lettered"] += 1
+                    continue
+                record["attributes"]["ApproximateReceiveCount"] = str(receive_count + 1)
+                queue.append(record)
+    finally:
+        del handler.handle_record
+    stats["elapsed_s"] = time.perf_counter() - started
+    stats["redeliveries"] = stats["deliveries"] - messages
+    stats["duplicate_successes"] = sum(count - 1 for count in flaky.succeeded.values())
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--messages", type=int, default=10_000)
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument(
+        "--failure-rate", type=float, action="append", help="default 0.01, 0.05, 0.1, 0.2"
+    )
+    parser.add_argument("--max-receive", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_DEFAULT_REGION", events.REGION)
+    os.environ["log_level"] = "CRITICAL"
+    os.environ["stage_metrics"] = "off"
+    module = loadgen.load_handler("task04", "sqs_handler")
+
+    print(
+        f"{args.messages} messages, batch size {args.batch_size}, "
+        f"maxReceiveCount {args.max_receive}"
+    )
+    header = (
+        f"{'failures':>8} {'mode':<12} {'invocations':>11} {'deliveries':>10} "
+        f"{'redelivered':>11} {'duplicates':>10} {'dead':>6} {'time':>8}"
+    )
+    print(header)
+    for failure_rate in args.failure_rate or [0.01, 0.05, 0.1, 0.2]:
+        results = {}
+        for mode in ("whole-batch", "partial"):
+            results[mode] = stats = simulate(
+                module,
+                mode,
+                args.messages,
+                args.batch_size,
+                failure_rate,
+                args.max_receive,
+                args.seed,
+            )
+            print(
+                f"{failure_rate:>8.0%} {mode:<12} {stats['invocations']:>11} "
+                f"{stats['deliveries']:>10} {stats['redeliveries']:>11} "
+                f"{stats['duplicate_successes']:>10} {stats['dead_lettered']:>6} "
+                f"{stats['elapsed_s']:>7.2f}s"
+            )
+        whole, partial = results["whole-batch"]["redeliveries"], results["partial"]["redeliveries"]
+        if whole:
+            print(f"{'':>8} redeliveries -{1 - partial / whole:.0%}")
+
+
+if __name__ == "__main__":
+    main()
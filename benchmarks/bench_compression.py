@@ -0,0 +1,84 @@
+"""Response bytes and end-to-end encode time (serialize, compress, base64)
+of GET /reservations pages and an hourly forecast, uncompressed and with
+each coding commons.http_response negotiates.
+
+Run from the repository root:  python benchmarks/bench_compression.py
+"""
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# task12's test helpers, which import its commons and lambdas from src
+sys.path.insert(0, str(ROOT / "task12"))
+
+from tests.test_commons import HTTP_RESPONSE, SERIALIZER  # noqa: E402
+
+
+def reservations(count):
+    return {
+        "reservations": [
+            {
+                "tableNumber": i % 50 + 1,
+                "clientName": f"Client {i:06d}",
+                "phoneNumber": f"+48 600 {i % 1000:03d} {i % 997:03d}",
+                "date": f"2024-05-{i % 28 + 1:02d}",
+                "slotTimeStart": f"{12 + i % 8}:00",
+                "slotTimeEnd": f"{14 + i % 8}:00",
+            }
+            for i in range(count)
+        ]
+    }
+
+
+def forecast(days):
+    hours = days * 24
+    return {
+        "latitude": 52.52,
+        "longitude": 13.419998,
+        "generationtime_ms": 0.05,
+        "timezone": "GMT",
+        "current": {"time": "2024-05-01T12:00", "temperature_2m": 18.2, "wind_speed_10m": 9.7},
+        "hourly": {
+            "time": [f"2024-05-{1 + h // 24:02d}T{h % 24:02d}:00" for h in range(hours)],
+            "temperature_2m": [round(10 + (h % 24) * 0.43 + (h % 7) * 0.1, 1) for h in range(hours)],
+            "relative_humidity_2m": [55 + (h * 7) % 40 for h in range(hours)],
+            "wind_speed_10m": [round(4 + (h * 13) % 90 / 10, 1) for h in range(hours)],
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    builder = HTTP_RESPONSE.ResponseBuilder()
+    payloads = {
+        "reservations x10": reservations(10),
+        "reservations x1000": reservations(1000),
+        "reservations x10000": reservations(10_000),
+        "forecast 7 days": forecast(7),
+    }
+    codings = ("identity",) + builder.encodings
+    print(f"best of {args.repeat}; bytes are the response body as returned to Lambda")
+    print(f"{'payload':<20} {'coding':<9} {'bytes':>10} {'ratio':>7} {'encode':>10}")
+    for name, payload in payloads.items():
+        plain = None
+        for coding in codings:
+
+            def respond():
+                response = builder.build(200, SERIALIZER.dumps(payload))
+                return builder.compress(response, None if coding == "identity" else coding)
+
+            size = len(respond()["body"])
+            plain = plain or size
+            best = min(timeit.repeat(respond, number=1, repeat=args.repeat))
+            print(
+                f"{name:<20} {coding:<9} {size:>10} {size / plain:>6.0%} {best * 1000:>8.3f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
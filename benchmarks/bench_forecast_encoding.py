@@ -0,0 +1,129 @@
+"""DynamoDB item size and write units of task10's stored forecasts: the
+previous item (hourly lists of Decimal and time strings) against
+commons.forecast_store's packed columns, without and with zlib, plus
+the encode and decode time of each.
+
+Payloads are open-meteo shaped forecasts with seeded, smoothly varying
+values at open-meteo's precisions (0.1 °C, whole %, 0.1 km/h, 0.1 mm,
+0.1 hPa) for 7 and 16 days, with the one hourly variable the processor
+stores today and with six. Sizes follow DynamoDB's item size rules (see
+task12/tests/local_dynamodb.py); a write unit covers 1 KB.
+
+Run from the repository root:
+    python benchmarks/bench_forecast_encoding.py
+"""
+import argparse
+import json
+import math
+import random
+import sys
+import timeit
+import uuid
+from decimal import Decimal
+from pathlib import Path
+
+import local_aws
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT / "task10" / "src"))
+
+from commons import forecast_store  # noqa: E402
+
+VARIABLES = {
+    "temperature_2m": ("°C", 1, 12, 8),
+    "relative_humidity_2m": ("%", 0, 65, 25),
+    "wind_speed_10m": ("km/h", 1, 11, 9),
+    "precipitation": ("mm", 1, 0, 1.5),
+    "pressure_msl": ("hPa", 1, 1013, 9),
+    "cloud_cover": ("%", 0, 50, 50),
+}
+
+
+def forecast(days, variables, seed=0):
+    rng = random.Random(seed)
+    hours = days * 24
+    hourly = {"time": [f"2024-05-{1 + h // 24:02d}T{h % 24:02d}:00" for h in range(hours)]}
+    for name in variables:
+        _, decimals, mean, spread = VARIABLES[name]
+        phase = rng.uniform(0, 2 * math.pi)
+        values = []
+        drift = 0.0
+        for h in range(hours):
+            drift += rng.gauss(0, spread / 20)
+            value = mean + spread * math.sin(2 * math.pi * h / 24 + phase) / 2 + drift
+            if name == "precipitation":
+                value = max(0.0, value)
+            if name in ("relative_humidity_2m", "cloud_cover"):
+                value = min(100, max(0, value))
+            values.append(round(value, decimals) if decimals else int(round(value)))
+        hourly[name] = values
+    return {
+        "latitude": 52.52,
+        "longitude": 13.419998,
+        "generationtime_ms": 0.0560283660888672,
+        "utc_offset_seconds": 0,
+        "timezone": "GMT",
+        "timezone_abbreviation": "GMT",
+        "elevation": 38.0,
+        "hourly_units": {"time": "iso8601", **{n: VARIABLES[n][0] for n in variables}},
+        "hourly": hourly,
+    }
+
+
+def legacy_item(weather, variables):
+    """The item task10's processor wrote before the columnar encoding"""
+    record = {
+        "id": str(uuid.uuid4()),
+        "forecast": {
+            **{field: weather[field] for field in forecast_store.FORECAST_FIELDS},
+            "hourly": {name: weather["hourly"][name] for name in (*variables, "time")},
+            "hourly_units": {
+                name: weather["hourly_units"][name] for name in (*variables, "time")
+            },
+        },
+    }
+    return json.loads(json.dumps(record), parse_float=Decimal)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    item_size = local_aws.local_dynamodb.item_size
+    payloads = {
+        "7 days, 1 variable": (7, ("temperature_2m",)),
+        "7 days, 6 variables": (7, tuple(VARIABLES)),
+        "16 days, 6 variables": (16, tuple(VARIABLES)),
+    }
+    print(f"best of {args.repeat}; WCU = write units per put")
+    print(f"{'payload':<22} {'encoding':<10} {'bytes':>8} {'WCU':>4} {'encode':>10} {'decode':>10}")
+    for name, (days, variables) in payloads.items():
+        weather = forecast(days, variables)
+        encodings = {
+            "lists": (
+                lambda: legacy_item(weather, variables),
+                lambda item: forecast_store.decode_forecast(item["forecast"]),
+            ),
+        }
+        for label, compress in (("packed", False), ("packed+z", True)):
+            repository = forecast_store.ForecastRepository(None, variables, compress)
+            encodings[label] = (
+                lambda repository=repository: repository.item(weather),
+                lambda item: forecast_store.decode_forecast(item["forecast"]),
+            )
+        for label, (encode, decode) in encodings.items():
+            item = encode()
+            decoded = decode(item)
+            assert decoded["hourly"] == weather["hourly"], (name, label)
+            size = item_size(item)
+            encode_ms = min(timeit.repeat(encode, number=1, repeat=args.repeat)) * 1000
+            decode_ms = min(timeit.repeat(lambda: decode(item), number=1, repeat=args.repeat)) * 1000
+            print(
+                f"{name:<22} {label:<10} {size:>8} {math.ceil(size / 1024):>4} "
+                f"{encode_ms:>8.3f} ms {decode_ms:>7.3f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Upstream calls and DynamoDB units of task10's time-window reads: open-meteo
+on every request (the live path) against HourlyRepository.window, which
+answers from the WeatherHourly day buckets and fetches only the missing
+or stale ones.
+
+The replay runs for --days days with one read every --interval seconds.
+Each read asks for 1 to 48 hours starting up to 4 days ahead. The
+processor's live path keeps storing the forecast every 5 minutes, and
+model runs change it as in bench_forecast_writes.py. Containers are
+recycled every --container-minutes, which drops their in-memory
+windows.
+
+Run from the repository root:
+    python benchmarks/bench_forecast_reads.py
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import bench_forecast_writes as replay
+import local_aws
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT / "task10" / "src"))
+
+from commons import forecast_store  # noqa: E402
+
+HOUR = 3600
+EPOCH_START = int((replay.START - forecast_store.EPOCH).total_seconds())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=1)
+    parser.add_argument("--interval", type=int, default=10, help="seconds between reads")
+    parser.add_argument("--container-minutes", type=int, default=60)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    table = local_aws.local_dynamodb.LocalTable(
+        "WeatherHourly", hash_key="locationId", range_key="bucketStart"
+    )
+    clock = {"now": EPOCH_START}
+    upstream = []
+
+    def fetch(first, last):
+        upstream.append((first, last))
+        weather = replay.answer((clock["now"] - EPOCH_START) // 60)
+        hourly = weather["hourly"]
+        keep = [
+            i for i, text in enumerate(hourly["time"])
+            if first <= forecast_store.local_seconds(text) <= last
+        ]
+        weather["hourly"] = {name: [column[i] for i in keep] for name, column in hourly.items()}
+        return weather
+
+    def new_repository():
+        return forecast_store.HourlyRepository(table, clock=lambda: clock["now"])
+
+    processor = reader = None
+    reads = cached = queries = 0
+    read_units = write_units = seconds = 0.0
+    for second in range(0, args.days * 86400, args.interval):
+        clock["now"] = EPOCH_START + second
+        if second % (args.container_minutes * 60) == 0:
+            processor, reader = new_repository(), new_repository()
+        if second % 300 == 0:
+            processor.save(replay.answer(second // 60), replay.LOCATION)
+        now_hour = clock["now"] - clock["now"] % HOUR
+        start = now_hour + rng.randrange(0, 4 * 24) * HOUR
+        end = start + rng.randrange(0, 48) * HOUR
+        # only what the read costs, not the processor's writes
+        before = table.consumed_read_units, table.consumed_write_units, len(table.calls)
+        started = time.perf_counter()
+        window = reader.window(replay.LOCATION, start, end, fetch)
+        seconds += time.perf_counter() - started
+        read_units += table.consumed_read_units - before[0]
+        write_units += table.consumed_write_units - before[1]
+        queries += table.calls[before[2]:].count("Query")
+        assert len(window.forecast["hourly"]["time"]) == (end - start) // HOUR + 1
+        reads += 1
+        cached += window.cached
+
+    print(
+        f"{reads} window reads over {args.days} days, one every {args.interval} s, "
+        f"container recycled every {args.container_minutes} min"
+    )
+    print(f"open-meteo calls: live path {reads}, window reads {len(upstream)} "
+          f"({100 * (1 - len(upstream) / reads):.1f}% served without upstream)")
+    print(f"windows served from memory: {cached}, Queries: {queries}")
+    print(f"DynamoDB units of the reads: {read_units:.1f} RCU, {write_units:.0f} WCU")
+    print(f"mean local time per window read: {seconds / reads * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Writes of task10's processor over a replay of open-meteo answers: the
+previous uuid item per call against commons.forecast_store's fingerprinted
+latest item (Weather) and day buckets (WeatherHourly).
+
+The replay polls one location every --interval minutes for --days days;
+each answer is the 7 day forecast from local midnight, as open-meteo
+sends it. Values change only when a model run lands: a short range run
+every 3 hours updating the next 48 hours, and a global run every 6 hours
+updating all of them. The Lambda container is recycled every
+--container-minutes, so the cold reads of stored fingerprints are counted
+too. Reading a day back shows the other side: a Scan of every uuid item
+before, one Query now.
+
+Run from the repository root:
+    python benchmarks/bench_forecast_writes.py
+"""
+import argparse
+import math
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from boto3.dynamodb.conditions import Key
+
+import local_aws
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT / "task10" / "src"))
+
+from commons import forecast_store  # noqa: E402
+
+START = datetime(2024, 5, 1)
+LOCATION = forecast_store.location_key(52.52, 13.41)
+SHORT_RUN_HOURS = 3
+SHORT_RUN_RANGE_HOURS = 48
+GLOBAL_RUN_HOURS = 6
+FORECAST_DAYS = 7
+
+
+def temperature(hour, run):
+    """Temperature of an hour (since START) as forecast by a model run"""
+    base = 12 + 6 * math.sin(2 * math.pi * (hour - 9) / 24) + 3 * math.sin(hour / 50)
+    return round(base + random.Random(run * 100_003 + hour).gauss(0, 0.6), 1)
+
+
+def answer(minute):
+    """open-meteo's answer at a minute of the replay"""
+    now = minute // 60
+    global_run = now - now % GLOBAL_RUN_HOURS
+    short_run = now - now % SHORT_RUN_HOURS
+    first = now - now % 24
+    hours = range(first, first + FORECAST_DAYS * 24)
+    values = []
+    for hour in hours:
+        if short_run > global_run and hour < short_run + SHORT_RUN_RANGE_HOURS:
+            values.append(temperature(hour, 2 * short_run + 1))
+        else:
+            values.append(temperature(hour, 2 * global_run))
+    return {
+        "latitude": 52.52,
+        "longitude": 13.419998,
+        "generationtime_ms": random.uniform(0.02, 0.09),
+        "utc_offset_seconds": 0,
+        "timezone": "GMT",
+        "timezone_abbreviation": "GMT",
+        "elevation": 38.0,
+        "hourly_units": {"time": "iso8601", "temperature_2m": "°C"},
+        "hourly": {
+            "time": [(START + timedelta(hours=h)).isoformat(timespec="minutes") for h in hours],
+            "temperature_2m": values,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=3)
+    parser.add_argument("--interval", type=int, default=5, help="minutes between calls")
+    parser.add_argument("--container-minutes", type=int, default=60)
+    args = parser.parse_args()
+
+    dynamodb = local_aws.local_dynamodb
+    uuid_table = dynamodb.LocalTable("Weather", hash_key="id")
+    latest_table = dynamodb.LocalTable("Weather", hash_key="id")
+    hourly_table = dynamodb.LocalTable("WeatherHourly", hash_key="locationId", range_key="bucketStart")
+    uuid_items = forecast_store.ForecastRepository(uuid_table)
+
+    minutes = range(0, args.days * 24 * 60, args.interval)
+    latest = hourly = None
+    for minute in minutes:
+        if minute % args.container_minutes < args.interval:
+            latest = forecast_store.ForecastRepository(latest_table)
+            hourly = forecast_store.HourlyRepository(hourly_table, clock=lambda: minute * 60)
+        weather = answer(minute)
+        uuid_items.put(weather)
+        latest.save(weather, LOCATION)
+        hourly.save(weather, LOCATION)
+
+    print(
+        f"{len(minutes)} calls over {args.days} days, one every {args.interval} min, "
+        f"container recycled every {args.container_minutes} min"
+    )
+    print(f"{'items':<22} {'puts':>6} {'WCU':>7} {'RCU':>7} {'stored':>7}")
+    for name, table in (
+        ("uuid per call", uuid_table),
+        ("latest (Weather)", latest_table),
+        ("day buckets (Hourly)", hourly_table),
+    ):
+        print(
+            f"{name:<22} {table.calls.count('PutItem'):>6} {table.consumed_write_units:>7.0f} "
+            f"{table.consumed_read_units:>7.1f} {len(table._items):>7}"
+        )
+
+    day = int((START + timedelta(days=1) - forecast_store.EPOCH).total_seconds())
+    for table in (uuid_table, hourly_table):
+        table.reset_metrics()
+    # a uuid key says nothing about time: every item is read, filter or not
+    query = {}
+    while True:
+        response = uuid_table.scan(**query)
+        if "LastEvaluatedKey" not in response:
+            break
+        query["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+    hourly_table.query(
+        KeyConditionExpression=Key("locationId").eq(LOCATION) & Key("bucketStart").eq(day)
+    )
+    print(
+        f"reading back one day: Scan of the uuid items {uuid_table.consumed_read_units:.1f} RCU, "
+        f"Query of the buckets {hourly_table.consumed_read_units:.1f} RCU"
+    )
+
+
+if __name__ == "__main__":
+    main()
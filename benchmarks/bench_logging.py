@@ -0,0 +1,99 @@
+"""Per-invocation logging cost for a 100 KB event at INFO level: the previous
+log_helper (text StreamHandler, f-string debug lines) against the buffered
+JSON logger, for successful and failing invocations. Output goes to
+os.devnull.
+
+Run from the repository root:  python benchmarks/bench_logging.py
+"""
+import argparse
+import logging
+import os
+import sys
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# task12's test helpers, which import its commons and lambdas from src
+sys.path.insert(0, str(ROOT / "task12"))
+
+from tests.test_commons import ABSTRACT_LAMBDA, COMMONS, LOG_HELPER  # noqa: E402
+
+
+def event_of_size(size):
+    records = []
+    while len(str(records)) < size:
+        records.append({"id": len(records), "name": f"Client {len(records)}", "note": "x" * 64})
+    return {"httpMethod": "POST", "path": "/reservations", "body": records}
+
+
+def legacy_logger(stream):
+    logger = logging.getLogger("bench_logging.legacy")
+    logger.propagate = False
+    handler = logging.StreamHandler(stream=stream)
+    handler.setFormatter(
+        logging.Formatter("%(asctime)s - %(levelname)s - %(name)s - %(message)s")
+    )
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+class NoopLambda(ABSTRACT_LAMBDA.AbstractLambda):
+    emit_stage_metrics = False
+
+    def __init__(self, fail=False):
+        self.fail = fail
+
+    def validate_request(self, event) -> dict:
+        pass
+
+    def handle_request(self, event, context):
+        if self.fail:
+            raise COMMONS.ApplicationException(code=400, content="Bad request")
+        return {"statusCode": 200}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--event-kb", type=int, default=100)
+    parser.add_argument("--invocations", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    event = event_of_size(args.event_kb * 1024)
+    with open(os.devnull, "w") as devnull:
+        legacy = legacy_logger(devnull)
+        LOG_HELPER.console_handler.stream = devnull
+
+        def legacy_success():
+            legacy.debug(f"Request: {event}")
+            response = {"statusCode": 200}
+            legacy.debug(f"Response: {response}")
+
+        def legacy_failure():
+            legacy.debug(f"Request: {event}")
+            legacy.error(f"Error occurred; Event: {event}; Error: Bad request")
+
+        succeeding = NoopLambda()
+        failing = NoopLambda(fail=True)
+
+        def structured_failure():
+            try:
+                failing.lambda_handler(event, None)
+            except COMMONS.ApplicationException:
+                pass
+
+        candidates = {
+            "legacy success": legacy_success,
+            "structured success": lambda: succeeding.lambda_handler(event, None),
+            "legacy failure": legacy_failure,
+            "structured failure": structured_failure,
+        }
+        print(f"{len(str(event)) // 1024} KB event, INFO level, best of {args.repeat}")
+        for name, invoke in candidates.items():
+            best = min(timeit.repeat(invoke, number=args.invocations, repeat=args.repeat))
+            print(f"{name:<20} {best / args.invocations * 1e6:10.1f} us/invocation")
+
+
+if __name__ == "__main__":
+    main()
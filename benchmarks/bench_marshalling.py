@@ -0,0 +1,81 @@
+"""Marshals 10k reservations to and from DynamoDB attribute values, the way
+the resource layer does (json round trip plus TypeSerializer /
+TypeDeserializer) and with the generated commons.models functions.
+
+Run from the repository root:  python benchmarks/bench_marshalling.py
+"""
+import argparse
+import json
+import sys
+import timeit
+from decimal import Decimal
+from pathlib import Path
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+ROOT = Path(__file__).resolve().parent.parent
+# task12's test helpers, which import its commons and lambdas from src
+sys.path.insert(0, str(ROOT / "task12"))
+
+from tests.test_commons import MODELS  # noqa: E402
+
+
+def bodies(count):
+    return [
+        {
+            "id": f"reservation-{i}",
+            "tableNumber": i % 50 + 1,
+            "clientName": f"Client {i}",
+            "phoneNumber": "123-456-789",
+            "date": "2024-05-01",
+            "slotTimeStart": "13:00",
+            "slotTimeEnd": "15:00",
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    requests = bodies(args.items)
+    serializer = TypeSerializer()
+    deserializer = TypeDeserializer()
+
+    def resource_to_items():
+        return [
+            {k: serializer.serialize(v) for k, v in json.loads(json.dumps(body)).items()}
+            for body in requests
+        ]
+
+    def resource_from_items():
+        return [{k: deserializer.deserialize(v) for k, v in item.items()} for item in items]
+
+    def models_to_items():
+        return [MODELS.Reservation.from_request(body).to_item() for body in requests]
+
+    def models_from_items():
+        return [MODELS.Reservation.from_item(item).to_dict() for item in items]
+
+    items = models_to_items()
+    assert items == [
+        {k: serializer.serialize(Decimal(v) if isinstance(v, int) else v) for k, v in body.items()}
+        for body in requests
+    ]
+
+    print(f"{args.items} reservations, best of {args.repeat}")
+    for name, marshal in (
+        ("resource to_item", resource_to_items),
+        ("models to_item", models_to_items),
+        ("resource from_item", resource_from_items),
+        ("models from_item", models_from_items),
+    ):
+        best = min(timeit.repeat(marshal, number=1, repeat=args.repeat))
+        print(f"{name:<20} {best * 1000:8.2f} ms {args.items / best:12,.0f} items/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Per-invocation overhead of the AbstractLambda middleware pipeline: a bare
+handle_request call against lambda_handler with an empty chain and with five
+pass-through middlewares, EMF line included (written to os.devnull).
+
+Run from the repository root:  python benchmarks/bench_middleware.py
+"""
+import argparse
+import os
+import sys
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# task12's test helpers, which import its commons and lambdas from src
+sys.path.insert(0, str(ROOT / "task12"))
+
+from tests.test_commons import ABSTRACT_LAMBDA  # noqa: E402
+
+
+class PassThrough(ABSTRACT_LAMBDA.Middleware):
+    def before(self, event, context):
+        return None
+
+    def after(self, event, context, response):
+        return response
+
+
+class NoopLambda(ABSTRACT_LAMBDA.AbstractLambda):
+    def validate_request(self, event) -> dict:
+        pass
+
+    def handle_request(self, event, context):
+        return {"statusCode": 200}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--invocations", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    event = {"httpMethod": "GET", "path": "/tables"}
+    with open(os.devnull, "w") as devnull:
+        empty = NoopLambda()
+        empty.metrics_stream = devnull
+        chained = NoopLambda()
+        chained.metrics_stream = devnull
+        chained.middlewares = tuple(PassThrough() for _ in range(5))
+        candidates = {
+            "handle_request": lambda: empty.handle_request(event, None),
+            "empty chain": lambda: empty.lambda_handler(event, None),
+            "5 middlewares": lambda: chained.lambda_handler(event, None),
+        }
+        print(f"{args.invocations} invocations, best of {args.repeat}")
+        baseline = None
+        for name, invoke in candidates.items():
+            best = min(timeit.repeat(invoke, number=args.invocations, repeat=args.repeat))
+            per_call = best / args.invocations * 1e6
+            baseline = per_call if baseline is None else baseline
+            print(f"{name:<16} {per_call:8.2f} us/invocation  +{per_call - baseline:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Compares the reservation conflict check strategies: full-table scans, the
+tableNumber-date index query, and the conditional occupancy update used by
+create_reservation.
+
+Run from the repository root:  python benchmarks/bench_reservation_lookup.py
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+from boto3.dynamodb.conditions import Attr, Key
+
+ROOT = Path(__file__).resolve().parent.parent
+# task12's test helpers, which import its commons and lambdas from src
+sys.path.insert(0, str(ROOT / "task12"))
+
+from tests.test_api_handler import LAMBDA_HANDLER, local_handler  # noqa: E402
+
+TABLES_COUNT = 50
+DAYS_COUNT = 365
+
+
+def reservation(i):
+    day = (i // TABLES_COUNT) % DAYS_COUNT
+    return {
+        "id": f"r{i}",
+        "tableNumber": i % TABLES_COUNT + 1,
+        "clientName": "John Doe",
+        "phoneNumber": "123-456-789",
+        "date": f"2024-{day // 28 % 12 + 1:02d}-{day % 28 + 1:02d}",
+        "slotTimeStart": f"{8 + i % 7:02d}:00",
+        "slotTimeEnd": f"{9 + i % 7:02d}:00",
+    }
+
+
+def populate(handler, reservations_count):
+    handler.tables_table.load(
+        {"id": n, "number": n, "places": 4, "isVip": False, "minOrder": 0}
+        for n in range(1, TABLES_COUNT + 1)
+    )
+    reservations = [reservation(i) for i in range(reservations_count)]
+    handler.reservations_table.load(reservations)
+    occupancy = {}
+    for item in reservations:
+        slots = LAMBDA_HANDLER.occupancy_slots(item["slotTimeStart"], item["slotTimeEnd"])
+        occupancy.setdefault((item["tableNumber"], item["date"]), set()).update(slots)
+    handler.occupancy_table.load(
+        {"tableNumber": number, "date": date, "slots": slots}
+        for (number, date), slots in occupancy.items()
+    )
+
+
+def read_all(operation, **kwargs):
+    while True:
+        response = operation(**kwargs)
+        yield from response["Items"]
+        if "LastEvaluatedKey" not in response:
+            return
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def overlaps(reservations, slot_start, slot_end):
+    return any(
+        slot_start < res["slotTimeEnd"] and slot_end > res["slotTimeStart"]
+        for res in reservations
+    )
+
+
+def scan_check(handler, table_number, date, slot_start, slot_end):
+    """The original check, following LastEvaluatedKey like a complete scan
+    must (the original handler read only the first 1 MB page)"""
+    tables = list(read_all(handler.tables_table.scan))
+    if table_number not in [table["number"] for table in tables]:
+        return False
+    reservations = read_all(
+        handler.reservations_table.scan,
+        FilterExpression=Attr("tableNumber").eq(table_number) & Attr("date").eq(date),
+    )
+    return not overlaps(reservations, slot_start, slot_end)
+
+
+def index_check(handler, table_number, date, slot_start, slot_end):
+    if not handler._table_number_exists(table_number):
+        return False
+    reservations = read_all(
+        handler.reservations_table.query,
+        IndexName=LAMBDA_HANDLER.RESERVATIONS_TABLE_DATE_INDEX,
+        KeyConditionExpression=Key("tableNumber").eq(table_number) & Key("date").eq(date),
+        ProjectionExpression="slotTimeStart, slotTimeEnd",
+    )
+    return not overlaps(reservations, slot_start, slot_end)
+
+
+def occupancy_check(handler, table_number, date, slot_start, slot_end):
+    if not handler._table_number_exists(table_number):
+        return False
+    slots = LAMBDA_HANDLER.occupancy_slots(slot_start, slot_end)
+    return handler._reserve_slots(table_number, date, slots)
+
+
+def measure(name, check, handler, requests):
+    tables = (handler.tables_table, handler.reservations_table, handler.occupancy_table)
+    for table in tables:
+        table.reset_metrics()
+    started = time.perf_counter()
+    for request in requests:
+        check(handler, *request)
+    elapsed = time.perf_counter() - started
+    read_units = sum(table.consumed_read_units for table in tables)
+    write_units = sum(table.consumed_write_units for table in tables)
+    print(
+        f"{name:<10} {elapsed / len(requests) * 1000:10.3f} ms/request "
+        f"{read_units / len(requests):10.1f} RCU/request "
+        f"{write_units / len(requests):6.1f} WCU/request"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reservations", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    handler = local_handler()
+    populate(handler, args.reservations)
+
+    rnd = random.Random(42)
+    requests = []
+    for _ in range(args.requests):
+        start = rnd.randint(8, 20)
+        requests.append(
+            (
+                rnd.randint(1, TABLES_COUNT),
+                f"2024-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}",
+                f"{start:02d}:00",
+                f"{start + 1:02d}:00",
+            )
+        )
+    print(f"{args.reservations} reservations, {args.requests} booking checks")
+    measure("scan", scan_check, handler, requests)
+    measure("index", index_check, handler, requests)
+    measure("occupancy", occupancy_check, handler, requests)
+
+
+if __name__ == "__main__":
+    main()
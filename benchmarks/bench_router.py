@@ -0,0 +1,100 @@
+"""Measures dispatch cost with 60 routes: the previous per-request dict of
+bound methods against the compiled commons.router trie.
+
+Run from the repository root:  python benchmarks/bench_router.py
+"""
+import argparse
+import random
+import sys
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# task12's test helpers, which import its commons and lambdas from src
+sys.path.insert(0, str(ROOT / "task12"))
+
+from tests.test_commons import ROUTER  # noqa: E402
+
+RESOURCES = [
+    "tables",
+    "reservations",
+    "users",
+    "orders",
+    "menus",
+    "rooms",
+    "shifts",
+    "invoices",
+    "payments",
+    "reviews",
+]
+
+
+def route_declarations():
+    routes = []
+    for resource in RESOURCES:
+        routes.append(("GET", f"/{resource}"))
+        routes.append(("POST", f"/{resource}"))
+        routes.append(("GET", f"/{resource}/{{id}}"))
+        routes.append(("PUT", f"/{resource}/{{id}}"))
+        routes.append(("DELETE", f"/{resource}/{{id}}"))
+        routes.append(("GET", f"/{resource}/{{id}}/history"))
+    return routes
+
+
+class LegacyHandler:
+    """Rebuilds the route dict on every request like the old handle_request"""
+
+    def __init__(self, routes):
+        self.route_keys = routes
+
+    def endpoint(self, event):
+        return event
+
+    def handle_request(self, event):
+        routes = {route_key: self.endpoint for route_key in self.route_keys}
+        handler = routes.get((event["httpMethod"], event.get("resource")))
+        return handler(event)
+
+
+class RoutedHandler:
+    router = ROUTER.Router()
+
+    def endpoint(self, event, **params):
+        return event
+
+
+for _method, _path in route_declarations():
+    RoutedHandler.router.add(_method, _path, RoutedHandler.endpoint)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=10_000)
+    args = parser.parse_args()
+
+    routes = route_declarations()
+    rnd = random.Random(1)
+    events = []
+    for _ in range(args.requests):
+        method, resource = rnd.choice(routes)
+        events.append(
+            {
+                "httpMethod": method,
+                "resource": resource,
+                "path": resource.replace("{id}", str(rnd.randint(1, 999))),
+            }
+        )
+
+    legacy = LegacyHandler(routes)
+    routed = RoutedHandler()
+    print(f"{len(routes)} routes, {args.requests} requests")
+    for name, dispatch in (
+        ("dict per request", lambda: [legacy.handle_request(e) for e in events]),
+        ("compiled trie", lambda: [routed.router.dispatch(routed, e) for e in events]),
+    ):
+        best = min(timeit.repeat(dispatch, number=1, repeat=5))
+        print(f"{name:<18} {best / args.requests * 1e6:8.2f} us/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Serializes 10k reservation items with the previous DecimalEncoder and with
+commons.serializer.
+
+Run from the repository root:  python benchmarks/bench_serializer.py
+"""
+import argparse
+import json
+import sys
+import timeit
+from decimal import Decimal
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# task12's test helpers, which import its commons and lambdas from src
+sys.path.insert(0, str(ROOT / "task12"))
+
+from tests.test_commons import SERIALIZER  # noqa: E402
+
+
+class DecimalEncoder(json.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return float(obj)
+        return super().default(obj)
+
+
+def reservations(count):
+    return {
+        "reservations": [
+            {
+                "tableNumber": Decimal(i % 50 + 1),
+                "clientName": f"Client {i}",
+                "phoneNumber": "123-456-789",
+                "date": "2024-05-01",
+                "slotTimeStart": "13:00",
+                "slotTimeEnd": "15:00",
+                "places": Decimal(4),
+                "minOrder": Decimal("25.50"),
+            }
+            for i in range(count)
+        ]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    body = reservations(args.items)
+    candidates = {
+        "DecimalEncoder": lambda: json.dumps(body, cls=DecimalEncoder),
+        "serializer/json": lambda: SERIALIZER._dumps_json(body),
+    }
+    if SERIALIZER.orjson is not None:
+        candidates["serializer/orjson"] = lambda: SERIALIZER._dumps_orjson(body)
+
+    print(f"{args.items} reservation items, best of {args.repeat}")
+    for name, dumps in candidates.items():
+        best = min(timeit.repeat(dumps, number=1, repeat=args.repeat))
+        print(f"{name:<18} {best * 1000:8.2f} ms {len(dumps()):>10} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Per-span overhead of task10's commons.tracing.
+
+Measures an empty `with span(...)` block with tracing off, with the local
+JSON-lines exporter and with the X-Ray exporter (UDP to a local socket,
+sampled and unsampled). It also measures the cost tracing.patch() adds to
+a botocore DynamoDB PutItem (answered by botocore's Stubber) and to a
+requests call (answered by an in-process adapter), so no network is
+involved: the patched calls are timed with tracing off and on. The last
+span of each kind is printed to show what is recorded.
+
+Run from the repository root:
+    python benchmarks/bench_tracing.py
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "eu-west-1")
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "bench")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "bench")
+os.environ["_X_AMZN_TRACE_ID"] = (
+    "Root=1-5759e988-bd862e3fe1be46a994272793;Parent=53995c3f42cd8ad8;Sampled=1"
+)
+sys.path.append(str(ROOT / "task10" / "src"))
+
+import boto3  # noqa: E402
+import requests  # noqa: E402
+from botocore.stub import Stubber  # noqa: E402
+
+from commons import tracing  # noqa: E402
+
+
+class CannedAdapter(requests.adapters.BaseAdapter):
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response.headers["Content-Length"] = "2"
+        response._content = b"{}"
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+def per_call_us(function, number, repeat):
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--spans", type=int, default=50_000)
+    parser.add_argument("--calls", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    directory = tempfile.TemporaryDirectory()
+    jsonl = tracing.JsonLinesExporter(os.path.join(directory.name, "traces.jsonl"))
+    daemon = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    daemon.bind(("127.0.0.1", 0))
+    daemon.setblocking(False)
+    xray = tracing.XRayExporter(f"127.0.0.1:{daemon.getsockname()[1]}")
+
+    def empty_span(tracer):
+        def run():
+            with tracer.span("noop"):
+                pass
+
+        return run
+
+    print(f"empty span, best of {args.repeat} x {args.spans}")
+    tracers = {
+        "tracing off": tracing.Tracer(jsonl, enabled=False),
+        "json lines": tracing.Tracer(jsonl),
+        "x-ray sampled": tracing.Tracer(xray),
+    }
+    for name, tracer in tracers.items():
+        print(f"  {name:<24} {per_call_us(empty_span(tracer), args.spans, args.repeat):8.2f} us")
+    os.environ["_X_AMZN_TRACE_ID"] = os.environ["_X_AMZN_TRACE_ID"].replace("Sampled=1", "Sampled=0")
+    unsampled = per_call_us(empty_span(tracing.Tracer(xray)), args.spans, args.repeat)
+    print(f"  {'x-ray unsampled':<24} {unsampled:8.2f} us")
+    os.environ["_X_AMZN_TRACE_ID"] = os.environ["_X_AMZN_TRACE_ID"].replace("Sampled=0", "Sampled=1")
+
+    dynamodb = boto3.client("dynamodb")
+    session = requests.Session()
+    # skips the proxy lookup in os.environ, the noisiest part of a send here
+    session.trust_env = False
+    session.mount("https://", CannedAdapter())
+    stubber = Stubber(dynamodb)
+    stubber.activate()
+    item = {"id": {"S": "1"}, "forecast": {"M": {"latitude": {"N": "52.52"}}}}
+
+    def put_item():
+        stubber.add_response("put_item", {})
+        dynamodb.put_item(TableName="Weather", Item=item)
+
+    def get_forecast():
+        session.get("https://api.open-meteo.com/v1/forecast?latitude=52.52&longitude=13.41")
+
+    calls = {"dynamodb PutItem": put_item, "requests GET": get_forecast}
+    tracing.patch()
+    tracer = tracing.TRACER = tracing.Tracer(jsonl)
+    # alternate tracing off and on within each repeat, so machine noise
+    # hits both alike; with tracing off the patched call goes straight
+    # through to botocore / requests
+    best = {}
+    for _ in range(args.repeat):
+        for name, call in calls.items():
+            for enabled in (False, True):
+                tracer.enabled = enabled
+                elapsed = timeit.timeit(call, number=args.calls) / args.calls * 1e6
+                best[name, enabled] = min(best.get((name, enabled), elapsed), elapsed)
+    print(f"patched calls (json lines exporter), best of {args.repeat} x {args.calls}")
+    for name in calls:
+        off, on = best[name, False], best[name, True]
+        print(f"  {name:<24} {off:8.2f} -> {on:8.2f} us (+{on - off:.2f} us)")
+
+    jsonl.flush()
+    records = {}
+    with open(jsonl.path) as lines:
+        for line in lines:
+            record = json.loads(line)
+            records[record["kind"]] = record
+    print("recorded spans:")
+    for record in records.values():
+        print(f"  {json.dumps(record)}")
+    print("x-ray subsegment:")
+    with tracing.TRACER.span("DynamoDB", kind="aws", operation="PutItem") as span:
+        span.set(status=200, response_bytes=2)
+    print(f"  {json.dumps(tracing.XRayExporter.subsegment(span))}")
+    directory.cleanup()
+
+
+if __name__ == "__main__":
+    main()
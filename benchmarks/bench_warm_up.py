@@ -0,0 +1,145 @@
+"""First-request latency of task12's api_handler in a fresh container, with
+and without a warm-up ping before it.
+
+Each sample starts a new interpreter that imports the handler, optionally
+sends {"warm_up": true} (AbstractLambda runs ApiHandler.prime()), then
+sends GET /tables twice. Real boto3 clients are used, pointed with
+AWS_ENDPOINT_URL at a local keep-alive HTTP stub answering the DynamoDB,
+SSM and Cognito JSON APIs. Client construction, model loading, connection
+setup and cache fills are therefore measured, but TLS handshakes and
+network round trips are not, so the saving in AWS is larger.
+
+Latencies are the "total" of the EMF line each invocation writes, grouped
+by its Start dimension (cold, primed, warm).
+
+Run from the repository root:
+    python benchmarks/bench_warm_up.py --samples 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PROJECT = ROOT / "task12"
+
+TABLE_ITEMS = [
+    {
+        "id": {"N": str(n)},
+        "number": {"N": str(n)},
+        "places": {"N": "4"},
+        "isVip": {"BOOL": n % 5 == 0},
+        "minOrder": {"N": "0"},
+    }
+    for n in range(1, 21)
+]
+
+RESPONSES = {
+    "DynamoDB_20120810.Scan": (
+        200,
+        {"Items": TABLE_ITEMS, "Count": len(TABLE_ITEMS), "ScannedCount": len(TABLE_ITEMS)},
+    ),
+    "DynamoDB_20120810.DescribeEndpoints": (
+        200,
+        {"Endpoints": [{"Address": "localhost", "CachePeriodInMinutes": 1440}]},
+    ),
+    "AmazonSSM.GetParameter": (
+        400,
+        {"__type": "ParameterNotFound", "message": "Parameter not found"},
+    ),
+    "AmazonSSM.DescribeParameters": (200, {"Parameters": []}),
+    "AWSCognitoIdentityProviderService.ListUserPools": (200, {"UserPools": []}),
+}
+
+PROBE = """
+import json, sys
+sys.path.append({source!r})
+from lambdas.api_handler import handler
+if {warm_up!r}:
+    handler.lambda_handler({{"warm_up": True}}, None)
+event = {{"httpMethod": "GET", "path": "/tables", "resource": "/tables"}}
+for _ in range(2):
+    response = handler.lambda_handler(event, None)
+    assert response["statusCode"] == 200, response
+"""
+
+
+class AwsJsonStub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        status, body = RESPONSES.get(self.headers.get("X-Amz-Target"), (200, {}))
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/x-amz-json-1.1")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def sample(endpoint, warm_up):
+    env = {
+        **os.environ,
+        "AWS_ENDPOINT_URL": endpoint,
+        "AWS_ACCESS_KEY_ID": "bench",
+        "AWS_SECRET_ACCESS_KEY": "bench",
+        "AWS_DEFAULT_REGION": "eu-west-1",
+        "AWS_REGION": "eu-west-1",
+        "auth_mode": "off",
+        "log_level": "ERROR",
+        "stage_metrics": "on",
+    }
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE.format(source=str(PROJECT / "src"), warm_up=warm_up)],
+        capture_output=True,
+        text=True,
+        cwd=PROJECT,
+        env=env,
+        check=True,
+    )
+    lines = [json.loads(line) for line in completed.stdout.splitlines() if '"_aws"' in line]
+    return {line["Start"]: line for line in lines}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--samples", type=int, default=10)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), AwsJsonStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint = f"http://127.0.0.1:{server.server_address[1]}"
+
+    totals = {}
+    for _ in range(args.samples):
+        for warm_up in (False, True):
+            for start, line in sample(endpoint, warm_up).items():
+                metric = "prime" if start == "warm-up" else "total"
+                totals.setdefault(start, []).append(line[metric] / 1000)
+    server.shutdown()
+
+    print(f"task12 GET /tables, {args.samples} fresh interpreters per mode, median ms")
+    for start, label in (
+        ("cold", "first request, no warm-up"),
+        ("warm-up", "warm-up ping (prime)"),
+        ("primed", "first request after warm-up"),
+        ("warm", "later requests"),
+    ):
+        values = totals.get(start, [])
+        if values:
+            print(f"{label:<30} {statistics.median(values):8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
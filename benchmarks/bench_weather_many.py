@@ -0,0 +1,84 @@
+"""Wall time to fetch forecasts for many locations from a local open-meteo
+stand-in with injected latency: one get_weather per location in sequence,
+against get_weather_many with one location per request (concurrent only),
+its default chunks (batched and concurrent) and a single batch.
+
+Each request waits --latency ms plus --per-location ms per location it
+asks for, so batches are not free. Answers are generated locally and
+gzipped, so parsing and decompression are counted. Network round trips
+and TLS are not.
+
+Run from the repository root:  python benchmarks/bench_weather_many.py
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# task09's test helpers, which import its commons and lambdas from src
+sys.path.insert(0, str(ROOT / "task09"))
+
+from tests.local_open_meteo import LocalOpenMeteo  # noqa: E402
+from tests.test_weather_sdk import WEATHER_SDK  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--locations", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=80, help="ms per request")
+    parser.add_argument("--per-location", type=float, default=0.5, help="ms per location")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    locations = [
+        (round(rng.uniform(35, 70), 2), round(rng.uniform(-10, 40), 2))
+        for _ in range(args.locations)
+    ]
+    variables = WEATHER_SDK.DEFAULT_VARIABLES
+
+    with LocalOpenMeteo() as open_meteo:
+        open_meteo.delay = args.latency / 1000
+        open_meteo.delay_per_location = args.per_location / 1000
+        weather = WEATHER_SDK.Weather(open_meteo.url)
+
+        def sequential():
+            results = []
+            for location in locations:
+                forecast = weather.get_weather(*location, variables["current"], variables["hourly"])
+                results.append(WEATHER_SDK.LocationForecast(location, forecast.json()))
+            return results
+
+        modes = {
+            "get_weather in sequence": sequential,
+            "get_weather_many, 1 per request": lambda: weather.get_weather_many(
+                locations, variables, chunk_size=1
+            ),
+            f"get_weather_many, {WEATHER_SDK.MAX_LOCATIONS_PER_REQUEST} per request": lambda: (
+                weather.get_weather_many(locations, variables)
+            ),
+            f"get_weather_many, {args.locations} per request": lambda: weather.get_weather_many(
+                locations, variables, chunk_size=args.locations
+            ),
+        }
+        print(
+            f"{args.locations} locations, {args.latency:g} ms + {args.per_location:g} ms/location "
+            f"per request, best of {args.repeat}"
+        )
+        print(f"{'mode':<36} {'requests':>8} {'wall':>10}")
+        for name, fetch in modes.items():
+            best = None
+            for _ in range(args.repeat):
+                open_meteo.requests.clear()
+                started = time.perf_counter()
+                results = fetch()
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            assert all(result.forecast for result in results)
+            print(f"{name:<36} {len(open_meteo.requests):>8} {best * 1000:>8.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
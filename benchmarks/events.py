@@ -0,0 +1,197 @@
+"""Synthetic Lambda events for every event source the tasks are wired to.
+
+Each factory takes the variable parts of the event plus a sequence number
+`i`, so a load run can give every invocation distinct ids and payloads.
+"""
+import base64
+import datetime
+import hashlib
+import json
+import uuid
+
+ACCOUNT_ID = "123456789012"
+REGION = "eu-west-1"
+
+
+def _now(i=0):
+    return datetime.datetime(2024, 5, 1, 12, 0, tzinfo=datetime.timezone.utc) + datetime.timedelta(
+        seconds=i
+    )
+
+
+def _epoch_ms(i=0):
+    return int(_now(i).timestamp() * 1000)
+
+
+def _body(body):
+    if body is None or isinstance(body, str):
+        return body
+    return json.dumps(body)
+
+
+def api_gateway_v1(method="GET", path="/", body=None, query=None, headers=None, i=0):
+    """API Gateway REST API (payload format 1.0) proxy event"""
+    return {
+        "resource": path,
+        "path": path,
+        "httpMethod": method,
+        "headers": {"Content-Type": "application/json", **(headers or {})},
+        "multiValueHeaders": {},
+        "queryStringParameters": query,
+        "multiValueQueryStringParameters": None,
+        "pathParameters": None,
+        "stageVariables": None,
+        "requestContext": {
+            "accountId": ACCOUNT_ID,
+            "resourcePath": path,
+            "httpMethod": method,
+            "path": f"/api{path}",
+            "stage": "api",
+            "requestId": str(uuid.UUID(int=i)),
+            "requestTimeEpoch": _epoch_ms(i),
+            "identity": {"sourceIp": "127.0.0.1", "userAgent": "loadgen"},
+        },
+        "body": _body(body),
+        "isBase64Encoded": False,
+    }
+
+
+def http_api_v2(method="GET", path="/", body=None, query=None, headers=None, i=0):
+    """HTTP API (payload format 2.0) event; Function URLs send the same shape"""
+    query = query or {}
+    return {
+        "version": "2.0",
+        "routeKey": "$default",
+        "rawPath": path,
+        "rawQueryString": "&".join(f"{name}={value}" for name, value in query.items()),
+        "headers": {"content-type": "application/json", **(headers or {})},
+        "queryStringParameters": query or None,
+        "requestContext": {
+            "accountId": ACCOUNT_ID,
+            "apiId": "loadgen",
+            "domainName": "loadgen.lambda-url.eu-west-1.on.aws",
+            "http": {
+                "method": method,
+                "path": path,
+                "protocol": "HTTP/1.1",
+                "sourceIp": "127.0.0.1",
+                "userAgent": "loadgen",
+            },
+            "requestId": str(uuid.UUID(int=i)),
+            "routeKey": "$default",
+            "stage": "$default",
+            "time": _now(i).strftime("%d/%b/%Y:%H:%M:%S +0000"),
+            "timeEpoch": _epoch_ms(i),
+        },
+        "body": _body(body),
+        "isBase64Encoded": False,
+    }
+
+
+def sqs_batch(bodies=None, batch_size=10, queue="loadgen-queue", i=0):
+    """SQS event with batch_size records (or one per given body)"""
+    bodies = bodies or [{"sequence": i * batch_size + n} for n in range(batch_size)]
+    records = []
+    for n, body in enumerate(bodies):
+        text = _body(body)
+        records.append(
+            {
+                "messageId": str(uuid.UUID(int=i * len(bodies) + n)),
+                "receiptHandle": base64.b64encode(f"{i}-{n}".encode()).decode(),
+                "body": text,
+                "attributes": {
+                    "ApproximateReceiveCount": "1",
+                    "SentTimestamp": str(_epoch_ms(i)),
+                    "SenderId": ACCOUNT_ID,
+                    "ApproximateFirstReceiveTimestamp": str(_epoch_ms(i)),
+                },
+                "messageAttributes": {},
+                "md5OfBody": hashlib.md5(text.encode()).hexdigest(),
+                "eventSource": "aws:sqs",
+                "eventSourceARN": f"arn:aws:sqs:{REGION}:{ACCOUNT_ID}:{queue}",
+                "awsRegion": REGION,
+            }
+        )
+    return {"Records": records}
+
+
+def sns(message=None, topic="loadgen-topic", subject=None, i=0):
+    """SNS notification event with one record"""
+    return {
+        "Records": [
+            {
+                "EventSource": "aws:sns",
+                "EventVersion": "1.0",
+                "EventSubscriptionArn": f"arn:aws:sns:{REGION}:{ACCOUNT_ID}:{topic}:{uuid.UUID(int=0)}",
+                "Sns": {
+                    "Type": "Notification",
+                    "MessageId": str(uuid.UUID(int=i)),
+                    "TopicArn": f"arn:aws:sns:{REGION}:{ACCOUNT_ID}:{topic}",
+                    "Subject": subject,
+                    "Message": _body(message if message is not None else {"sequence": i}),
+                    "Timestamp": _now(i).isoformat().replace("+00:00", "Z"),
+                    "MessageAttributes": {},
+                },
+            }
+        ]
+    }
+
+
+def dynamodb_stream_batch(
+    batch_size=10, table="loadgen-table", event_name="INSERT", key="key", i=0
+):
+    """DynamoDB stream event; records carry NEW_AND_OLD_IMAGES of
+    {key: S, value: N} items, the shape task06's audit producer reads"""
+    records = []
+    for n in range(batch_size):
+        sequence = i * batch_size + n
+        new_image = {key: {"S": f"{key}-{sequence}"}, "value": {"N": str(sequence)}}
+        change = {
+            "ApproximateCreationDateTime": _epoch_ms(i) // 1000,
+            "Keys": {key: new_image[key]},
+            "NewImage": new_image,
+            "SequenceNumber": str(10**20 + sequence),
+            "SizeBytes": 64,
+            "StreamViewType": "NEW_AND_OLD_IMAGES",
+        }
+        if event_name == "MODIFY":
+            change["OldImage"] = {**new_image, "value": {"N": str(sequence - 1)}}
+        records.append(
+            {
+                "eventID": uuid.UUID(int=sequence).hex,
+                "eventName": event_name,
+                "eventVersion": "1.1",
+                "eventSource": "aws:dynamodb",
+                "awsRegion": REGION,
+                "dynamodb": change,
+                "eventSourceARN": f"arn:aws:dynamodb:{REGION}:{ACCOUNT_ID}:table/{table}"
+                "/stream/2024-05-01T00:00:00.000",
+            }
+        )
+    return {"Records": records}
+
+
+def eventbridge_schedule(rule="loadgen-schedule", i=0):
+    """EventBridge scheduled rule event"""
+    return {
+        "version": "0",
+        "id": str(uuid.UUID(int=i)),
+        "detail-type": "Scheduled Event",
+        "source": "aws.events",
+        "account": ACCOUNT_ID,
+        "time": _now(i).isoformat().replace("+00:00", "Z"),
+        "region": REGION,
+        "resources": [f"arn:aws:events:{REGION}:{ACCOUNT_ID}:rule/{rule}"],
+        "detail": {},
+    }
+
+
+FACTORIES = {
+    "apigw-v1": api_gateway_v1,
+    "http-v2": http_api_v2,
+    "function-url": http_api_v2,
+    "sqs": sqs_batch,
+    "sns": sns,
+    "dynamodb-stream": dynamodb_stream_batch,
+    "schedule": eventbridge_schedule,
+}
@@ -0,0 +1,248 @@
+"""Cold-start import profile of every task lambda, with a regression check.
+
+Each lambdas/<name>/handler.py is imported in a fresh interpreter started
+with -X importtime, through the task's tests.ImportFromSourceContext (or the
+same src path setup for tasks without tests). The per-module self and
+cumulative times of the handler import are rolled up into a tree and
+written to a JSON and an HTML report.
+
+The handler import time of each lambda is the best of --runs
+interpreters. With --check, lambdas whose import time exceeds the stored
+baseline by more than --tolerance exit non-zero. Baselines are
+machine-specific: refresh them with --update-baseline on the machine that
+runs the check.
+
+Run from the repository root:
+    python benchmarks/import_profile.py --check
+    python benchmarks/import_profile.py --update-baseline
+"""
+import argparse
+import html
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+BASELINE_PATH = Path(__file__).resolve().parent / "import_baseline.json"
+REPORT_DIR = Path(__file__).resolve().parent / "reports"
+
+MARKER = "--- handler import ---"
+
+PROBE = """
+import importlib, json, sys, time
+sys.path.insert(0, {project!r})
+try:
+    from tests import ImportFromSourceContext
+except ImportError:
+    ImportFromSourceContext = None
+sys.stderr.write({marker!r} + "\\n")
+sys.stderr.flush()
+error = None
+started = time.perf_counter()
+try:
+    if ImportFromSourceContext is not None:
+        with ImportFromSourceContext():
+            importlib.import_module("lambdas.{lambda_name}.handler")
+    else:
+        sys.path.append({source!r})
+        importlib.import_module("lambdas.{lambda_name}.handler")
+except Exception as e:
+    error = f"{{type(e).__name__}}: {{e}}"
+import_ms = (time.perf_counter() - started) * 1000
+print(json.dumps({{"import_ms": import_ms, "error": error}}))
+"""
+
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+
+def discover():
+    """Yields (task, lambda name) for every lambdas/*/handler.py"""
+    for handler in sorted(ROOT.glob("task*/src/lambdas/*/handler.py")):
+        yield handler.parents[3].name, handler.parent.name
+
+
+def parse_importtime(lines):
+    """
+    Builds the import tree from -X importtime lines, which are printed
+    children first with two spaces of indentation per level
+    """
+    pending = {}
+    for line in lines:
+        match = _IMPORT_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        depth = len(indent) // 2
+        node = {
+            "module": module,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+            "children": pending.pop(depth + 1, []),
+        }
+        pending.setdefault(depth, []).append(node)
+    return pending.get(0, [])
+
+
+def rollup(tree):
+    """
+    Self import time per top-level package over the whole tree, so a
+    package is charged for its own modules wherever they were imported from
+    """
+    packages = {}
+    nodes = list(tree)
+    while nodes:
+        node = nodes.pop()
+        package = node["module"].split(".")[0]
+        packages[package] = packages.get(package, 0) + node["self_ms"]
+        nodes.extend(node["children"])
+    return dict(sorted(packages.items(), key=lambda item: -item[1]))
+
+
+def profile(task, lambda_name):
+    project = ROOT / task
+    code = PROBE.format(
+        project=str(project),
+        source=str(project / "src"),
+        lambda_name=lambda_name,
+        marker=MARKER,
+    )
+    env = {
+        **os.environ,
+        "AWS_DEFAULT_REGION": os.environ.get("AWS_DEFAULT_REGION", "eu-west-1"),
+        "AWS_REGION": os.environ.get("AWS_REGION", "eu-west-1"),
+        "stage_metrics": "off",
+    }
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        cwd=project,
+        env=env,
+    )
+    if completed.returncode != 0:
+        return {"import_ms": None, "error": completed.stderr.strip().splitlines()[-1]}
+    stderr = completed.stderr.splitlines()
+    handler_lines = stderr[stderr.index(MARKER) + 1:]
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    tree = parse_importtime(handler_lines)
+    result["packages"] = rollup(tree)
+    result["tree"] = tree
+    return result
+
+
+def best_of(task, lambda_name, runs):
+    results = [profile(task, lambda_name) for _ in range(runs)]
+    timed = [result for result in results if result["import_ms"] is not None]
+    if not timed:
+        return results[0]
+    return min(timed, key=lambda result: result["import_ms"])
+
+
+def _html_tree(nodes, min_ms):
+    items = []
+    for node in sorted(nodes, key=lambda node: -node["cumulative_ms"]):
+        if node["cumulative_ms"] < min_ms:
+            continue
+        label = (
+            f"{html.escape(node['module'])} "
+            f"<b>{node['cumulative_ms']:.1f} ms</b> (self {node['self_ms']:.1f} ms)"
+        )
+        children = _html_tree(node["children"], min_ms)
+        if children:
+            items.append(f"<li><details><summary>{label}</summary>{children}</details></li>")
+        else:
+            items.append(f"<li>{label}</li>")
+    return f"<ul>{''.join(items)}</ul>" if items else ""
+
+
+def write_html(report, path, min_ms):
+    sections = []
+    for key, result in report.items():
+        if result["import_ms"] is None:
+            sections.append(f"<h2>{html.escape(key)}: failed</h2><pre>{html.escape(result['error'])}</pre>")
+            continue
+        packages = "".join(
+            f"<tr><td>{html.escape(name)}</td><td>{ms:.1f} ms</td></tr>"
+            for name, ms in result["packages"].items()
+        )
+        error = f"<p>Import error: {html.escape(result['error'])}</p>" if result["error"] else ""
+        sections.append(
+            f"<h2>{html.escape(key)}: {result['import_ms']:.1f} ms</h2>{error}"
+            f"<table>{packages}</table>{_html_tree(result['tree'], min_ms)}"
+        )
+    path.write_text(
+        "<!DOCTYPE html><html><head><meta charset='utf-8'><title>Lambda import profile</title>"
+        "<style>body{font-family:sans-serif}ul{list-style:none}td{padding:0 1em}</style>"
+        f"</head><body><h1>Lambda import profile</h1>{''.join(sections)}</body></html>"
+    )
+
+
+def check(report, baseline, tolerance):
+    regressions = []
+    for key, result in report.items():
+        if result["import_ms"] is None or result["error"]:
+            regressions.append(f"{key}: import failed ({result['error']})")
+            continue
+        allowed = baseline.get(key)
+        if allowed is None:
+            print(f"{key}: no baseline, skipped")
+        elif result["import_ms"] > allowed * (1 + tolerance):
+            regressions.append(
+                f"{key}: {result['import_ms']:.1f} ms, baseline {allowed:.1f} ms "
+                f"(+{tolerance:.0%} allowed)"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--task", action="append", help="profile only these tasks")
+    parser.add_argument("--report-dir", type=Path, default=REPORT_DIR)
+    parser.add_argument("--min-ms", type=float, default=0.5, help="HTML tree cut-off")
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.3)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    report = {}
+    for task, lambda_name in discover():
+        if args.task and task not in args.task:
+            continue
+        key = f"{task}/{lambda_name}"
+        report[key] = result = best_of(task, lambda_name, args.runs)
+        if result["import_ms"] is None:
+            print(f"{key:<28} failed: {result['error']}")
+            continue
+        top = ", ".join(f"{name} {ms:.0f}" for name, ms in list(result["packages"].items())[:3])
+        print(f"{key:<28} {result['import_ms']:8.1f} ms   {top}")
+
+    args.report_dir.mkdir(parents=True, exist_ok=True)
+    (args.report_dir / "import_profile.json").write_text(json.dumps(report, indent=2))
+    write_html(report, args.report_dir / "import_profile.html", args.min_ms)
+    print(f"Reports written to {args.report_dir}")
+
+    baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    if args.update_baseline:
+        baseline.update(
+            {
+                key: round(result["import_ms"], 1)
+                for key, result in report.items()
+                if result["import_ms"] is not None and not result["error"]
+            }
+        )
+        BASELINE_PATH.write_text(json.dumps(dict(sorted(baseline.items())), indent=2) + "\n")
+        print(f"Baseline written to {BASELINE_PATH}")
+    if args.check:
+        regressions = check(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""In-process load generator for the task lambdas.
+
+Imports one task's lambdas/<name>/handler.py with AWS (and optionally
+HTTP) calls routed to local stand-ins (see local_aws.py), then invokes its
+lambda_handler with synthetic events (see events.py) and reports latency
+percentiles, throughput, errors, allocations and the calls made to the
+stand-ins.
+
+Without --rate, --concurrency workers invoke back to back (closed loop).
+With --rate, invocations are scheduled at a fixed rate (open loop).
+Latency of an invocation that starts late is then measured from its
+scheduled start, so time spent queued behind slow invocations is counted. Allocations are measured with
+tracemalloc in a separate single-threaded pass.
+
+Run from the repository root, e.g.:
+    python benchmarks/loadgen.py task12 api_handler --event apigw-v1 \\
+        --method GET --path /tables --env auth_mode=off --requests 2000
+    python benchmarks/loadgen.py task04 sqs_handler --event sqs --batch-size 10
+    python benchmarks/loadgen.py task06 audit_producer --event dynamodb-stream \\
+        --env table_name=audit --concurrency 4 --rate 500
+    python benchmarks/loadgen.py task10 processor --event http-v2 --path /weather \\
+        --env table_name=weather --stub-http
+"""
+import argparse
+import importlib
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import events
+import local_aws
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+class LambdaContext:
+    """The attributes of the Lambda context object handlers read"""
+
+    def __init__(self, function_name, memory_mb=128, timeout_seconds=30):
+        self.function_name = function_name
+        self.function_version = "$LATEST"
+        self.memory_limit_in_mb = memory_mb
+        self.invoked_function_arn = (
+            f"arn:aws:lambda:{events.REGION}:{events.ACCOUNT_ID}:function:{function_name}"
+        )
+        self.aws_request_id = str(uuid.uuid4())
+        self.log_group_name = f"/aws/lambda/{function_name}"
+        self.log_stream_name = "loadgen"
+        self._deadline = time.monotonic() + timeout_seconds
+
+    def get_remaining_time_in_millis(self):
+        return max(0, int((self._deadline - time.monotonic()) * 1000))
+
+
+def parse_key_schemas(tables, indexes):
+    """--table NAME=HASH[:RANGE] and --index TABLE/INDEX=HASH[:RANGE]"""
+    schemas = {}
+    for spec in tables or []:
+        name, keys = spec.split("=", 1)
+        hash_key, _, range_key = keys.partition(":")
+        schemas[name] = (hash_key, range_key or None, {})
+    for spec in indexes or []:
+        target, keys = spec.split("=", 1)
+        table, index = target.split("/", 1)
+        hash_key, _, range_key = keys.partition(":")
+        schemas.setdefault(table, ("id", None, {}))[2][index] = (hash_key, range_key or None)
+    return schemas
+
+
+def load_handler(task, lambda_name):
+    sys.path.append(str(ROOT / task / "src"))
+    return importlib.import_module(f"lambdas.{lambda_name}.handler")
+
+
+def event_factory(args):
+    factory = events.FACTORIES[args.event]
+    body = json.loads(args.body) if args.body else None
+    query = dict(pair.split("=", 1) for pair in args.query or []) or None
+    headers = dict(pair.split("=", 1) for pair in args.header or []) or None
+    if args.event in ("apigw-v1", "http-v2", "function-url"):
+        return lambda i: factory(args.method, args.path, body, query, headers, i=i)
+    if args.event in ("sqs", "dynamodb-stream"):
+        return lambda i: factory(batch_size=args.batch_size, i=i)
+    if args.event == "sns":
+        return lambda i: factory(body, i=i)
+    return lambda i: factory(i=i)
+
+
+def status_of(response):
+    status = response.get("statusCode") if isinstance(response, dict) else None
+    return status if isinstance(status, int) else None
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run_load(invoke, make_event, requests, concurrency, rate=None):
+    """Returns (latencies in seconds, errors, status code counts, elapsed seconds)"""
+    latencies = [0.0] * requests
+    errors = []
+    statuses = {}
+    counter = iter(range(requests))
+    counter_lock = threading.Lock()
+    started = time.perf_counter()
+
+    def worker():
+        while True:
+            with counter_lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            event = make_event(i)
+            begin = time.perf_counter()
+            if rate:
+                scheduled = started + i / rate
+                if scheduled > begin:
+                    time.sleep(scheduled - begin)
+                    begin = time.perf_counter()
+                else:
+                    # behind schedule: the wait in the queue counts as latency
+                    begin = scheduled
+            try:
+                status = status_of(invoke(event))
+                if status is not None and status >= 500:
+                    errors.append(i)
+            except Exception as e:
+                status = "exception"
+                errors.append(f"{type(e).__name__}: {e}")
+            latencies[i] = time.perf_counter() - begin
+            with counter_lock:
+                statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    return latencies, errors, statuses, time.perf_counter() - started
+
+
+def measure_allocations(invoke, make_event, invocations):
+    """Bytes allocated per invocation (tracemalloc peak) and retained after it"""
+    events_ = [make_event(i) for i in range(invocations)]
+    tracemalloc.start()
+    try:
+        peaks = []
+        baseline = tracemalloc.get_traced_memory()[0]
+        for event in events_:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            try:
+                invoke(event)
+            except Exception:
+                pass
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        retained = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    return statistics.median(peaks), retained / invocations
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("task")
+    parser.add_argument("lambda_name")
+    parser.add_argument("--event", choices=sorted(events.FACTORIES), default="apigw-v1")
+    parser.add_argument("--method", default="GET")
+    parser.add_argument("--path", default="/")
+    parser.add_argument("--body", help="JSON request body / SNS message")
+    parser.add_argument("--query", action="append", help="NAME=VALUE query parameter")
+    parser.add_argument("--header", action="append", help="NAME=VALUE header")
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--rate", type=float, help="invocations per second (open loop)")
+    parser.add_argument("--allocation-samples", type=int, default=100)
+    parser.add_argument("--env", action="append", help="NAME=VALUE lambda environment variable")
+    parser.add_argument("--table", action="append", help="NAME=HASH[:RANGE] local table key")
+    parser.add_argument("--index", action="append", help="TABLE/INDEX=HASH[:RANGE] local index")
+    parser.add_argument("--stub-http", action="store_true", help="answer requests calls locally")
+    parser.add_argument("--metrics", action="store_true", help="keep the per-invocation EMF lines")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_DEFAULT_REGION", events.REGION)
+    os.environ.setdefault("AWS_REGION", events.REGION)
+    os.environ.setdefault("log_level", "ERROR")
+    if not args.metrics:
+        os.environ["stage_metrics"] = "off"
+    for pair in args.env or []:
+        name, value = pair.split("=", 1)
+        os.environ[name] = value
+
+    local = local_aws.install(parse_key_schemas(args.table, args.index), args.stub_http)
+    module = load_handler(args.task, args.lambda_name)
+    context = LambdaContext(args.lambda_name)
+
+    def invoke(event):
+        return module.lambda_handler(event, context)
+
+    make_event = event_factory(args)
+    for i in range(args.warmup):
+        invoke(make_event(args.requests + i))
+
+    latencies, errors, statuses, elapsed = run_load(
+        invoke, make_event, args.requests, args.concurrency, args.rate
+    )
+    peak, retained = measure_allocations(invoke, make_event, args.allocation_samples)
+    ordered = sorted(latencies)
+    report = {
+        "task": args.task,
+        "lambda": args.lambda_name,
+        "event": args.event,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "rate": args.rate,
+        "throughput_rps": args.requests / elapsed,
+        "p50_ms": percentile(ordered, 0.50) * 1000,
+        "p95_ms": percentile(ordered, 0.95) * 1000,
+        "p99_ms": percentile(ordered, 0.99) * 1000,
+        "max_ms": ordered[-1] * 1000 if ordered else 0.0,
+        "errors": len(errors),
+        "first_error": next((e for e in errors if isinstance(e, str)), None),
+        "status_codes": statuses,
+        "allocated_kb_per_invocation": peak / 1024,
+        "retained_kb_per_invocation": retained / 1024,
+        "aws_calls": local.calls(),
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(
+        f"{args.task}/{args.lambda_name} {args.event}: {args.requests} invocations, "
+        f"concurrency {args.concurrency}, rate {args.rate or 'unbounded'}"
+    )
+    print(f"throughput  {report['throughput_rps']:10.1f} invocations/s")
+    for name in ("p50", "p95", "p99", "max"):
+        print(f"{name:<11} {report[name + '_ms']:10.3f} ms")
+    print(f"errors      {report['errors']:10d} {report['first_error'] or ''}")
+    print("statuses    " + ", ".join(f"{code}: {count}" for code, count in sorted(statuses.items())))
+    print(
+        f"allocated   {report['allocated_kb_per_invocation']:10.1f} KB/invocation "
+        f"(retained {report['retained_kb_per_invocation']:.2f} KB)"
+    )
+    for call, count in sorted(report["aws_calls"].items()):
+        print(f"  {call:<40} {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Routes boto3 and outbound HTTP calls of an in-process lambda to local
+stand-ins.
+
+install() patches boto3.session.Session.client/resource, which both plain
+boto3.client()/resource() calls and commons.aws_clients go through, so
+every task sees the same in-memory services:
+
+    dynamodb  task12's LocalDynamoDB, tables created on first use
+    s3        LocalS3 (put_object/get_object)
+    ssm       task12's LocalParameterStore
+
+Other services raise NotImplementedError. With stub_http, requests calls
+get a canned Open-Meteo forecast instead of reaching the network.
+"""
+import importlib.util
+import json
+from pathlib import Path
+
+import boto3.session
+
+ROOT = Path(__file__).resolve().parent.parent
+STAND_INS = ROOT / "task12" / "tests"
+
+
+def _load(name):
+    spec = importlib.util.spec_from_file_location(f"local_aws_{name}", STAND_INS / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+local_dynamodb = _load("local_dynamodb")
+local_ssm = _load("local_ssm")
+
+
+class AutoCreatingDynamoDB(local_dynamodb.LocalDynamoDB):
+    """LocalDynamoDB creating unknown tables on first use, keyed by the
+    schema given in key_schemas ({table: (hash, range, {index: (hash, range)})})
+    or by a string "id" hash key"""
+
+    def __init__(self, key_schemas=None):
+        super().__init__()
+        self.key_schemas = key_schemas or {}
+
+    def Table(self, name):
+        if name not in self.tables:
+            hash_key, range_key, indexes = self.key_schemas.get(name, ("id", None, {}))
+            self.tables[name] = local_dynamodb.LocalTable(name, hash_key, range_key, indexes)
+        return self.tables[name]
+
+
+class LocalS3:
+    """In-memory stand-in for the s3 client object calls"""
+
+    def __init__(self):
+        self.objects = {}
+        self.calls = []
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self.calls.append("PutObject")
+        self.objects[(Bucket, Key)] = Body.encode() if isinstance(Body, str) else bytes(Body)
+        return {"ETag": f'"{len(self.objects)}"'}
+
+    def get_object(self, Bucket, Key, **kwargs):
+        self.calls.append("GetObject")
+        return {"Body": self.objects[(Bucket, Key)]}
+
+
+class LocalAws:
+    def __init__(self, key_schemas=None):
+        self.dynamodb = AutoCreatingDynamoDB(key_schemas)
+        self.clients = {
+            "dynamodb": self.dynamodb.meta.client,
+            "s3": LocalS3(),
+            "ssm": local_ssm.LocalParameterStore(),
+        }
+        self.resources = {"dynamodb": self.dynamodb}
+
+    def client(self, service_name, *args, **kwargs):
+        if service_name not in self.clients:
+            raise NotImplementedError(f"No local stand-in for the {service_name} client")
+        return self.clients[service_name]
+
+    def resource(self, service_name, *args, **kwargs):
+        if service_name not in self.resources:
+            raise NotImplementedError(f"No local stand-in for the {service_name} resource")
+        return self.resources[service_name]
+
+    def calls(self):
+        calls = {}
+        for name, table in self.dynamodb.tables.items():
+            for call in table.calls:
+                calls[f"dynamodb:{name}:{call}"] = calls.get(f"dynamodb:{name}:{call}", 0) + 1
+        for service, client in self.clients.items():
+            for call in getattr(client, "calls", []):
+                calls[f"{service}:{call}"] = calls.get(f"{service}:{call}", 0) + 1
+        return calls
+
+
+FORECAST = {
+    "latitude": 52.52,
+    "longitude": 13.419998,
+    "generationtime_ms": 0.05,
+    "utc_offset_seconds": 0,
+    "timezone": "GMT",
+    "timezone_abbreviation": "GMT",
+    "elevation": 38.0,
+    "current_units": {"time": "iso8601", "interval": "seconds", "temperature_2m": "°C"},
+    "current": {"time": "2024-05-01T12:00", "interval": 900, "temperature_2m": 18.2},
+    "hourly_units": {"time": "iso8601", "temperature_2m": "°C"},
+    "hourly": {
+        "time": [f"2024-05-01T{hour:02d}:00" for hour in range(24)],
+        "temperature_2m": [round(10 + hour * 0.5, 1) for hour in range(24)],
+        "relative_humidity_2m": [60 + hour for hour in range(24)],
+        "wind_speed_10m": [round(5 + hour * 0.2, 1) for hour in range(24)],
+    },
+}
+
+
+def _stub_send(session, request, **kwargs):
+    import requests
+
+    response = requests.Response()
+    response.status_code = 200
+    response.headers["Content-Type"] = "application/json"
+    response._content = json.dumps(FORECAST).encode()
+    response.url = request.url
+    response.request = request
+    return response
+
+
+def install(key_schemas=None, stub_http=False):
+    """Patches boto3 (and requests with stub_http); returns the LocalAws"""
+    local = LocalAws(key_schemas)
+    boto3.session.Session.client = lambda self, service_name, *args, **kwargs: local.client(
+        service_name
+    )
+    boto3.session.Session.resource = lambda self, service_name, *args, **kwargs: local.resource(
+        service_name
+    )
+    boto3.DEFAULT_SESSION = None
+    if stub_http:
+        import requests.sessions
+
+        requests.sessions.Session.send = _stub_send
+    return local
@@ -1,12 +1,76 @@
+import json
+import os
+import sys
+import time
 from abc import abstractmethod
 
 from commons import ApplicationException, build_response
-from commons.log_helper import get_logger
+from commons.log_helper import flush_logs, get_logger
 
 _LOG = get_logger(__name__)
 
+METRICS_NAMESPACE = "AWS-Syndicate/Lambda"
+
+# a container serves its invocations one at a time, so the first real
+# (not warm-up) invocation to run in this process is its first request;
+# _primed records whether a warm-up ping ran prime() before it
+_first_request = True
+_primed = False
+
+START_COLD = "cold"
+START_PRIMED = "primed"
+START_WARM = "warm"
+START_WARM_UP = "warm-up"
+
+
+class Middleware:
+    """
+    Cross-cutting behaviour around AbstractLambda.handle_request.
+
+    before() may return a response to skip the handler (and the remaining
+    before hooks), after() may replace the response, on_error() may turn an
+    exception into a response by returning one. Hooks that are not
+    overridden are skipped and not timed
+    """
+
+    def before(self, event, context):
+        return None
+
+    def after(self, event, context, response):
+        return response
+
+    def on_error(self, event, context, error):
+        return None
+
+
+def request_metadata(event):
+    """
+    Method, path and request id of an API Gateway or Function URL event:
+    what error logs carry instead of the event, whose body and headers
+    hold passwords and bearer tokens
+    """
+    if not isinstance(event, dict):
+        return {}
+    request_context = event.get("requestContext") or {}
+    http = request_context.get("http") or {}
+    return {
+        "method": event.get("httpMethod") or http.get("method"),
+        "path": event.get("path") or event.get("rawPath") or http.get("path"),
+        "requestId": request_context.get("requestId"),
+    }
+
+
+def _overrides(middleware, hook):
+    return getattr(type(middleware), hook) is not getattr(Middleware, hook)
+
 
 class AbstractLambda:
+    # ordered chain: before hooks run first to last, after and error hooks
+    # last to first, only for the middlewares whose before hook ran
+    middlewares = ()
+    # EMF lines go to metrics_stream, or to stdout when it is None
+    metrics_stream = None
+    emit_stage_metrics = os.environ.get("stage_metrics", "on") != "off"
 
     @abstractmethod
     def validate_request(self, event) -> dict:
@@ -27,25 +91,151 @@ class AbstractLambda:
         """
         pass
 
+    def prime(self):
+        """
+        Runs on warm-up pings ({"warm_up": true}) so the next real request
+        finds a hot container: create the clients the handler uses, open
+        their pooled connections with a cheap call (see
+        commons.aws_clients.prime) and fill the caches it declares.
+        Failures are logged and do not fail the ping. A lambda that does not
+        override it still reports its first request as cold
+        """
+        pass
+
+    def put_metric(self, name, value, unit="Count"):
+        """
+        Adds a metric of the running invocation to its EMF line, next to
+        the stage timings. A name put more than once is reported with all
+        its values
+        """
+        self.__dict__.setdefault("_metrics", []).append((name, value, unit))
+
     def lambda_handler(self, event, context):
+        global _first_request
+        if isinstance(event, dict) and event.get("warm_up"):
+            start = START_WARM_UP
+        elif _first_request:
+            _first_request = False
+            start = START_PRIMED if _primed else START_COLD
+        else:
+            start = START_WARM
+        timings = []
+        started = time.perf_counter_ns()
         try:
-            _LOG.debug(f'Request: {event}')
-            if event.get('warm_up'):
-                return
-            errors = self.validate_request(event=event)
-            if errors:
-                return build_response(code=400,
-                                      content=errors)
-            execution_result = self.handle_request(event=event,
-                                                   context=context)
-            _LOG.debug(f'Response: {execution_result}')
-            return execution_result
-        except ApplicationException as e:
-            _LOG.error(f'Error occurred; Event: {event}; Error: {e}')
-            return build_response(code=e.code,
-                                  content=e.content)
-        except Exception as e:
+            return self._run_pipeline(event, context, timings)
+        finally:
+            timings.append(("total", time.perf_counter_ns() - started))
+            flush_logs()
+            self.emit_metrics(timings, start, context, self.__dict__.pop("_metrics", ()))
+
+    def _warm_up(self, timings):
+        global _primed
+        started = time.perf_counter_ns()
+        try:
+            self.prime()
+        except Exception as error:
+            _LOG.warning("Warm-up priming failed", exc_info=error)
+        else:
+            # the default prime() warms nothing, so the next request is cold
+            _primed = type(self).prime is not AbstractLambda.prime
+        timings.append(("prime", time.perf_counter_ns() - started))
+
+    def _run_pipeline(self, event, context, timings):
+        entered = []
+        try:
+            _LOG.debug("Request", extra={"event": event})
+            if event.get("warm_up"):
+                return self._warm_up(timings)
+            response = None
+            for middleware in self.middlewares:
+                entered.append(middleware)
+                if _overrides(middleware, "before"):
+                    started = time.perf_counter_ns()
+                    response = middleware.before(event, context)
+                    timings.append(
+                        (f"{type(middleware).__name__}.before", time.perf_counter_ns() - started)
+                    )
+                    if response is not None:
+                        break
+            if response is None:
+                started = time.perf_counter_ns()
+                errors = self.validate_request(event=event)
+                timings.append(("validate", time.perf_counter_ns() - started))
+                if errors:
+                    return build_response(code=400, content=errors)
+                started = time.perf_counter_ns()
+                response = self.handle_request(event=event, context=context)
+                timings.append(("handle", time.perf_counter_ns() - started))
+            for middleware in reversed(entered):
+                if _overrides(middleware, "after"):
+                    started = time.perf_counter_ns()
+                    response = middleware.after(event, context, response)
+                    timings.append(
+                        (f"{type(middleware).__name__}.after", time.perf_counter_ns() - started)
+                    )
+            _LOG.debug("Response", extra={"response": response})
+            return response
+        except Exception as error:
+            for middleware in reversed(entered):
+                if _overrides(middleware, "on_error"):
+                    started = time.perf_counter_ns()
+                    response = middleware.on_error(event, context, error)
+                    timings.append(
+                        (f"{type(middleware).__name__}.on_error", time.perf_counter_ns() - started)
+                    )
+                    if response is not None:
+                        return response
+            if isinstance(error, ApplicationException):
+                _LOG.error(
+                    "Error occurred",
+                    extra={"request": request_metadata(event), "error": str(error)},
+                )
+                return build_response(code=error.code, content=error.content)
             _LOG.error(
-                f'Unexpected error occurred; Event: {event}; Error: {e}')
-            return build_response(code=500,
-                                  content='Internal server error')
+                "Unexpected error occurred",
+                exc_info=error,
+                extra={"request": request_metadata(event), "error": str(error)},
+            )
+            return build_response(code=500, content="Internal server error")
+
+    def emit_metrics(self, timings, start, context, metrics=()):
+        """
+        Writes the stage timings, in microseconds, and the metrics put
+        during the invocation as one CloudWatch Embedded Metric Format line
+        with Function and Start dimensions. Start is cold or primed for the
+        container's first request (without or after a warm-up ping), warm
+        for later ones and warm-up for the pings. With stage_metrics=off
+        only the put metrics are written
+        """
+        units = {}
+        values = {}
+        if self.emit_stage_metrics:
+            for name, elapsed_ns in timings:
+                units[name] = "Microseconds"
+                values[name] = values.get(name, 0) + elapsed_ns / 1000
+        put = {}
+        for name, value, unit in metrics:
+            units.setdefault(name, unit)
+            put.setdefault(name, []).append(value)
+        for name, put_values in put.items():
+            values[name] = put_values[0] if len(put_values) == 1 else put_values
+        if not values:
+            return
+        function_name = getattr(context, "function_name", None) or type(self).__name__
+        document = {
+            "_aws": {
+                "Timestamp": int(time.time() * 1000),
+                "CloudWatchMetrics": [
+                    {
+                        "Namespace": os.environ.get("metrics_namespace", METRICS_NAMESPACE),
+                        "Dimensions": [["Function", "Start"]],
+                        "Metrics": [{"Name": name, "Unit": unit} for name, unit in units.items()],
+                    }
+                ],
+            },
+            "Function": function_name,
+            "Start": start,
+            **values,
+        }
+        stream = self.metrics_stream or sys.stdout
+        stream.write(json.dumps(document, separators=(",", ":")) + "\n")
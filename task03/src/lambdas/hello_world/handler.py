@@ -1,37 +1,33 @@
 from commons.log_helper import get_logger
 from commons.abstract_lambda import AbstractLambda
+from commons.router import Router
 import json
 _LOG = get_logger(__name__)
 
+ROUTER = Router()
+
 
 class HelloWorld(AbstractLambda):
 
     def validate_request(self, event) -> dict:
-        if event.get('path') == '/hello':
-            return {
-                "statusCode": 200,
-                "body": json.dumps({"statusCode": 200, "message": "Hello from Lambda"})
-            }
-        else:
-            return None
+        pass
+
+    @ROUTER.route('GET', '/hello')
+    def hello(self, event):
+        return {
+            "statusCode": 200,
+            "body": json.dumps({"statusCode": 200, "message": "Hello from Lambda"})
+        }
         
     def handle_request(self, event, context):
         """
         Explain incoming event here
         """
-        # todo implement business logic
-        result =  {
-         "statusCode": 200,
-         "message": "Hello from Lambda"
-        }
-        return result
+        return ROUTER.dispatch(self, event)
     
 
 HANDLER = HelloWorld()
 
 
 def lambda_handler(event, context):
-    response = HANDLER.validate_request(event)
-    if response:
-        return response
     return HANDLER.lambda_handler(event=event, context=context)
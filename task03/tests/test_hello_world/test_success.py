@@ -1,3 +1,5 @@
+import json
+
 from tests.test_hello_world import HelloWorldLambdaTestCase
 
 
@@ -8,6 +10,12 @@ class TestSuccess(HelloWorldLambdaTestCase):
             'statusCode': 200,
             'message': 'Hello from Lambda'
         }
-        actual_response = self.HANDLER.handle_request(dict(), dict())
-        self.assertEqual(actual_response, expected_response)
+        event = {'httpMethod': 'GET', 'path': '/hello'}
+        actual_response = self.HANDLER.handle_request(event, dict())
+        self.assertEqual(actual_response['statusCode'], 200)
+        self.assertEqual(json.loads(actual_response['body']), expected_response)
 
+    def test_unknown_path(self):
+        event = {'httpMethod': 'GET', 'path': '/bye'}
+        actual_response = self.HANDLER.handle_request(event, dict())
+        self.assertEqual(actual_response['statusCode'], 404)
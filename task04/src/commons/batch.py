@@ -0,0 +1,101 @@
+from abc import abstractmethod
+
+from commons.abstract_lambda import AbstractLambda
+from commons.log_helper import get_logger
+
+_LOG = get_logger(__name__)
+
+SQS = "aws:sqs"
+DYNAMODB = "aws:dynamodb"
+KINESIS = "aws:kinesis"
+
+
+def record_id(record):
+    """
+    The itemIdentifier Lambda expects for a failed record: the SQS message
+    id, or the stream sequence number
+    """
+    source = record.get("eventSource")
+    if source == SQS:
+        return record["messageId"]
+    if source == DYNAMODB:
+        return record["dynamodb"]["SequenceNumber"]
+    if source == KINESIS:
+        return record["kinesis"]["sequenceNumber"]
+    raise ValueError(f"Partial batch responses are not supported for {source}")
+
+
+def reported_id(record):
+    """
+    record_id, or an empty itemIdentifier when the record has none: Lambda
+    then treats the batch as a complete failure and retries all of it,
+    the only retry that exists for such a record
+    """
+    try:
+        return record_id(record)
+    except (KeyError, ValueError):
+        return ""
+
+
+def is_ordered(record):
+    """Stream shards and FIFO queues deliver records that must stay in order"""
+    if record.get("eventSource") != SQS:
+        return True
+    return record.get("eventSourceARN", "").endswith(".fifo")
+
+
+def process_batch(records, handle_record):
+    """
+    Runs handle_record for every record and returns the partial batch
+    response, so Lambda retries only the records that failed.
+
+    Records of ordered sources are not processed past the first failure:
+    it and every record after it are reported, because Lambda resumes a
+    stream from the lowest failed sequence number and a FIFO queue must not
+    deliver later messages of the group first. The event source mapping
+    needs ReportBatchItemFailures in its function_response_types, otherwise
+    Lambda ignores the response and deletes the whole batch
+    """
+    failures = []
+    for index, record in enumerate(records):
+        item_id = reported_id(record)
+        try:
+            handle_record(record)
+        except Exception as error:
+            _LOG.error(
+                "Record failed",
+                exc_info=error,
+                extra={"itemIdentifier": item_id, "error": str(error)},
+            )
+            if is_ordered(record):
+                failures.extend(reported_id(later) for later in records[index:])
+                break
+            failures.append(item_id)
+    if failures:
+        _LOG.warning("%d of %d records failed", len(failures), len(records))
+    return {"batchItemFailures": [{"itemIdentifier": item_id} for item_id in failures]}
+
+
+class BatchLambda(AbstractLambda):
+    """
+    AbstractLambda for SQS and stream triggers: handle_record runs once per
+    record and a failing record is reported in batchItemFailures instead of
+    failing the batch
+    """
+
+    def validate_request(self, event) -> dict:
+        pass
+
+    def handle_request(self, event, context):
+        return process_batch(
+            event.get("Records") or [], lambda record: self.handle_record(record, context)
+        )
+
+    @abstractmethod
+    def handle_record(self, record, context):
+        """
+        Processes one record; raising marks it for retry
+        :param record: one item of the event's Records
+        :param context: lambda context
+        """
+        pass
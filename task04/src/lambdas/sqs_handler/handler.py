@@ -1,21 +1,16 @@
 from commons.log_helper import get_logger
-from commons.abstract_lambda import AbstractLambda
+from commons.batch import BatchLambda
 
 _LOG = get_logger('SqsHandler-handler')
 
 
-class SqsHandler(AbstractLambda):
+class SqsHandler(BatchLambda):
 
-    def validate_request(self, event) -> dict:
-        pass
-        
-    def handle_request(self, event, context):
+    def handle_record(self, record, context):
         """
-        Explain incoming event here
+        Logs the body of one message from async_queue
         """
-        # todo implement business logic
-        _LOG.info(event)
-        return 200
+        _LOG.info('Message %s: %s', record['messageId'], record['body'])
     
 
 HANDLER = SqsHandler()
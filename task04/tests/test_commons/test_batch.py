@@ -0,0 +1,76 @@
+import unittest
+
+from tests.test_commons import BATCH
+
+
+def sqs_record(message_id, queue='queue'):
+    return {'messageId': message_id, 'eventSource': 'aws:sqs',
+            'eventSourceARN': f'arn:aws:sqs:eu-west-1:123456789012:{queue}'}
+
+
+def stream_record(sequence_number):
+    return {'eventID': f'event-{sequence_number}', 'eventSource': 'aws:dynamodb',
+            'dynamodb': {'SequenceNumber': sequence_number}}
+
+
+def failing_on(*identifiers):
+    handled = []
+
+    def handle_record(record):
+        identifier = BATCH.record_id(record)
+        if identifier in identifiers:
+            raise ValueError(identifier)
+        handled.append(identifier)
+
+    return handle_record, handled
+
+
+class TestProcessBatch(unittest.TestCase):
+
+    def test_standard_queue_reports_each_failure(self):
+        handle_record, handled = failing_on('2', '4')
+        records = [sqs_record(str(n)) for n in range(1, 6)]
+
+        response = BATCH.process_batch(records, handle_record)
+
+        self.assertEqual(response['batchItemFailures'],
+                         [{'itemIdentifier': '2'}, {'itemIdentifier': '4'}])
+        self.assertEqual(handled, ['1', '3', '5'])
+
+    def test_stream_stops_at_first_failure(self):
+        handle_record, handled = failing_on('200')
+        records = [stream_record(str(n)) for n in (100, 200, 300)]
+
+        response = BATCH.process_batch(records, handle_record)
+
+        self.assertEqual(response['batchItemFailures'],
+                         [{'itemIdentifier': '200'}, {'itemIdentifier': '300'}])
+        self.assertEqual(handled, ['100'])
+
+    def test_fifo_queue_stops_at_first_failure(self):
+        handle_record, handled = failing_on('1')
+        records = [sqs_record(str(n), queue='orders.fifo') for n in range(3)]
+
+        response = BATCH.process_batch(records, handle_record)
+
+        self.assertEqual([failure['itemIdentifier'] for failure in response['batchItemFailures']],
+                         ['1', '2'])
+        self.assertEqual(handled, ['0'])
+
+    def test_kinesis_sequence_number(self):
+        record = {'eventSource': 'aws:kinesis', 'kinesis': {'sequenceNumber': '42'}}
+        self.assertEqual(BATCH.record_id(record), '42')
+
+    def test_unsupported_source(self):
+        with self.assertRaises(ValueError):
+            BATCH.record_id({'EventSource': 'aws:sns'})
+
+    def test_unsupported_source_fails_the_whole_batch(self):
+        records = [sqs_record('0'), {'EventSource': 'aws:sns'}, sqs_record('2')]
+
+        def handle(record):
+            raise RuntimeError('down')
+
+        response = BATCH.process_batch(records, handle)
+        self.assertEqual([failure['itemIdentifier'] for failure in response['batchItemFailures']],
+                         ['0', '', '2'])
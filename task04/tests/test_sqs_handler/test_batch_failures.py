@@ -0,0 +1,34 @@
+from unittest import mock
+
+from tests.test_sqs_handler import SqsHandlerLambdaTestCase
+
+
+def sqs_event(*message_ids):
+    return {'Records': [{'messageId': message_id,
+                         'body': f'{{"id": "{message_id}"}}',
+                         'eventSource': 'aws:sqs',
+                         'eventSourceARN': 'arn:aws:sqs:eu-west-1:123456789012:async_queue'}
+                        for message_id in message_ids]}
+
+
+class TestBatchFailures(SqsHandlerLambdaTestCase):
+
+    def test_only_failed_messages_are_reported(self):
+        handled = []
+        original = self.HANDLER.handle_record
+
+        def handle_record(record, context):
+            if record['messageId'] == 'b':
+                raise RuntimeError('poison message')
+            handled.append(record['messageId'])
+            return original(record, context)
+
+        with mock.patch.object(self.HANDLER, 'handle_record', handle_record):
+            response = self.HANDLER.lambda_handler(sqs_event('a', 'b', 'c'), None)
+
+        self.assertEqual(response, {'batchItemFailures': [{'itemIdentifier': 'b'}]})
+        self.assertEqual(handled, ['a', 'c'])
+
+    def test_whole_batch_succeeds(self):
+        response = self.HANDLER.lambda_handler(sqs_event('a', 'b'), None)
+        self.assertEqual(response, {'batchItemFailures': []})
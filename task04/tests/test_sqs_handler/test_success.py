@@ -4,5 +4,5 @@ from tests.test_sqs_handler import SqsHandlerLambdaTestCase
 class TestSuccess(SqsHandlerLambdaTestCase):
 
     def test_success(self):
-        self.assertEqual(self.HANDLER.handle_request(dict(), dict()), 200)
-
+        self.assertEqual(self.HANDLER.handle_request(dict(), dict()),
+                         {'batchItemFailures': []})
@@ -0,0 +1,145 @@
+import threading
+
+from commons.log_helper import get_logger
+
+_LOG = get_logger(__name__)
+
+CONNECT_TIMEOUT_SECONDS = 2
+READ_TIMEOUT_SECONDS = 10
+MAX_ATTEMPTS = 5
+MAX_POOL_CONNECTIONS = 32
+
+# boto3 and botocore are imported on the first client, not with this
+# module: a handler that imports commons.aws_clients at module level keeps
+# them out of its cold-start import until a route needs AWS
+
+
+def default_config():
+    """The botocore Config every client of the registry is created with"""
+    from botocore.config import Config
+
+    return Config(
+        connect_timeout=CONNECT_TIMEOUT_SECONDS,
+        read_timeout=READ_TIMEOUT_SECONDS,
+        retries={"max_attempts": MAX_ATTEMPTS, "mode": "adaptive"},
+        max_pool_connections=MAX_POOL_CONNECTIONS,
+        tcp_keepalive=True,
+    )
+
+# cheap calls that open a pooled connection of a client. Access errors are
+# fine: the connection is open, the endpoint resolved and the response
+# parser loaded by the time the error comes back
+PRIME_CALLS = {
+    "dynamodb": ("describe_endpoints", {}),
+    "ssm": ("describe_parameters", {"MaxResults": 1}),
+    "cognito-idp": ("list_user_pools", {"MaxResults": 1}),
+    "s3": ("list_buckets", {}),
+    "sqs": ("list_queues", {"MaxResults": 1}),
+    "sns": ("list_topics", {}),
+}
+
+
+def _botocore_client(instance):
+    meta = getattr(instance, "meta", None)
+    if meta is not None and hasattr(meta, "client"):
+        # a boto3 resource; its low-level client owns the connection pool
+        instance = meta.client
+        meta = getattr(instance, "meta", None)
+    return instance if hasattr(meta, "service_model") else None
+
+
+def prime(instance):
+    """
+    Opens a pooled connection of a boto3 client or resource with the
+    service's PRIME_CALLS call. Returns False when there is nothing to
+    prime (unknown service, or not a botocore client), True otherwise
+    """
+    client = _botocore_client(instance)
+    if client is None:
+        return False
+    call = PRIME_CALLS.get(client.meta.service_model.service_name)
+    if call is None:
+        return False
+    operation, params = call
+    from botocore.exceptions import ClientError
+
+    try:
+        getattr(client, operation)(**params)
+    except ClientError as e:
+        _LOG.debug("Priming %s: %s", operation, e)
+    return True
+
+
+class ClientRegistry:
+    """
+    Per-container cache of boto3 clients and resources. Each one is created
+    on first use with the shared botocore config and then reused by every
+    warm invocation, so connection pools survive between requests
+    """
+
+    def __init__(self, config=None):
+        self._config = config
+        self._session = None
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    @property
+    def config(self):
+        if self._config is None:
+            self._config = default_config()
+        return self._config
+
+    @property
+    def session(self):
+        if self._session is None:
+            import boto3.session
+
+            self._session = boto3.session.Session()
+        return self._session
+
+    def _get(self, kind, service_name, region_name, endpoint_url):
+        key = (kind, service_name, region_name, endpoint_url)
+        instance = self._clients.get(key)
+        if instance is not None:
+            return instance
+        with self._lock:
+            instance = self._clients.get(key)
+            if instance is None:
+                factory = self.session.client if kind == "client" else self.session.resource
+                instance = factory(
+                    service_name,
+                    region_name=region_name,
+                    endpoint_url=endpoint_url,
+                    config=self.config,
+                )
+                self._clients[key] = instance
+        return instance
+
+    def client(self, service_name, region_name=None, endpoint_url=None):
+        return self._get("client", service_name, region_name, endpoint_url)
+
+    def resource(self, service_name, region_name=None, endpoint_url=None):
+        return self._get("resource", service_name, region_name, endpoint_url)
+
+    def created(self):
+        return list(self._clients)
+
+    def prime(self):
+        """Opens a connection of every client and resource created so far"""
+        return {key: prime(instance) for key, instance in list(self._clients.items())}
+
+    def clear(self):
+        with self._lock:
+            self._clients = {}
+            self._session = None
+
+
+REGISTRY = ClientRegistry()
+
+
+def client(service_name, region_name=None, endpoint_url=None):
+    return REGISTRY.client(service_name, region_name, endpoint_url)
+
+
+def resource(service_name, region_name=None, endpoint_url=None):
+    return REGISTRY.resource(service_name, region_name, endpoint_url)
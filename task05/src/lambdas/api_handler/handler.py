@@ -2,7 +2,7 @@ import datetime
 import os
 import uuid
 import json
-import boto3
+from commons import aws_clients
 from commons.log_helper import get_logger
 from commons.abstract_lambda import AbstractLambda
 
@@ -13,6 +13,9 @@ class ApiHandler(AbstractLambda):
     def validate_request(self, event) -> dict:
         pass
 
+    def prime(self):
+        aws_clients.prime(aws_clients.resource("dynamodb", region_name=os.environ.get("region", "eu-central-1")))
+
     def handle_request(self, event, context):
         """
         Process the incoming event and store it in DynamoDB.
@@ -27,7 +30,7 @@ class ApiHandler(AbstractLambda):
 
         _LOG.info("Saving item: %s", item)
 
-        dynamodb = boto3.resource("dynamodb", region_name=os.environ.get("region", "eu-central-1"))
+        dynamodb = aws_clients.resource("dynamodb", region_name=os.environ.get("region", "eu-central-1"))
         table_name = os.environ.get("target_table")
 
         if not table_name:
@@ -0,0 +1,212 @@
+import collections
+import functools
+import hashlib
+import json
+import threading
+import time
+
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+
+from commons.exception import ApplicationException
+
+IDEMPOTENCY_TTL_SECONDS = 3600
+IN_PROGRESS_TTL_SECONDS = 60
+CACHE_SIZE = 1024
+
+STATUS_IN_PROGRESS = "IN_PROGRESS"
+STATUS_COMPLETED = "COMPLETED"
+
+RESPONSE_CONFLICT_CODE = 409
+RESPONSE_UNPROCESSABLE_CODE = 422
+
+
+class IdempotencyStore:
+    """
+    Two-tier store of completed results: an in-memory LRU of this container
+    in front of a DynamoDB table shared by all containers.
+
+    The table is keyed by a string "id" and has TTL enabled on the
+    "expiration" attribute (epoch seconds). Keys are claimed with a
+    conditional put, so only one invocation runs a given key at a time; a
+    claim left by an invocation that died expires after in_progress_ttl
+    """
+
+    def __init__(
+        self,
+        table,
+        ttl=IDEMPOTENCY_TTL_SECONDS,
+        in_progress_ttl=IN_PROGRESS_TTL_SECONDS,
+        cache_size=CACHE_SIZE,
+        clock=time.time,
+    ):
+        self.table = table
+        self.ttl = ttl
+        self.in_progress_ttl = in_progress_ttl
+        self.cache_size = cache_size
+        self._clock = clock
+        self._cache = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _cached(self, key, now):
+        with self._lock:
+            record = self._cache.get(key)
+            if record is None:
+                return None
+            if record["expiration"] <= now:
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return record
+
+    def _remember(self, key, record):
+        with self._lock:
+            self._cache[key] = record
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _replay(self, record, fingerprint):
+        if fingerprint is not None and record.get("fingerprint") not in (None, fingerprint):
+            raise ApplicationException(
+                code=RESPONSE_UNPROCESSABLE_CODE,
+                content="Idempotency key was already used for a different request",
+            )
+        self.hits += 1
+        return json.loads(record["result"])
+
+    def begin(self, key, fingerprint=None):
+        """
+        Claims key for this invocation. Returns (True, result) when the key
+        already completed, (False, None) when the caller should run.
+        Raises ApplicationException 409 while another invocation holds it
+        """
+        now = int(self._clock())
+        record = self._cached(key, now)
+        if record is not None:
+            return True, self._replay(record, fingerprint)
+        item = {
+            "id": key,
+            "status": STATUS_IN_PROGRESS,
+            "expiration": now + self.in_progress_ttl,
+        }
+        if fingerprint is not None:
+            item["fingerprint"] = fingerprint
+        try:
+            self.table.put_item(
+                Item=item,
+                ConditionExpression=Attr("id").not_exists() | Attr("expiration").lte(now),
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+            existing = self.table.get_item(Key={"id": key}, ConsistentRead=True).get("Item")
+            if existing is None or existing["status"] != STATUS_COMPLETED:
+                raise ApplicationException(
+                    code=RESPONSE_CONFLICT_CODE,
+                    content="A request with this idempotency key is in progress",
+                )
+            existing["expiration"] = int(existing["expiration"])
+            self._remember(key, existing)
+            return True, self._replay(existing, fingerprint)
+        self.misses += 1
+        return False, None
+
+    def complete(self, key, result, fingerprint=None):
+        record = {
+            "id": key,
+            "status": STATUS_COMPLETED,
+            "result": json.dumps(result, default=str),
+            "expiration": int(self._clock()) + self.ttl,
+        }
+        if fingerprint is not None:
+            record["fingerprint"] = fingerprint
+        self.table.put_item(Item=record)
+        self._remember(key, record)
+
+    def abandon(self, key):
+        """Releases the claim of a failed invocation so a retry can run"""
+        self.table.delete_item(Key={"id": key})
+
+
+def header_key(name="Idempotency-Key"):
+    """
+    Key extractor for API Gateway events: the request header `name`,
+    scoped to the method, path and, when authenticated, the caller's sub
+    """
+
+    def extract(event):
+        headers = event.get("headers") or {}
+        value = next((v for k, v in headers.items() if k.lower() == name.lower()), None)
+        if not value:
+            return None
+        claims = (event.get("requestContext") or {}).get("authorizer", {}).get("claims") or {}
+        method = event.get("httpMethod") or event.get("requestContext", {}).get("http", {}).get("method")
+        path = event.get("path") or event.get("rawPath")
+        return f"{method} {path} {claims.get('sub', '')} {value}"
+
+    return extract
+
+
+def body_fingerprint(event):
+    return hashlib.sha256((event.get("body") or "").encode()).hexdigest()
+
+
+def error_response(status_code, message):
+    return {
+        "statusCode": status_code,
+        "headers": {"Content-Type": "application/json"},
+        "body": json.dumps({"message": message}),
+        "isBase64Encoded": False,
+    }
+
+
+def idempotent(key, store, fingerprint=None, error_response=error_response):
+    """
+    Makes a handler method (self, event, ...) run at most once per key.
+
+    :param key: event -> key string, or None to run without idempotency
+    :param store: IdempotencyStore, or self -> IdempotencyStore for stores
+        created lazily on the handler
+    :param fingerprint: optional event -> str; a key replayed with another
+        fingerprint is rejected with 422 instead of returning the result
+    :param error_response: (status code, message) -> response of a key in
+        progress elsewhere (409) or reused with another fingerprint (422)
+
+    A duplicate returns the stored result without running the method.
+    Results are stored unless the method raises or returns a statusCode of
+    500 or more, in which case the claim is released for the retry
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, event, *args, **kwargs):
+            event_key = key(event)
+            if event_key is None:
+                return method(self, event, *args, **kwargs)
+            event_key = f"{method.__qualname__}#{event_key}"
+            resolved = store(self) if callable(store) else store
+            event_fingerprint = fingerprint(event) if fingerprint else None
+            try:
+                replayed, result = resolved.begin(event_key, event_fingerprint)
+            except ApplicationException as e:
+                return error_response(e.code, e.content)
+            if replayed:
+                return result
+            try:
+                result = method(self, event, *args, **kwargs)
+            except Exception:
+                resolved.abandon(event_key)
+                raise
+            status = result.get("statusCode") if isinstance(result, dict) else None
+            if isinstance(status, int) and status >= 500:
+                resolved.abandon(event_key)
+            else:
+                resolved.complete(event_key, result, event_fingerprint)
+            return result
+
+        return wrapper
+
+    return decorator
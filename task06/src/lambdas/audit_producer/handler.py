@@ -1,29 +1,42 @@
+import functools
 import os
 
+from commons import aws_clients, raise_error_response
+from commons.idempotency import IdempotencyStore, idempotent
 from commons.log_helper import get_logger
-from commons.abstract_lambda import AbstractLambda
-import boto3
+from commons.batch import BatchLambda
 import uuid
 from datetime import datetime, timezone
 
 _LOG = get_logger(__name__)
 
 
-class AuditProducer(AbstractLambda):
+class AuditProducer(BatchLambda):
 
-    def validate_request(self, event) -> dict:
-        pass
+    @functools.cached_property
+    def idempotency_store(self):
+        table_name = os.getenv('idempotency_table', 'AuditIdempotency')
+        return IdempotencyStore(aws_clients.resource("dynamodb").Table(table_name))
 
-    def handle_request(self, event, context):
+    def prime(self):
+        aws_clients.prime(aws_clients.resource("dynamodb"))
+
+    # the stream is retried from the first failed record, so an already
+    # audited change (same stream eventID) must not be written again; a
+    # record still in progress elsewhere raises and is reported as failed
+    # instead of being answered with an HTTP response
+    @idempotent(key=lambda conf_item: conf_item["eventID"],
+                store=lambda self: self.idempotency_store,
+                error_response=raise_error_response)
+    def handle_record(self, conf_item, context):
         """
-        Explain incoming event here
+        Writes the audit entry of one Configuration change
         """
-        dynamodb = boto3.resource("dynamodb")
+        dynamodb = aws_clients.resource("dynamodb")
         table_name = os.getenv('table_name')
 
         audit_table = dynamodb.Table(table_name)
 
-        conf_item = event.get("Records")[0]
         audit_item = None
         if conf_item["eventName"] == "INSERT":
             audit_item = {"id": str(uuid.uuid4()),
@@ -43,6 +56,9 @@ class AuditProducer(AbstractLambda):
                           "newValue": int(conf_item["dynamodb"]["NewImage"]["value"]["N"])
                           }
 
+        if audit_item is None:
+            # REMOVE is not audited; raising would hold up the shard
+            return
         audit_table.put_item(Item=audit_item)
 
 
@@ -3,7 +3,7 @@ from commons.abstract_lambda import AbstractLambda
 
 _LOG = get_logger(__name__)
 
-import boto3
+from commons import aws_clients
 import uuid
 import json
 import os
@@ -15,9 +15,12 @@ class UuidGenerator(AbstractLambda):
     def validate_request(self, event) -> dict:
         pass
         
+    def prime(self):
+        aws_clients.prime(aws_clients.client('s3'))
+
     def handle_request(self, event, context):
         BUCKET_NAME = os.getenv('S3_BUCKET_NAME', 'uuid-storage')
-        s3_client = boto3.client('s3')
+        s3_client = aws_clients.client('s3')
 
         try:
             uuids = [str(uuid.uuid4()) for _ in range(10)]
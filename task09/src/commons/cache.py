@@ -0,0 +1,273 @@
+import collections
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from commons.log_helper import get_logger
+
+_LOG = get_logger(__name__)
+
+TTL_SECONDS = 600
+MAX_STALE_SECONDS = 3600
+LEASE_SECONDS = 30
+CACHE_SIZE = 256
+
+TIER_MEMORY = "memory"
+TIER_SHARED = "shared"
+TIER_ORIGIN = "origin"
+
+
+class CacheEntry:
+    __slots__ = ("value", "fetched_at")
+
+    def __init__(self, value, fetched_at):
+        self.value = value
+        self.fetched_at = fetched_at
+
+
+class CacheResult:
+    """What TieredCache.get served: the value, the tier it came from, its
+    age in seconds and whether it was stale (a refresh was started)"""
+
+    __slots__ = ("value", "tier", "age", "stale")
+
+    def __init__(self, value, tier, age, stale=False):
+        self.value = value
+        self.tier = tier
+        self.age = age
+        self.stale = stale
+
+    @property
+    def hit(self):
+        return self.tier != TIER_ORIGIN
+
+
+class DynamoDBCacheTier:
+    """
+    Shared tier: one item per key in a table keyed by a string "id", with
+    TTL enabled on "expiration" (epoch seconds). Values are strings.
+
+    lease() is a conditional update on "refreshLease", so of all the
+    containers that find an entry stale only one refreshes it; put() drops
+    the lease, and a lease left by a container that died runs out
+    """
+
+    def __init__(self, table, retention=TTL_SECONDS + MAX_STALE_SECONDS):
+        self.table = table
+        self.retention = retention
+
+    def get(self, key):
+        item = self.table.get_item(Key={"id": key}).get("Item")
+        if item is None or "value" not in item:
+            return None
+        return CacheEntry(item["value"], float(item["fetchedAt"]))
+
+    def put(self, key, entry):
+        self.table.put_item(
+            Item={
+                "id": key,
+                "value": entry.value,
+                "fetchedAt": Decimal(str(round(entry.fetched_at, 3))),
+                "expiration": int(entry.fetched_at + self.retention),
+            }
+        )
+
+    def lease(self, key, now, seconds=LEASE_SECONDS):
+        # imported here: the table is only touched after the handler's cold
+        # start, which should not pay for loading boto3 and botocore
+        from boto3.dynamodb.conditions import Attr
+        from botocore.exceptions import ClientError
+
+        try:
+            self.table.update_item(
+                Key={"id": key},
+                UpdateExpression="SET refreshLease = :until",
+                ConditionExpression=Attr("refreshLease").not_exists()
+                | Attr("refreshLease").lte(int(now)),
+                ExpressionAttributeValues={":until": int(now) + seconds},
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+            return False
+        return True
+
+
+class TieredCache:
+    """
+    Stale-while-revalidate cache: an in-process LRU in front of an optional
+    shared tier (DynamoDB, see DynamoDBCacheTier).
+
+    An entry younger than ttl is fresh and served as is. Up to max_stale
+    seconds later it is stale: it is still served right away, and one
+    background refresh per key (one per fleet, with the shared tier's
+    lease) loads a new value. Older entries and misses are loaded in the
+    request, one load per key at a time in this container.
+
+    Lambda freezes the container between invocations, so a refresh that
+    has not finished when the response is returned resumes with the next
+    invocation; drain() waits for the running ones
+    """
+
+    def __init__(
+        self,
+        shared=None,
+        ttl=TTL_SECONDS,
+        max_stale=MAX_STALE_SECONDS,
+        lease_seconds=LEASE_SECONDS,
+        cache_size=CACHE_SIZE,
+        clock=time.time,
+    ):
+        self.shared = shared
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.lease_seconds = lease_seconds
+        self.cache_size = cache_size
+        self._clock = clock
+        self._cache = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = collections.OrderedDict()
+        self._refreshing = {}
+        self._executor = None
+        self.counts = collections.Counter()
+
+    def _cached(self, key):
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+            return entry
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._cache[key] = entry
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _shared_get(self, key):
+        if self.shared is None:
+            return None
+        try:
+            return self.shared.get(key)
+        except Exception as e:
+            _LOG.warning("Shared cache read failed for %s: %s", key, e)
+            return None
+
+    def _shared_put(self, key, entry):
+        if self.shared is None:
+            return
+        try:
+            self.shared.put(key, entry)
+        except Exception as e:
+            _LOG.warning("Shared cache write failed for %s: %s", key, e)
+
+    def _usable(self, entry, now):
+        return entry is not None and now - entry.fetched_at < self.ttl + self.max_stale
+
+    def get(self, key, load):
+        """
+        Value of key, calling load() (which returns a string) when no
+        usable entry is cached. Errors of load() on a miss propagate
+        """
+        now = self._clock()
+        entry, tier = self._cached(key), TIER_MEMORY
+        if not self._usable(entry, now):
+            entry, tier = self._shared_get(key), TIER_SHARED
+            if self._usable(entry, now):
+                self._remember(key, entry)
+        if self._usable(entry, now):
+            age = max(now - entry.fetched_at, 0.0)
+            stale = age >= self.ttl
+            if stale:
+                self.counts["stale"] += 1
+                self._refresh_in_background(key, load)
+            self.counts[tier] += 1
+            return CacheResult(entry.value, tier, age, stale)
+        entry, tier = self._load(key, load)
+        self.counts[tier] += 1
+        return CacheResult(entry.value, tier, max(self._clock() - entry.fetched_at, 0.0))
+
+    def _key_lock(self, key):
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            self._key_locks.move_to_end(key)
+            # bounded like _cache; a lock evicted while held only lets a
+            # concurrent miss of its key load it a second time
+            while len(self._key_locks) > self.cache_size:
+                self._key_locks.popitem(last=False)
+            return lock
+
+    def _load(self, key, load):
+        with self._key_lock(key):
+            # a concurrent request may have loaded it while this one waited
+            entry = self._cached(key)
+            if entry is not None and self._clock() - entry.fetched_at < self.ttl:
+                return entry, TIER_MEMORY
+            entry = CacheEntry(load(), self._clock())
+            self._remember(key, entry)
+            self._shared_put(key, entry)
+            return entry, TIER_ORIGIN
+
+    def _refresh_in_background(self, key, load):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=2, thread_name_prefix="cache-refresh"
+                )
+            self._refreshing[key] = self._executor.submit(self._refresh, key, load)
+
+    def _refresh(self, key, load):
+        try:
+            now = self._clock()
+            # another container may already have refreshed the shared entry
+            entry = self._shared_get(key)
+            if entry is not None and now - entry.fetched_at < self.ttl:
+                self._remember(key, entry)
+                return
+            if self.shared is not None and not self._lease(key, now):
+                self.counts["lease_denied"] += 1
+                return
+            entry = CacheEntry(load(), self._clock())
+            self._remember(key, entry)
+            self._shared_put(key, entry)
+            self.counts["refreshed"] += 1
+        except Exception as e:
+            self.counts["refresh_failed"] += 1
+            _LOG.warning("Cache refresh failed for %s: %s", key, e)
+        finally:
+            with self._lock:
+                self._refreshing.pop(key, None)
+
+    def _lease(self, key, now):
+        try:
+            return self.shared.lease(key, now, self.lease_seconds)
+        except Exception as e:
+            # without the shared tier's lease, refresh anyway
+            _LOG.warning("Cache lease failed for %s: %s", key, e)
+            return True
+
+    def drain(self, timeout=None):
+        """Waits for the background refreshes that are running"""
+        with self._lock:
+            futures = list(self._refreshing.values())
+        for future in futures:
+            future.result(timeout)
+
+    def stats(self):
+        """Served counts per tier, stale serves and refresh outcomes, and the
+        hit ratio (memory and shared serves over all serves)"""
+        counts = dict(self.counts)
+        hits = counts.get(TIER_MEMORY, 0) + counts.get(TIER_SHARED, 0)
+        served = hits + counts.get(TIER_ORIGIN, 0)
+        counts["hit_ratio"] = hits / served if served else 0.0
+        return counts
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
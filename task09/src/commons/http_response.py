@@ -0,0 +1,183 @@
+import base64
+import zlib
+
+from commons.abstract_lambda import Middleware
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# below this many bytes the compressed body plus base64 overhead saves
+# too little to pay for the compression
+MIN_COMPRESS_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+# distinct Accept-Encoding values remembered per container
+NEGOTIATION_CACHE_SIZE = 256
+
+
+def accept_encoding(event):
+    """The Accept-Encoding request header of a REST (v1), HTTP API (v2) or
+    Function URL event, whose header names may be lower case"""
+    headers = event.get("headers") or {}
+    value = headers.get("Accept-Encoding")
+    if value is None:
+        value = headers.get("accept-encoding")
+    if value is None:
+        value = next((v for k, v in headers.items() if k.lower() == "accept-encoding"), None)
+    return value
+
+
+def decodes_base64(event):
+    """
+    Whether the service that invoked the lambda decodes isBase64Encoded
+    bodies whatever their content type: Function URLs and HTTP APIs with
+    payload format 2.0 do. A REST API only decodes the binaryMediaTypes it
+    declares and sends anything else on as base64 text
+    """
+    return event.get("version") == "2.0" or "http" in (event.get("requestContext") or {})
+
+
+def parse_accept_encoding(value):
+    """{coding: q} of an Accept-Encoding header; codings with q=0 are refused"""
+    accepted = {}
+    for part in value.split(","):
+        coding, *params = part.strip().split(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, number = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(number)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def _gzip(data, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+class ResponseBuilder:
+    """
+    Builds Lambda proxy responses (API Gateway and Function URLs) and
+    compresses large bodies with the best encoding the client accepts.
+
+    Header dicts are built once per builder and shared by the responses it
+    returns, so a caller must copy them before adding a header. Compressed
+    bodies are base64 encoded with isBase64Encoded set: only compress
+    responses for callers that decode them (see decodes_base64)
+    """
+
+    def __init__(
+        self,
+        content_type="application/json",
+        headers=None,
+        min_size=MIN_COMPRESS_BYTES,
+        gzip_level=GZIP_LEVEL,
+        brotli_quality=BROTLI_QUALITY,
+    ):
+        self.min_size = min_size
+        self.headers = {"Content-Type": content_type, **(headers or {}), "Vary": "Accept-Encoding"}
+        # server preference when the client weighs codings equally
+        self._compressors = {}
+        if brotli is not None:
+            self._compressors["br"] = lambda data: brotli.compress(
+                data, mode=brotli.MODE_TEXT, quality=brotli_quality
+            )
+        self._compressors["gzip"] = lambda data: _gzip(data, gzip_level)
+        self._encoded_headers = {
+            coding: {**self.headers, "Content-Encoding": coding} for coding in self._compressors
+        }
+        self._negotiated = {}
+
+    @property
+    def encodings(self):
+        return tuple(self._compressors)
+
+    def negotiate(self, value):
+        """The coding to use for an Accept-Encoding value, or None"""
+        if not value:
+            return None
+        try:
+            return self._negotiated[value]
+        except KeyError:
+            pass
+        accepted = parse_accept_encoding(value)
+        wildcard = accepted.get("*", 0.0)
+        best, best_quality = None, 0.0
+        for coding in self._compressors:
+            quality = accepted.get(coding, wildcard)
+            if quality > best_quality:
+                best, best_quality = coding, quality
+        if len(self._negotiated) >= NEGOTIATION_CACHE_SIZE:
+            self._negotiated.clear()
+        self._negotiated[value] = best
+        return best
+
+    def build(self, status_code, body):
+        return {
+            "statusCode": status_code,
+            "headers": self.headers,
+            "body": body,
+            "isBase64Encoded": False,
+        }
+
+    def compress(self, response, accept_encoding_value):
+        """
+        Returns response with its body compressed when it is a text body of
+        at least min_size bytes, the client accepts a supported coding and
+        compression makes it smaller; otherwise response itself
+        """
+        if not isinstance(response, dict) or response.get("isBase64Encoded"):
+            return response
+        body = response.get("body")
+        if not isinstance(body, str) or len(body) < self.min_size:
+            return response
+        headers = response.get("headers")
+        if headers and any(name.lower() == "content-encoding" for name in headers):
+            return response
+        coding = self.negotiate(accept_encoding_value)
+        if coding is None:
+            return response
+        data = body.encode()
+        compressed = self._compressors[coding](data)
+        # Lambda's response size limit applies to the base64 text, which is
+        # a third larger than the compressed bytes
+        if len(compressed) * 4 // 3 >= len(data):
+            return response
+        if headers is None or headers is self.headers:
+            headers = self._encoded_headers[coding]
+        else:
+            headers = {**headers, "Content-Encoding": coding, "Vary": "Accept-Encoding"}
+        return {
+            **response,
+            "headers": headers,
+            "body": base64.b64encode(compressed).decode("ascii"),
+            "isBase64Encoded": True,
+        }
+
+
+class CompressionMiddleware(Middleware):
+    """
+    Compresses the responses of the lambda with builder.compress when the
+    event came through a Function URL or an HTTP API (payload format 2.0).
+    REST API events are left alone, since without binaryMediaTypes the
+    client would get base64 text labelled Content-Encoding: gzip; pass
+    rest_api=True for a REST API whose binaryMediaTypes cover the responses
+    """
+
+    def __init__(self, builder, rest_api=False):
+        self.builder = builder
+        self.rest_api = rest_api
+
+    def after(self, event, context, response):
+        if not (self.rest_api or decodes_base64(event)):
+            return response
+        return self.builder.compress(response, accept_encoding(event))
@@ -1,45 +1,130 @@
 from commons.log_helper import get_logger
 from commons.abstract_lambda import AbstractLambda
+from commons import aws_clients
+from commons.cache import DynamoDBCacheTier, TieredCache
+from commons.http_response import CompressionMiddleware, ResponseBuilder
+from commons.router import Router
+from functools import cached_property
+import os
+import re
 import requests
+try:
+    # deployed: the weather_sdk layer is on sys.path
+    import weather_sdk
+except ImportError:
+    from lambdas.layers.weather_sdk import weather_sdk
 _LOG = get_logger(__name__)
 import json
 
+ROUTER = Router()
+RESPONSES = ResponseBuilder()
+
+# 2 decimals is ~1 km, well inside the forecast grid cell
+COORDINATE_DECIMALS = 2
+VARIABLE = re.compile(r'^[a-z0-9_]+$')
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def _coordinate(params, name, default, limit):
+    value = params.get(name)
+    if value is None:
+        return round(default, COORDINATE_DECIMALS)
+    try:
+        number = float(value)
+    except ValueError:
+        raise BadRequest(f'{name} must be a number')
+    if not -limit <= number <= limit:
+        raise BadRequest(f'{name} must be between -{limit} and {limit}')
+    return round(number, COORDINATE_DECIMALS)
+
+
+def _variables(params, name, default):
+    value = params.get(name)
+    if value is None:
+        return default
+    names = tuple(sorted({part.strip() for part in value.split(',') if part.strip()}))
+    if not all(VARIABLE.match(part) for part in names):
+        raise BadRequest(f'{name} must be a comma separated list of variable names')
+    return names
+
+
+def forecast_query(event):
+    """
+    (latitude, longitude, current, hourly) of a GET /weather request, with
+    the coordinates rounded so that nearby requests share a cache entry
+    """
+    params = event.get('queryStringParameters') or {}
+    return (
+        _coordinate(params, 'latitude', weather_sdk.DEFAULT_LATITUDE, 90),
+        _coordinate(params, 'longitude', weather_sdk.DEFAULT_LONGITUDE, 180),
+        _variables(params, 'current', weather_sdk.DEFAULT_CURRENT),
+        _variables(params, 'hourly', weather_sdk.DEFAULT_HOURLY),
+    )
+
+
+def cache_key(latitude, longitude, current, hourly):
+    return (f'forecast:{latitude:.{COORDINATE_DECIMALS}f},{longitude:.{COORDINATE_DECIMALS}f}'
+            f':current={",".join(current)}:hourly={",".join(hourly)}')
+
+
 class ApiHandler(AbstractLambda):
+    # the hourly forecast is several KB of JSON; compress it when accepted
+    middlewares = (CompressionMiddleware(RESPONSES),)
+
+    @cached_property
+    def weather_cache(self):
+        ttl = int(os.environ.get('cache_ttl', 600))
+        max_stale = int(os.environ.get('cache_max_stale', 3600))
+        table_name = os.environ.get('cache_table')
+        shared = None
+        if table_name:
+            shared = DynamoDBCacheTier(
+                aws_clients.resource('dynamodb').Table(table_name), retention=ttl + max_stale)
+        return TieredCache(shared, ttl=ttl, max_stale=max_stale)
+
+    @cached_property
+    def weather(self):
+        return weather_sdk.Weather(os.environ.get('open_meteo_url', weather_sdk.FORECAST_URL))
+
+    def fetch_forecast(self, latitude, longitude, current, hourly):
+        return self.weather.get_weather(latitude, longitude, current, hourly).text
 
     def validate_request(self, event) -> dict:
         pass
-        
+
+    def prime(self):
+        aws_clients.prime(aws_clients.resource('dynamodb'))
+        # the default location is what most requests ask for
+        query = forecast_query({})
+        self.weather_cache.get(cache_key(*query), lambda: self.fetch_forecast(*query))
+
+    @ROUTER.route('GET', '/weather')
+    def get_weather(self, event):
+        try:
+            query = forecast_query(event)
+        except BadRequest as e:
+            return RESPONSES.build(400, json.dumps({'message': str(e)}))
+        try:
+            result = self.weather_cache.get(cache_key(*query), lambda: self.fetch_forecast(*query))
+        except requests.RequestException as e:
+            _LOG.error('Forecast request failed: %s', e)
+            return RESPONSES.build(502, json.dumps({'message': 'Forecast service unavailable'}))
+        self.put_metric('WeatherCacheHit', int(result.hit))
+        self.put_metric('WeatherCacheStale', int(result.stale))
+        self.put_metric('WeatherCacheAge', round(result.age, 3), 'Seconds')
+        return RESPONSES.build(200, result.value)
+
     def handle_request(self, event, context):
         """
         Explain incoming event here
         """
-        method = event.get('requestContext', {}).get('http', {}).get('method')
-        path = event.get('requestContext', {}).get('http', {}).get('path')
-
-        if path == '/weather' and method == 'GET':
-            weather = requests.get(
-                "https://api.open-meteo.com/v1/forecast?latitude=52.52&longitude=13.41&current=temperature_2m,wind_speed_10m&hourly=temperature_2m,relative_humidity_2m,wind_speed_10m")
-
-            return {
-                        "headers": {
-                            "Content-Type": "application/json"
-                            },
-                        "statusCode": 200,
-                        "body": weather.json()
-                        }
-        else :
-            return {
-                "statusCode": 400,
-                "body": {
-                "statusCode": 400,
-                "message": f"Bad request syntax or unsupported method. Request path: {path}. HTTP method: {method}"
-                },
-                "headers": {
-                "content-type": "application/json"
-                },
-                "isBase64Encoded": False
-            }
-    
+        # open-meteo calls give up before the function times out
+        with weather_sdk.deadline(context):
+            return ROUTER.dispatch(self, event)
+
 
 HANDLER = ApiHandler()
 
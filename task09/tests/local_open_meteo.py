@@ -0,0 +1,150 @@
+import gzip
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+def forecast(latitude, longitude, current, hourly, generation=0, start_hour=None, end_hour=None):
+    """
+    A payload shaped like open-meteo's /v1/forecast answer: 2024-05-01 or
+    the hours start_hour..end_hour, each variable at 10 + hour of day / 2
+    """
+    first = datetime.fromisoformat(start_hour) if start_hour else datetime(2024, 5, 1)
+    last = datetime.fromisoformat(end_hour) if end_hour else first + timedelta(hours=23)
+    hours = [first + timedelta(hours=h) for h in range((last - first) // timedelta(hours=1) + 1)]
+    return {
+        "latitude": latitude,
+        "longitude": longitude,
+        "generationtime_ms": 0.05,
+        "utc_offset_seconds": 0,
+        "timezone": "GMT",
+        "timezone_abbreviation": "GMT",
+        "elevation": 38.0,
+        "generation": generation,
+        "current": {"time": "2024-05-01T12:00", **{name: 18.2 for name in current}},
+        "hourly_units": {"time": "iso8601", **{name: "°C" for name in hourly}},
+        "hourly": {
+            "time": [hour.isoformat(timespec="minutes") for hour in hours],
+            **{name: [round(10 + hour.hour * 0.5, 1) for hour in hours] for name in hourly},
+        },
+    }
+
+
+class LocalOpenMeteo:
+    """
+    open-meteo stand-in served over HTTP on 127.0.0.1, for the code that
+    calls it with requests. Records the query and headers of every request.
+    Between requests, tests can change the status, the delay (per request
+    and per location) and the payload generation. Statuses queued in
+    failures are answered first, and a latitude in rejects gets the status
+    it maps to (open-meteo answers invalid coordinates with 400).
+    Comma separated coordinates get a list of forecasts, start_hour and
+    end_hour the hours between them. Bodies are gzipped
+    for clients that accept it. With validators on, responses carry an ETag
+    and a Last-Modified per generation, and matching conditional requests
+    get 304
+
+        with LocalOpenMeteo() as open_meteo:
+            os.environ["open_meteo_url"] = open_meteo.url
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.headers = []
+        self.status = 200
+        self.failures = []
+        self.delay = 0.0
+        self.delay_per_location = 0.0
+        self.generation = 0
+        self.validators = False
+        self.rejects = {}
+        self._server = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/v1/forecast"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # headers and body are separate writes; without this, keep-alive
+            # connections wait ~40 ms for a delayed ACK on each response
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                query = {k: v[0] for k, v in parse_qs(urlsplit(self.path).query).items()}
+                stub.requests.append(query)
+                stub.headers.append(dict(self.headers))
+                coordinates = list(
+                    zip(
+                        map(float, query["latitude"].split(",")),
+                        map(float, query["longitude"].split(",")),
+                    )
+                )
+                delay = stub.delay + stub.delay_per_location * len(coordinates)
+                if delay:
+                    time.sleep(delay)
+                status = stub.failures.pop(0) if stub.failures else stub.status
+                etag = f'"generation-{stub.generation}"'
+                last_modified = f"Wed, 01 May 2024 {stub.generation:02d}:00:00 GMT"
+                if status == 200 and stub.validators and (
+                    self.headers.get("If-None-Match") == etag
+                    or self.headers.get("If-Modified-Since") == last_modified
+                ):
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                for latitude, _ in coordinates:
+                    if status == 200 and latitude in stub.rejects:
+                        status = stub.rejects[latitude]
+                if status == 200:
+                    forecasts = [
+                        forecast(
+                            latitude,
+                            longitude,
+                            [name for name in query.get("current", "").split(",") if name],
+                            [name for name in query.get("hourly", "").split(",") if name],
+                            stub.generation,
+                            query.get("start_hour"),
+                            query.get("end_hour"),
+                        )
+                        for latitude, longitude in coordinates
+                    ]
+                    body = forecasts[0] if len(forecasts) == 1 else forecasts
+                else:
+                    body = {"error": True, "reason": "stub failure"}
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                if "gzip" in self.headers.get("Accept-Encoding", ""):
+                    payload = gzip.compress(payload)
+                    self.send_header("Content-Encoding", "gzip")
+                if status == 200 and stub.validators:
+                    self.send_header("ETag", etag)
+                    self.send_header("Last-Modified", last_modified)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+        ).start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._server.shutdown()
+        self._server.server_close()
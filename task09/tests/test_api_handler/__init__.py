@@ -0,0 +1,30 @@
+import os
+import unittest
+import importlib
+from tests import ImportFromSourceContext
+from tests.local_dynamodb import LocalTable
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "eu-west-1")
+
+with ImportFromSourceContext():
+    LAMBDA_HANDLER = importlib.import_module("lambdas.api_handler.handler")
+    CACHE = importlib.import_module("commons.cache")
+
+
+def local_handler(cache_table, **cache_options):
+    """ApiHandler whose shared cache tier is a local table"""
+    handler = LAMBDA_HANDLER.ApiHandler()
+    handler.weather_cache = CACHE.TieredCache(CACHE.DynamoDBCacheTier(cache_table), **cache_options)
+    return handler
+
+
+def local_cache_table():
+    return LocalTable("WeatherCache", hash_key="id")
+
+
+class ApiHandlerLambdaTestCase(unittest.TestCase):
+    """Common setups for this lambda"""
+
+    def setUp(self) -> None:
+        self.cache_table = local_cache_table()
+        self.HANDLER = local_handler(self.cache_table)
@@ -0,0 +1,126 @@
+import io
+import json
+import os
+from unittest import mock
+
+from tests.local_open_meteo import LocalOpenMeteo
+from tests.test_api_handler import ApiHandlerLambdaTestCase, local_handler
+
+
+def weather_event(**params):
+    return {
+        "httpMethod": "GET",
+        "path": "/weather",
+        "resource": "/weather",
+        "queryStringParameters": params or None,
+    }
+
+
+class TestWeather(ApiHandlerLambdaTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.open_meteo = LocalOpenMeteo().__enter__()
+        self.addCleanup(self.open_meteo.__exit__, None, None, None)
+        patcher = mock.patch.dict(os.environ, {"open_meteo_url": self.open_meteo.url})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, handler=None, **params):
+        handler = handler or self.HANDLER
+        handler.metrics_stream = io.StringIO()
+        response = handler.lambda_handler(weather_event(**params), None)
+        (line,) = [json.loads(line) for line in handler.metrics_stream.getvalue().splitlines()]
+        return response, line
+
+    def test_default_forecast(self):
+        response, _ = self.get()
+        self.assertEqual(response["statusCode"], 200)
+        body = json.loads(response["body"])
+        self.assertEqual((body["latitude"], body["longitude"]), (52.52, 13.41))
+        self.assertEqual(
+            self.open_meteo.requests,
+            [
+                {
+                    "latitude": "52.52",
+                    "longitude": "13.41",
+                    "current": "temperature_2m,wind_speed_10m",
+                    "hourly": "temperature_2m,relative_humidity_2m,wind_speed_10m",
+                }
+            ],
+        )
+
+    def test_repeated_requests_are_served_from_memory(self):
+        first, first_metrics = self.get()
+        second, second_metrics = self.get()
+        self.assertEqual(first["body"], second["body"])
+        self.assertEqual(len(self.open_meteo.requests), 1)
+        self.assertEqual((first_metrics["WeatherCacheHit"], second_metrics["WeatherCacheHit"]), (0, 1))
+        self.assertEqual(second_metrics["WeatherCacheStale"], 0)
+        self.assertIn(
+            {"Name": "WeatherCacheAge", "Unit": "Seconds"},
+            second_metrics["_aws"]["CloudWatchMetrics"][0]["Metrics"],
+        )
+
+    def test_nearby_coordinates_and_variable_order_share_an_entry(self):
+        self.get(latitude="50.0612", longitude="19.9372", hourly="wind_speed_10m,temperature_2m")
+        _, metrics = self.get(
+            latitude="50.06", longitude="19.94", hourly="temperature_2m,wind_speed_10m"
+        )
+        self.assertEqual(metrics["WeatherCacheHit"], 1)
+        self.assertEqual(len(self.open_meteo.requests), 1)
+        self.assertEqual(self.open_meteo.requests[0]["latitude"], "50.06")
+
+    def test_other_containers_share_the_table(self):
+        self.get()
+        _, metrics = self.get(local_handler(self.cache_table))
+        self.assertEqual(metrics["WeatherCacheHit"], 1)
+        self.assertEqual(len(self.open_meteo.requests), 1)
+
+    def test_stale_forecast_is_served_and_refreshed_once(self):
+        clock = [1_700_000_000.0]
+        handler = local_handler(self.cache_table, ttl=60, max_stale=600, clock=lambda: clock[0])
+        first, _ = self.get(handler)
+        self.open_meteo.generation = 1
+        clock[0] += 120
+        stale, metrics = self.get(handler)
+        again, _ = self.get(handler)
+        handler.weather_cache.drain(5)
+        refreshed, _ = self.get(handler)
+
+        self.assertEqual(stale["body"], first["body"])
+        self.assertEqual((metrics["WeatherCacheStale"], metrics["WeatherCacheAge"]), (1, 120))
+        self.assertEqual(again["body"], first["body"])
+        self.assertEqual(json.loads(refreshed["body"])["generation"], 1)
+        self.assertEqual(len(self.open_meteo.requests), 2)
+
+    def test_stale_forecast_outlives_an_upstream_outage(self):
+        clock = [1_700_000_000.0]
+        handler = local_handler(self.cache_table, ttl=60, max_stale=600, clock=lambda: clock[0])
+        self.get(handler)
+        self.open_meteo.status = 503
+        clock[0] += 120
+        response, _ = self.get(handler)
+        handler.weather_cache.drain(5)
+        self.assertEqual(response["statusCode"], 200)
+        self.assertEqual(self.get(handler)[0]["statusCode"], 200)
+
+    def test_upstream_failure_on_a_miss(self):
+        self.open_meteo.status = 500
+        response, _ = self.get()
+        self.assertEqual(response["statusCode"], 502)
+        self.open_meteo.status = 200
+        self.assertEqual(self.get()[0]["statusCode"], 200)
+
+    def test_invalid_query(self):
+        for params in ({"latitude": "north"}, {"longitude": "200"}, {"hourly": "temp;drop"}):
+            response = self.HANDLER.lambda_handler(weather_event(**params), None)
+            self.assertEqual(response["statusCode"], 400, params)
+        self.assertEqual(self.open_meteo.requests, [])
+
+    def test_warm_up_fills_the_default_entry(self):
+        with mock.patch("commons.aws_clients.prime"):
+            self.HANDLER.lambda_handler({"warm_up": True}, None)
+        _, metrics = self.get()
+        self.assertEqual(metrics["WeatherCacheHit"], 1)
+        self.assertEqual(len(self.open_meteo.requests), 1)
@@ -0,0 +1,5 @@
+import importlib
+from tests import ImportFromSourceContext
+
+with ImportFromSourceContext():
+    CACHE = importlib.import_module("commons.cache")
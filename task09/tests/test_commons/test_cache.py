@@ -0,0 +1,162 @@
+import threading
+import time
+import unittest
+
+from tests.local_dynamodb import LocalTable
+from tests.test_commons import CACHE
+
+
+class Clock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class Loader:
+    def __init__(self, error=None):
+        self.calls = 0
+        self.error = error
+
+    def __call__(self):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return f"value {self.calls}"
+
+
+class TestTieredCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.clock = Clock()
+        self.table = LocalTable("cache", hash_key="id")
+        self.shared = CACHE.DynamoDBCacheTier(self.table)
+        self.cache = CACHE.TieredCache(self.shared, ttl=60, max_stale=300, clock=self.clock)
+        self.load = Loader()
+
+    def other_container(self):
+        return CACHE.TieredCache(self.shared, ttl=60, max_stale=300, clock=self.clock)
+
+    def test_miss_then_memory_hit(self):
+        first = self.cache.get("k", self.load)
+        self.clock.now += 10
+        second = self.cache.get("k", self.load)
+        self.assertEqual((first.tier, first.value, first.hit), ("origin", "value 1", False))
+        self.assertEqual((second.tier, second.value, second.age), ("memory", "value 1", 10))
+        self.assertEqual(self.load.calls, 1)
+        self.assertEqual(self.cache.stats()["hit_ratio"], 0.5)
+
+    def test_other_containers_read_the_shared_tier(self):
+        self.cache.get("k", self.load)
+        other = self.other_container()
+        self.clock.now += 5
+        result = other.get("k", self.load)
+        self.assertEqual((result.tier, result.value, result.age), ("shared", "value 1", 5))
+        self.assertEqual(other.get("k", self.load).tier, "memory")
+        self.assertEqual(self.load.calls, 1)
+
+    def test_stale_is_served_while_one_refresh_runs(self):
+        self.cache.get("k", self.load)
+        self.clock.now += 61
+        gate = threading.Event()
+        slow_load = Loader()
+
+        def load():
+            gate.wait(5)
+            slow_load()
+            return "refreshed"
+
+        first = self.cache.get("k", load)
+        second = self.cache.get("k", load)
+        gate.set()
+        self.cache.drain(5)
+        self.assertEqual((first.value, first.stale), ("value 1", True))
+        self.assertEqual(second.value, "value 1")
+        self.assertEqual(slow_load.calls, 1)
+        fresh = self.cache.get("k", load)
+        self.assertEqual((fresh.value, fresh.stale), ("refreshed", False))
+        self.assertEqual(self.table.get_item(Key={"id": "k"})["Item"]["value"], "refreshed")
+        self.assertEqual(self.cache.stats()["refreshed"], 1)
+
+    def test_one_refresh_per_fleet(self):
+        self.cache.get("k", self.load)
+        self.clock.now += 61
+        self.assertTrue(self.shared.lease("k", self.clock()))
+        result = self.cache.get("k", self.load)
+        self.cache.drain(5)
+        self.assertTrue(result.stale)
+        self.assertEqual(self.load.calls, 1)
+        self.assertEqual(self.cache.stats()["lease_denied"], 1)
+
+    def test_refresh_adopts_a_newer_shared_entry(self):
+        self.cache.get("k", self.load)
+        self.clock.now += 61
+        self.shared.put("k", CACHE.CacheEntry("from another container", self.clock()))
+        self.cache.get("k", self.load)
+        self.cache.drain(5)
+        self.assertEqual(self.cache.get("k", self.load).value, "from another container")
+        self.assertEqual(self.load.calls, 1)
+
+    def test_failed_refresh_keeps_serving_stale(self):
+        self.cache.get("k", self.load)
+        self.clock.now += 61
+        failing = Loader(ConnectionError("upstream down"))
+        self.cache.get("k", failing)
+        self.cache.drain(5)
+        self.assertEqual(self.cache.get("k", failing).value, "value 1")
+        self.assertEqual(self.cache.stats()["refresh_failed"], 1)
+
+    def test_too_stale_is_loaded_in_the_request(self):
+        self.cache.get("k", self.load)
+        self.clock.now += 361
+        result = self.cache.get("k", self.load)
+        self.assertEqual((result.tier, result.value, result.stale), ("origin", "value 2", False))
+
+    def test_miss_errors_propagate(self):
+        with self.assertRaises(ConnectionError):
+            self.cache.get("k", Loader(ConnectionError("upstream down")))
+
+    def test_shared_tier_errors_fall_back_to_origin(self):
+        class Broken:
+            def get(self, key):
+                raise ConnectionError("dynamodb down")
+
+            def put(self, key, entry):
+                raise ConnectionError("dynamodb down")
+
+        cache = CACHE.TieredCache(Broken(), clock=self.clock)
+        self.assertEqual(cache.get("k", self.load).tier, "origin")
+        self.assertEqual(cache.get("k", self.load).tier, "memory")
+
+    def test_concurrent_misses_load_once(self):
+        cache = CACHE.TieredCache(clock=time.time)
+
+        def load():
+            time.sleep(0.05)
+            return self.load()
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get("k", load).value))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ["value 1"] * 5)
+        self.assertEqual(self.load.calls, 1)
+
+    def test_memory_tier_is_bounded(self):
+        cache = CACHE.TieredCache(cache_size=2, clock=self.clock)
+        for key in ("a", "b", "c"):
+            cache.get(key, self.load)
+        self.assertEqual(cache.get("a", self.load).tier, "origin")
+        self.assertEqual(cache.get("c", self.load).tier, "memory")
+        self.assertEqual(list(cache._key_locks), ["c", "a"])
+
+    def test_shared_items_expire_with_ttl(self):
+        self.cache.get("k", self.load)
+        item = self.table.get_item(Key={"id": "k"})["Item"]
+        self.assertEqual(item["expiration"], int(self.clock()) + CACHE.TTL_SECONDS + CACHE.MAX_STALE_SECONDS)
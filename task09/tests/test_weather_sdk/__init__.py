@@ -0,0 +1,5 @@
+import importlib
+from tests import ImportFromSourceContext
+
+with ImportFromSourceContext():
+    WEATHER_SDK = importlib.import_module("lambdas.layers.weather_sdk.weather_sdk")
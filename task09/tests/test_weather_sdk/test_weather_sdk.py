@@ -0,0 +1,221 @@
+import time
+import unittest
+from unittest import mock
+
+import requests
+
+from tests.local_open_meteo import LocalOpenMeteo
+from tests.test_weather_sdk import WEATHER_SDK
+
+
+class Context:
+    def __init__(self, remaining_ms):
+        self.remaining_ms = remaining_ms
+
+    def get_remaining_time_in_millis(self):
+        return self.remaining_ms
+
+
+class TestWeather(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.open_meteo = LocalOpenMeteo().__enter__()
+        self.addCleanup(self.open_meteo.__exit__, None, None, None)
+        self.sleeps = []
+        self.weather = WEATHER_SDK.Weather(self.open_meteo.url, sleep=self.sleeps.append)
+
+    def test_default_forecast(self):
+        forecast = self.weather.get_weather()
+        self.assertEqual(forecast.json()["latitude"], 52.52)
+        self.assertEqual(
+            self.open_meteo.requests[0],
+            {
+                "latitude": "52.52",
+                "longitude": "13.41",
+                "current": "temperature_2m,wind_speed_10m",
+                "hourly": "temperature_2m,relative_humidity_2m,wind_speed_10m",
+            },
+        )
+
+    def test_other_parameters_are_passed(self):
+        forecast = self.weather.get_weather(
+            current=(), start_hour="2024-05-02T00:00", end_hour="2024-05-02T05:00"
+        )
+        self.assertEqual(self.open_meteo.requests[0]["start_hour"], "2024-05-02T00:00")
+        self.assertNotIn("current", self.open_meteo.requests[0])
+        self.assertEqual(len(forecast.json()["hourly"]["time"]), 6)
+
+    def test_pooled_session_keeps_connections_alive_and_asks_for_gzip(self):
+        self.weather.get_weather()
+        self.weather.get_weather()
+        first, second = self.open_meteo.headers
+        self.assertEqual(first["Accept-Encoding"], "gzip, deflate")
+        self.assertNotEqual(first.get("Connection"), "close")
+        self.assertIs(self.weather.session, WEATHER_SDK.SESSION)
+        adapter = WEATHER_SDK.SESSION.get_adapter(self.open_meteo.url)
+        self.assertEqual(adapter._pool_maxsize, WEATHER_SDK.POOL_SIZE)
+
+    def test_retries_with_jitter(self):
+        self.open_meteo.failures = [503, 502]
+        forecast = self.weather.get_weather()
+        self.assertEqual(forecast.attempts, 3)
+        self.assertEqual(len(self.sleeps), 2)
+        self.assertTrue(0 <= self.sleeps[0] <= WEATHER_SDK.BACKOFF_BASE_SECONDS)
+        self.assertTrue(0 <= self.sleeps[1] <= 2 * WEATHER_SDK.BACKOFF_BASE_SECONDS)
+
+    def test_retries_are_bounded(self):
+        self.open_meteo.failures = [500, 500, 500, 500]
+        with self.assertRaises(requests.HTTPError):
+            self.weather.get_weather()
+        self.assertEqual(len(self.open_meteo.requests), WEATHER_SDK.MAX_ATTEMPTS)
+
+    def test_client_errors_are_not_retried(self):
+        self.open_meteo.failures = [400]
+        with self.assertRaises(requests.HTTPError):
+            self.weather.get_weather()
+        self.assertEqual(len(self.open_meteo.requests), 1)
+
+    def test_connection_errors_are_retried(self):
+        weather = WEATHER_SDK.Weather("http://127.0.0.1:9/v1/forecast", sleep=self.sleeps.append)
+        with self.assertRaises(requests.ConnectionError):
+            weather.get_weather()
+        self.assertEqual(len(self.sleeps), WEATHER_SDK.MAX_ATTEMPTS - 1)
+
+    def test_revalidation(self):
+        self.open_meteo.validators = True
+        first = self.weather.get_weather()
+        second = self.weather.get_weather()
+        self.assertEqual(self.open_meteo.headers[1]["If-None-Match"], '"generation-0"')
+        self.assertIn("If-Modified-Since", self.open_meteo.headers[1])
+        self.assertTrue(second.revalidated)
+        self.assertEqual(second.text, first.text)
+
+        self.open_meteo.generation = 1
+        third = self.weather.get_weather()
+        self.assertFalse(third.revalidated)
+        self.assertEqual(third.json()["generation"], 1)
+
+    def test_no_validators_no_conditional_request(self):
+        self.weather.get_weather()
+        self.weather.get_weather()
+        self.assertNotIn("If-None-Match", self.open_meteo.headers[1])
+
+    def test_large_bodies_are_not_kept_for_revalidation(self):
+        self.open_meteo.validators = True
+        with mock.patch.object(WEATHER_SDK, "VALIDATED_MAX_ENTRY_CHARS", 10):
+            self.weather.get_weather()
+            second = self.weather.get_weather()
+        self.assertNotIn("If-None-Match", self.open_meteo.headers[1])
+        self.assertFalse(second.revalidated)
+        self.assertEqual(self.weather._validated_chars, 0)
+
+    def test_revalidation_cache_is_bounded_by_size(self):
+        self.open_meteo.validators = True
+        body = len(self.weather.get_weather().text)
+        with mock.patch.object(WEATHER_SDK, "VALIDATED_MAX_CHARS", body + body // 2):
+            self.weather.get_weather(latitude=48.85)
+            self.weather.get_weather()
+        self.assertNotIn("If-None-Match", self.open_meteo.headers[2])
+        self.assertEqual(len(self.weather._validated), 1)
+        self.assertLessEqual(self.weather._validated_chars, body + body // 2)
+
+
+class TestDeadline(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.open_meteo = LocalOpenMeteo().__enter__()
+        self.addCleanup(self.open_meteo.__exit__, None, None, None)
+        self.weather = WEATHER_SDK.Weather(self.open_meteo.url, sleep=lambda seconds: None)
+
+    def test_timeouts_default_outside_an_invocation(self):
+        self.assertEqual(
+            self.weather.timeouts(),
+            (WEATHER_SDK.CONNECT_TIMEOUT_SECONDS, WEATHER_SDK.READ_TIMEOUT_SECONDS),
+        )
+
+    def test_timeouts_follow_the_remaining_time(self):
+        with WEATHER_SDK.deadline(Context(5_000)):
+            connect, read = self.weather.timeouts()
+        self.assertEqual(connect, WEATHER_SDK.CONNECT_TIMEOUT_SECONDS)
+        self.assertAlmostEqual(read, 4.5, places=1)
+        with WEATHER_SDK.deadline(Context(2_500)):
+            connect, read = self.weather.timeouts()
+        self.assertAlmostEqual(connect, 2.0, places=1)
+        self.assertAlmostEqual(read, 2.0, places=1)
+        self.assertEqual(self.weather.timeouts()[1], WEATHER_SDK.READ_TIMEOUT_SECONDS)
+
+    def test_hung_upstream_fails_within_the_deadline(self):
+        self.open_meteo.delay = 1.0
+        with WEATHER_SDK.deadline(Context(900)):
+            with self.assertRaises(requests.Timeout):
+                self.weather.get_weather()
+        # one attempt used the time left; no retry was started
+        self.assertEqual(len(self.open_meteo.requests), 1)
+
+    def test_no_request_without_time_left(self):
+        with WEATHER_SDK.deadline(Context(600)):
+            with self.assertRaises(WEATHER_SDK.DeadlineExceeded):
+                self.weather.get_weather()
+        self.assertEqual(self.open_meteo.requests, [])
+
+
+class TestWeatherMany(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.open_meteo = LocalOpenMeteo().__enter__()
+        self.addCleanup(self.open_meteo.__exit__, None, None, None)
+        self.weather = WEATHER_SDK.Weather(self.open_meteo.url, sleep=lambda seconds: None)
+        self.locations = [(50 + i / 10, 19 + i / 10) for i in range(10)]
+
+    def test_one_request_for_a_batch(self):
+        results = self.weather.get_weather_many(self.locations, {"hourly": ("temperature_2m",)})
+        self.assertEqual(len(self.open_meteo.requests), 1)
+        self.assertEqual(self.open_meteo.requests[0]["latitude"], "50,50.1,50.2,50.3,50.4,50.5,50.6,50.7,50.8,50.9")
+        self.assertNotIn("current", self.open_meteo.requests[0])
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual(
+            [(r.forecast["latitude"], r.forecast["longitude"]) for r in results], self.locations
+        )
+
+    def test_single_location(self):
+        (result,) = self.weather.get_weather_many([(52.52, 13.41)])
+        self.assertEqual(result.forecast["latitude"], 52.52)
+        self.assertIn("current", result.forecast)
+
+    def test_chunks_run_concurrently(self):
+        self.open_meteo.delay = 0.2
+        started = time.perf_counter()
+        results = self.weather.get_weather_many(self.locations, chunk_size=2)
+        elapsed = time.perf_counter() - started
+        self.assertEqual(len(self.open_meteo.requests), 5)
+        self.assertLess(elapsed, 0.6)
+        self.assertEqual([r.forecast["latitude"] for r in results], [lat for lat, _ in self.locations])
+
+    def test_chunks_see_the_deadline(self):
+        with WEATHER_SDK.deadline(Context(600)):
+            results = self.weather.get_weather_many(self.locations, chunk_size=5)
+        self.assertTrue(all(isinstance(r.error, WEATHER_SDK.DeadlineExceeded) for r in results))
+        self.assertEqual(self.open_meteo.requests, [])
+
+    def test_invalid_locations_fail_alone(self):
+        results = self.weather.get_weather_many([(52.52, 13.41), (91, 0), (0, 181)])
+        self.assertEqual([r.ok for r in results], [True, False, False])
+        self.assertIsInstance(results[1].error, ValueError)
+        self.assertEqual(self.open_meteo.requests[0]["latitude"], "52.52")
+
+    def test_rejected_location_is_isolated(self):
+        self.open_meteo.rejects = {50.3: 400}
+        results = self.weather.get_weather_many(self.locations)
+        failed = [r.location for r in results if not r.ok]
+        self.assertEqual(failed, [(50.3, 19.3)])
+        self.assertIsInstance(results[3].error, requests.HTTPError)
+        # 1 + 2 halves + 2 quarters + ... until (50.3, 19.3) stands alone
+        self.assertLessEqual(len(self.open_meteo.requests), 1 + 2 * 4)
+
+    def test_failed_chunk_fails_its_locations_only(self):
+        self.open_meteo.rejects = {50.7: 503}
+        results = self.weather.get_weather_many(self.locations, chunk_size=5)
+        self.assertEqual([r.ok for r in results], [True] * 5 + [False] * 5)
+        self.assertTrue(all(isinstance(r.error, requests.HTTPError) for r in results[5:]))
+        # the 5xx chunk was retried, not split
+        self.assertEqual(len(self.open_meteo.requests), 1 + WEATHER_SDK.MAX_ATTEMPTS)
@@ -0,0 +1,590 @@
+import array
+import collections
+import hashlib
+import json
+import math
+import sys
+import time
+import uuid
+import zlib
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from boto3.dynamodb.conditions import Key
+
+# open-meteo times are local to the requested timezone, without an offset;
+# they are packed as seconds since a naive epoch and printed back the same
+EPOCH = datetime(1970, 1, 1)
+SECOND = timedelta(seconds=1)
+HOURLY_VARIABLES = ("temperature_2m",)
+FORECAST_FIELDS = (
+    "elevation",
+    "generationtime_ms",
+    "latitude",
+    "longitude",
+    "timezone",
+    "timezone_abbreviation",
+    "utc_offset_seconds",
+)
+
+# column header: codec byte (FLAG_ZLIB set when the payload is deflated),
+# then the number of decimals kept by scaled int16 columns
+CODEC_INT16 = ord("h")
+CODEC_FLOAT32 = ord("f")
+FLAG_ZLIB = 0x80
+INT16_MISSING = -32768
+INT16_MAX = 32767
+MAX_DECIMALS = 3
+# deflating fewer bytes than this rarely pays for the zlib header
+MIN_COMPRESS_BYTES = 64
+
+# hourly items hold this many local hours of one location
+BUCKET_HOURS = 24
+HOURLY_RETENTION_DAYS = 30
+# locations whose stored fingerprints a container remembers
+FINGERPRINTS_SIZE = 256
+# differs on every open-meteo answer, forecast changed or not
+VOLATILE_FIELDS = ("generationtime_ms",)
+# a stored bucket still ahead when fetched is refetched after this long
+FORECAST_MAX_AGE_SECONDS = 3600
+WINDOW_CACHE_SECONDS = 60
+WINDOW_CACHE_SIZE = 64
+# projected by window reads: the fingerprint and expiration are not needed
+READ_ATTRIBUTES = (
+    "bucketStart",
+    "fetchedAt",
+    "hourly",
+    "hourly_units",
+    "timezone",
+    "utc_offset_seconds",
+)
+
+
+def _little_endian(values):
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values.tobytes()
+
+
+def _decimals(values):
+    """Fewest decimals (up to MAX_DECIMALS) that hold every value exactly in
+    an int16, or None when the column needs float32"""
+    present = [value for value in values if value is not None]
+    for decimals in range(MAX_DECIMALS + 1):
+        scale = 10**decimals
+        if all(
+            abs(value * scale) <= INT16_MAX and abs(value * scale - round(value * scale)) < 1e-6
+            for value in present
+        ):
+            return decimals
+    return None
+
+
+def pack_column(values, compress=True):
+    """
+    Packs a column of numbers (None for missing) into bytes: values with at
+    most MAX_DECIMALS decimals that fit as scaled int16 (open-meteo's 0.1 °C
+    temperatures, whole-percent humidity), float32 otherwise. With compress,
+    the payload is deflated when that makes it smaller
+    """
+    decimals = _decimals(values)
+    if decimals is not None:
+        scale = 10**decimals
+        packed = array.array(
+            "h", (INT16_MISSING if v is None else round(v * scale) for v in values)
+        )
+        codec = CODEC_INT16
+    else:
+        packed = array.array("f", (math.nan if v is None else v for v in values))
+        codec, decimals = CODEC_FLOAT32, 0
+    payload = _little_endian(packed)
+    if compress and len(payload) >= MIN_COMPRESS_BYTES:
+        deflated = zlib.compress(payload, 9)
+        if len(deflated) < len(payload):
+            codec, payload = codec | FLAG_ZLIB, deflated
+    return bytes((codec, decimals)) + payload
+
+
+def unpack_column(data):
+    data = bytes(getattr(data, "value", data))
+    codec, decimals, payload = data[0], data[1], data[2:]
+    if codec & FLAG_ZLIB:
+        codec, payload = codec & ~FLAG_ZLIB, zlib.decompress(payload)
+    values = array.array("h" if codec == CODEC_INT16 else "f")
+    values.frombytes(payload)
+    if sys.byteorder != "little":
+        values.byteswap()
+    if codec == CODEC_INT16:
+        if decimals == 0:
+            return [None if v == INT16_MISSING else v for v in values]
+        # 10**decimals is exact and division rounds correctly, so v / scale is
+        # the same float as the decimal literal open-meteo sent
+        scale = 10**decimals
+        return [None if v == INT16_MISSING else v / scale for v in values]
+    # float32 keeps ~7 significant digits; print them back the short way
+    return [None if math.isnan(v) else float(f"{v:.7g}") for v in values]
+
+
+def pack_times(times):
+    """(start, step) epoch seconds of evenly spaced open-meteo local times,
+    None when they are not evenly spaced"""
+    if not times:
+        return None
+    parsed = [datetime.fromisoformat(text) for text in times]
+    step = parsed[1] - parsed[0] if len(parsed) > 1 else timedelta(hours=1)
+    if step <= timedelta(0):
+        return None
+    first = parsed[0]
+    for index, moment in enumerate(parsed):
+        if moment != first + step * index:
+            return None
+    return (first - EPOCH) // SECOND, step // SECOND
+
+
+def unpack_times(start, step, count):
+    first = EPOCH + timedelta(seconds=start)
+    step = timedelta(seconds=step)
+    return [(first + step * index).isoformat(timespec="minutes") for index in range(count)]
+
+
+def local_seconds(text):
+    """Epoch seconds (see EPOCH) of an open-meteo local time"""
+    return (datetime.fromisoformat(text) - EPOCH) // SECOND
+
+
+def local_time(seconds):
+    """open-meteo's form of local epoch seconds, as in start_hour=2024-05-01T06:00"""
+    return (EPOCH + timedelta(seconds=seconds)).isoformat(timespec="minutes")
+
+
+def encode_hourly(hourly, variables=HOURLY_VARIABLES, compress=True):
+    """
+    Stored form of open-meteo's hourly section: time as start + step +
+    count (a list when irregular) and each variable as one packed binary
+    column (see pack_column)
+    """
+    stored = {}
+    times = pack_times(hourly["time"])
+    if times is None:
+        stored["time"] = hourly["time"]
+    else:
+        stored["start"], stored["step"] = times
+        stored["count"] = len(hourly["time"])
+    for name in variables:
+        stored[name] = pack_column(hourly[name], compress)
+    return stored
+
+
+def decode_hourly(stored):
+    stored = _plain(stored)
+    if "start" not in stored:
+        # a list of times: written before the encoding, or irregular times
+        return {
+            name: column if name == "time" or isinstance(column, list) else unpack_column(column)
+            for name, column in stored.items()
+        }
+    decoded = {"time": unpack_times(stored["start"], stored["step"], stored["count"])}
+    for name, column in stored.items():
+        if name not in ("start", "step", "count"):
+            decoded[name] = unpack_column(column)
+    return decoded
+
+
+def encode_forecast(weather, variables=HOURLY_VARIABLES, compress=True):
+    """
+    Stored form of an open-meteo forecast: the scalar fields as they are
+    and the hourly section packed by encode_hourly
+    """
+    forecast = {field: weather[field] for field in FORECAST_FIELDS}
+    forecast["hourly"] = encode_hourly(weather["hourly"], variables, compress)
+    forecast["hourly_units"] = {
+        name: weather["hourly_units"][name] for name in ("time", *variables)
+    }
+    return forecast
+
+
+def decode_forecast(forecast):
+    """
+    The open-meteo shape of a stored forecast. Items written before the
+    columnar encoding (lists of Decimal) are decoded as well
+    """
+    forecast = _plain(forecast)
+    forecast["hourly"] = decode_hourly(forecast["hourly"])
+    return forecast
+
+
+def location_key(latitude, longitude):
+    """Key of a requested location: its coordinates to 0.01° (~1 km)"""
+    return f"{float(latitude):.2f},{float(longitude):.2f}"
+
+
+def fingerprint(value):
+    """
+    128-bit digest of a stored (encoded) value, the same for the same
+    content whatever the key order; bytes are hashed as hex
+    """
+    text = json.dumps(
+        value,
+        sort_keys=True,
+        separators=(",", ":"),
+        default=lambda v: bytes(getattr(v, "value", v)).hex(),
+    )
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def forecast_fingerprint(forecast):
+    """fingerprint of an encoded forecast, leaving out VOLATILE_FIELDS"""
+    return fingerprint({k: v for k, v in forecast.items() if k not in VOLATILE_FIELDS})
+
+
+def split_hourly(hourly, variables=HOURLY_VARIABLES, bucket_seconds=BUCKET_HOURS * 3600):
+    """
+    The hours of open-meteo's hourly section grouped in buckets of
+    bucket_seconds of local time, as {bucket start: hourly section} with
+    bucket starts in epoch seconds (see EPOCH)
+    """
+    buckets = {}
+    for index, text in enumerate(hourly["time"]):
+        seconds = local_seconds(text)
+        bucket = buckets.get(seconds - seconds % bucket_seconds)
+        if bucket is None:
+            bucket = buckets[seconds - seconds % bucket_seconds] = {
+                "time": [],
+                **{name: [] for name in variables},
+            }
+        bucket["time"].append(text)
+        for name in variables:
+            bucket[name].append(hourly[name][index])
+    return buckets
+
+
+def _plain(value):
+    """Decimals as int or float, containers copied, binaries left alone"""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    return value
+
+
+def _numbers(value):
+    """Floats as Decimal for the DynamoDB resource; bytes left alone"""
+    if isinstance(value, float):
+        return Decimal(str(value))
+    if isinstance(value, dict):
+        return {key: _numbers(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_numbers(item) for item in value]
+    return value
+
+
+def _remember(cache, key, value, size=FINGERPRINTS_SIZE):
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > size:
+        cache.popitem(last=False)
+
+
+class SaveResult:
+    """
+    Outcome of a save: the keys written and the keys skipped because the
+    stored fingerprint matched
+    """
+
+    __slots__ = ("written", "skipped")
+
+    def __init__(self, written=(), skipped=()):
+        self.written = list(written)
+        self.skipped = list(skipped)
+
+    def __repr__(self):
+        return f"SaveResult(written={self.written}, skipped={self.skipped})"
+
+
+class Window:
+    """
+    Forecast of a time window (open-meteo's shape) and where its buckets
+    came from: stored ones read back, fetched ones from upstream; cached
+    when the whole window was served from memory
+    """
+
+    __slots__ = ("forecast", "stored", "fetched", "cached")
+
+    def __init__(self, forecast, stored=(), fetched=(), cached=False):
+        self.forecast = forecast
+        self.stored = list(stored)
+        self.fetched = list(fetched)
+        self.cached = cached
+
+    def __repr__(self):
+        return f"Window(stored={self.stored}, fetched={self.fetched}, cached={self.cached})"
+
+
+class ForecastRepository:
+    """
+    Forecast items of the Weather table, keyed by a string "id". The hourly
+    columns are written packed (encode_forecast) and decoded on read, so
+    callers see open-meteo's shape either way.
+
+    save keeps the latest forecast of a location under the location's key
+    and skips the put when the forecast's fingerprint is the stored one
+    """
+
+    def __init__(self, table, variables=HOURLY_VARIABLES, compress=True):
+        self.table = table
+        self.variables = variables
+        self.compress = compress
+        self._fingerprints = collections.OrderedDict()
+
+    def item(self, weather, forecast_id=None):
+        forecast = encode_forecast(weather, self.variables, self.compress)
+        return {
+            "id": forecast_id or str(uuid.uuid4()),
+            "fingerprint": forecast_fingerprint(forecast),
+            "forecast": _numbers(forecast),
+        }
+
+    def save(self, weather, location):
+        """
+        Puts the forecast as the latest one of location (see location_key)
+        unless it is unchanged, and tells which it did. A container
+        reads the stored fingerprint once per location, then remembers it
+        """
+        item = self.item(weather, location)
+        if location not in self._fingerprints:
+            stored = self.table.get_item(
+                Key={"id": location}, ProjectionExpression="fingerprint"
+            ).get("Item")
+            _remember(self._fingerprints, location, stored and stored.get("fingerprint"))
+        if self._fingerprints[location] == item["fingerprint"]:
+            return SaveResult(skipped=[location])
+        self.table.put_item(Item=item)
+        _remember(self._fingerprints, location, item["fingerprint"])
+        return SaveResult(written=[location])
+
+    def put(self, weather):
+        item = self.item(weather)
+        self.table.put_item(Item=item)
+        return item
+
+    def get(self, forecast_id):
+        item = self.table.get_item(Key={"id": forecast_id}).get("Item")
+        if item is None:
+            return None
+        return {**item, "forecast": decode_forecast(item["forecast"])}
+
+
+class HourlyRepository:
+    """
+    Hourly forecast items of the WeatherHourly table: one per location
+    ("locationId", see location_key) and bucket of bucket_hours local hours
+    ("bucketStart", epoch seconds of its first hour), so a time range of a
+    location is read with one Query. Columns are packed as in
+    encode_hourly; items expire ("expiration", for the table's TTL)
+    retention_days after their last hour.
+
+    Every item carries the fingerprint of its content, and save puts only
+    the buckets whose fingerprint changed. The stored fingerprints of a
+    location are read with one projected Query the first time a container
+    sees it, and remembered for the next calls
+    """
+
+    def __init__(
+        self,
+        table,
+        variables=HOURLY_VARIABLES,
+        compress=True,
+        bucket_hours=BUCKET_HOURS,
+        retention_days=HOURLY_RETENTION_DAYS,
+        cache_size=FINGERPRINTS_SIZE,
+        max_age=FORECAST_MAX_AGE_SECONDS,
+        window_cache_seconds=WINDOW_CACHE_SECONDS,
+        clock=time.time,
+    ):
+        self.table = table
+        self.variables = variables
+        self.compress = compress
+        self.bucket_seconds = bucket_hours * 3600
+        self.retention = retention_days * 86400
+        self.cache_size = cache_size
+        self.max_age = max_age
+        self.window_cache_seconds = window_cache_seconds
+        self._clock = clock
+        self._fingerprints = collections.OrderedDict()
+        self._windows = collections.OrderedDict()
+
+    def bucket(self, seconds):
+        """Start of the bucket holding a local time (epoch seconds)"""
+        return seconds - seconds % self.bucket_seconds
+
+    def items(self, weather, location):
+        """The items of a forecast, by bucket start"""
+        fetched_at = int(self._clock())
+        offset = weather.get("utc_offset_seconds", 0)
+        items = {}
+        for bucket, hourly in split_hourly(weather["hourly"], self.variables, self.bucket_seconds).items():
+            content = {
+                "hourly": encode_hourly(hourly, self.variables, self.compress),
+                "hourly_units": {
+                    name: weather["hourly_units"][name] for name in ("time", *self.variables)
+                },
+                "timezone": weather.get("timezone"),
+                "utc_offset_seconds": offset,
+            }
+            items[bucket] = {
+                "locationId": location,
+                "bucketStart": bucket,
+                **_numbers(content),
+                "fingerprint": fingerprint(content),
+                "fetchedAt": fetched_at,
+                "expiration": bucket - offset + self.bucket_seconds + self.retention,
+            }
+        return items
+
+    def fingerprints(self, location, first, last):
+        """Stored fingerprints of location's buckets first..last, by bucket"""
+        known = self._fingerprints.get(location)
+        if known is not None and first in known and last in known:
+            return known
+        query = {
+            "KeyConditionExpression": Key("locationId").eq(location)
+            & Key("bucketStart").between(first, last),
+            "ProjectionExpression": "bucketStart, fingerprint",
+        }
+        known = {} if known is None else known
+        while True:
+            response = self.table.query(**query)
+            for item in response.get("Items", []):
+                known[int(item["bucketStart"])] = item["fingerprint"]
+            if "LastEvaluatedKey" not in response:
+                break
+            query["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        for bucket in range(first, last + 1, self.bucket_seconds):
+            known.setdefault(bucket, None)
+        _remember(self._fingerprints, location, known, self.cache_size)
+        return known
+
+    def save(self, weather, location):
+        """Puts the buckets of a forecast whose content changed"""
+        return self._save(self.items(weather, location), location)
+
+    def _save(self, items, location):
+        if not items:
+            return SaveResult()
+        known = self.fingerprints(location, min(items), max(items))
+        result = SaveResult()
+        for bucket, item in sorted(items.items()):
+            if known.get(bucket) == item["fingerprint"]:
+                result.skipped.append(bucket)
+                continue
+            self.table.put_item(Item=item)
+            known[bucket] = item["fingerprint"]
+            result.written.append(bucket)
+        # buckets long past would otherwise pile up in a warm container
+        for bucket in [b for b in known if b < min(items) - self.retention]:
+            del known[bucket]
+        return result
+
+    def read(self, location, first, last):
+        """
+        Stored buckets first..last of location by bucket start, read with
+        one Query projected on READ_ATTRIBUTES (paginated past 1 MB)
+        """
+        names = {f"#a{index}": name for index, name in enumerate(READ_ATTRIBUTES)}
+        query = {
+            "KeyConditionExpression": Key("locationId").eq(location)
+            & Key("bucketStart").between(first, last),
+            "ProjectionExpression": ", ".join(names),
+            "ExpressionAttributeNames": names,
+        }
+        items = {}
+        while True:
+            response = self.table.query(**query)
+            for item in response.get("Items", []):
+                items[int(item["bucketStart"])] = item
+            if "LastEvaluatedKey" not in response:
+                return items
+            query["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    def fresh(self, item, now):
+        """
+        Whether a stored bucket can be served: fetched less than max_age
+        ago, or already past when it was fetched (past hours do not change)
+        """
+        fetched_at = int(item["fetchedAt"])
+        if now - fetched_at < self.max_age:
+            return True
+        ends = int(item["bucketStart"]) - int(item.get("utc_offset_seconds", 0)) + self.bucket_seconds
+        return ends <= fetched_at
+
+    def window(self, location, start, end, fetch):
+        """
+        Hourly forecast of location from start to end (local epoch
+        seconds, both included), stitched from its buckets.
+
+        Stored buckets are read with one Query. Buckets that are missing or
+        not fresh are fetched in one call of fetch(first, last), which
+        returns open-meteo's answer for the hours first..last, then saved
+        (the changed ones) and stitched in; a stale bucket fetched unchanged
+        only gets its fetchedAt updated. Windows are kept in memory for
+        window_cache_seconds
+        """
+        now = self._clock()
+        key = (location, start, end)
+        cached = self._windows.get(key)
+        if cached is not None and cached[0] > now:
+            return Window(cached[1], cached=True)
+
+        first, last = self.bucket(start), self.bucket(end)
+        stored = self.read(location, first, last)
+        buckets = {}
+        missing = []
+        for bucket in range(first, last + 1, self.bucket_seconds):
+            item = stored.get(bucket)
+            if item is not None and self.fresh(item, now):
+                buckets[bucket] = item
+            else:
+                missing.append(bucket)
+        fetched = []
+        if missing:
+            weather = fetch(missing[0], missing[-1] + self.bucket_seconds - 3600)
+            items = self.items(weather, location)
+            unchanged = self._save(items, location).skipped
+            for bucket in missing:
+                if bucket not in items:
+                    continue
+                if bucket in unchanged and bucket in stored:
+                    # confirmed as stored: only the fetch time moves on
+                    self.table.update_item(
+                        Key={"locationId": location, "bucketStart": bucket},
+                        UpdateExpression="SET fetchedAt = :fetched",
+                        ExpressionAttributeValues={":fetched": items[bucket]["fetchedAt"]},
+                    )
+                buckets[bucket] = items[bucket]
+                fetched.append(bucket)
+
+        forecast = stitch(location, [buckets[b] for b in sorted(buckets)], start, end, self.variables)
+        _remember(self._windows, key, (now + self.window_cache_seconds, forecast), WINDOW_CACHE_SIZE)
+        return Window(forecast, stored=[b for b in buckets if b not in fetched], fetched=fetched)
+
+
+def stitch(location, items, start, end, variables=HOURLY_VARIABLES):
+    """
+    open-meteo's shape of the hours start..end (local epoch seconds) of
+    hourly items, in bucket order
+    """
+    latitude, longitude = (float(part) for part in location.split(","))
+    hourly = {"time": [], **{name: [] for name in variables}}
+    forecast = {"latitude": latitude, "longitude": longitude, "hourly": hourly}
+    for item in items:
+        decoded = decode_hourly(item["hourly"])
+        for index, text in enumerate(decoded["time"]):
+            if start <= local_seconds(text) <= end:
+                hourly["time"].append(text)
+                for name in variables:
+                    hourly[name].append(decoded[name][index])
+        for field in ("timezone", "utc_offset_seconds", "hourly_units"):
+            forecast.setdefault(field, _plain(item.get(field)))
+    return forecast
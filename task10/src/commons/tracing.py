@@ -0,0 +1,383 @@
+import contextvars
+import json
+import os
+import random
+import socket
+import threading
+import time
+from urllib.parse import urlsplit
+
+from commons.abstract_lambda import Middleware
+from commons.log_helper import get_logger
+
+_LOG = get_logger(__name__)
+
+XRAY_HEADER = b'{"format":"json","version":1}\n'
+
+_current = contextvars.ContextVar("current_span", default=None)
+_encode = json.JSONEncoder(default=str, separators=(",", ":")).encode
+
+
+def _new_id():
+    return f"{random.getrandbits(64):016x}"
+
+
+_trace_headers = {}
+
+
+def trace_context():
+    """
+    (trace_id, parent_id, sampled) of the running invocation, from the
+    _X_AMZN_TRACE_ID variable Lambda sets per invocation
+    """
+    header = os.environ.get("_X_AMZN_TRACE_ID", "")
+    context = _trace_headers.get(header)
+    if context is None:
+        fields = dict(part.split("=", 1) for part in header.split(";") if "=" in part)
+        context = (fields.get("Root"), fields.get("Parent"), fields.get("Sampled") == "1")
+        if len(_trace_headers) > 64:
+            _trace_headers.clear()
+        _trace_headers[header] = context
+    return context
+
+
+class Span:
+    """One timed operation; kind is local, aws or http"""
+
+    __slots__ = (
+        "name",
+        "kind",
+        "id",
+        "parent_id",
+        "trace_id",
+        "sampled",
+        "start",
+        "end",
+        "attributes",
+        "error",
+        "_tracer",
+        "_token",
+    )
+
+    def __init__(self, tracer, name, kind, attributes):
+        self._tracer = tracer
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.error = None
+        self.end = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def __enter__(self):
+        parent = _current.get()
+        if parent is not None:
+            self.trace_id, self.parent_id, self.sampled = (
+                parent.trace_id,
+                parent.id,
+                parent.sampled,
+            )
+        else:
+            self.trace_id, self.parent_id, self.sampled = trace_context()
+        self.id = _new_id()
+        self._token = _current.set(self)
+        self.start = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.time()
+        _current.reset(self._token)
+        if exc is not None and self.error is None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        self._tracer.export(self)
+        return False
+
+    def to_record(self):
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "id": self.id,
+            "parent_id": self.parent_id,
+            "trace_id": self.trace_id,
+            "start": self.start,
+            "duration_ms": round((self.end - self.start) * 1000, 3),
+            **self.attributes,
+            **({"error": self.error} if self.error else {}),
+        }
+
+
+class _NoopSpan:
+    """Returned by span() while tracing is off"""
+
+    def set(self, **attributes):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class NoopExporter:
+    """Drops every span: the exporter without X-Ray or a trace_file"""
+
+    def export(self, span):
+        pass
+
+    def flush(self):
+        pass
+
+
+class JsonLinesExporter:
+    """Appends one JSON line per span to path; flushed once per invocation"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._lock = threading.Lock()
+
+    def export(self, span):
+        line = _encode(span.to_record()) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line)
+
+    def flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+
+class XRayExporter:
+    """
+    Sends each span to the X-Ray daemon as an independent subsegment of
+    the Lambda function segment (the Parent of _X_AMZN_TRACE_ID). Spans of
+    unsampled invocations are dropped
+    """
+
+    def __init__(self, address):
+        host, _, port = address.rpartition(":")
+        self.address = (host, int(port))
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    @staticmethod
+    def subsegment(span):
+        attributes = dict(span.attributes)
+        document = {
+            "name": span.name,
+            "id": span.id,
+            "trace_id": span.trace_id,
+            "parent_id": span.parent_id,
+            "start_time": span.start,
+            "end_time": span.end,
+            "type": "subsegment",
+        }
+        status = attributes.pop("status", None)
+        if span.kind == "aws":
+            document["namespace"] = "aws"
+            document["aws"] = {
+                key: attributes.pop(key)
+                for key in ("operation", "table_name", "region", "request_id")
+                if key in attributes
+            }
+        elif span.kind == "http":
+            document["namespace"] = "remote"
+            document["http"] = {
+                "request": {"method": attributes.pop("method", None), "url": attributes.pop("url", None)}
+            }
+        if status is not None:
+            document.setdefault("http", {})["response"] = {
+                "status": status,
+                "content_length": attributes.pop("response_bytes", None),
+            }
+        # error for 4xx responses (client errors), fault for 5xx and for
+        # exceptions that never got a response
+        if (status or 0) >= 500 or (span.error and status is None):
+            document["fault"] = True
+        elif (status or 0) >= 400:
+            document["error"] = True
+        if span.error:
+            document["cause"] = {"exceptions": [{"id": _new_id(), "message": span.error}]}
+        if attributes:
+            document["metadata"] = {"default": attributes}
+        return document
+
+    def export(self, span):
+        if not (span.sampled and span.trace_id and span.parent_id):
+            return
+        payload = _encode(self.subsegment(span))
+        try:
+            self._socket.sendto(XRAY_HEADER + payload.encode(), self.address)
+        except OSError as e:
+            _LOG.debug("Dropped span %s: %s", span.name, e)
+
+    def flush(self):
+        pass
+
+
+class Tracer:
+    """
+    Creates spans and hands finished ones to the exporter: X-Ray when the
+    function runs with active tracing (AWS_XRAY_DAEMON_ADDRESS is set), a
+    local JSON-lines file when env trace_file names one, otherwise none.
+    Env tracing=off makes span() return a no-op span
+    """
+
+    def __init__(self, exporter=None, enabled=None):
+        if enabled is None:
+            enabled = os.environ.get("tracing", "on") != "off"
+        self.enabled = enabled
+        if exporter is None:
+            address = os.environ.get("AWS_XRAY_DAEMON_ADDRESS")
+            trace_file = os.environ.get("trace_file")
+            if address:
+                exporter = XRayExporter(address)
+            elif trace_file:
+                exporter = JsonLinesExporter(trace_file)
+            else:
+                exporter = NoopExporter()
+        self.exporter = exporter
+
+    def span(self, name, kind="local", **attributes):
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, name, kind, attributes)
+
+    def export(self, span):
+        try:
+            self.exporter.export(span)
+        except Exception as e:
+            _LOG.warning("Failed to export span %s: %s", span.name, e)
+
+    def flush(self):
+        self.exporter.flush()
+
+
+TRACER = Tracer()
+
+
+def span(name, **attributes):
+    """with span("convert") as s: ...; s.set(items=10)"""
+    return TRACER.span(name, **attributes)
+
+
+def _boto_span(client, operation_name, api_params):
+    meta = client.meta
+    attributes = {"operation": operation_name, "region": meta.region_name}
+    table_name = api_params.get("TableName")
+    if table_name:
+        attributes["table_name"] = table_name
+    return TRACER.span(meta.service_model.service_id, kind="aws", **attributes)
+
+
+def _record_boto_response(span, response):
+    metadata = response.get("ResponseMetadata", {})
+    headers = metadata.get("HTTPHeaders", {})
+    span.set(
+        status=metadata.get("HTTPStatusCode"),
+        request_id=metadata.get("RequestId"),
+        response_bytes=int(headers.get("content-length", 0)) or None,
+        retries=metadata.get("RetryAttempts", 0),
+    )
+
+
+def _request_span(request):
+    url = request.url or ""
+    return TRACER.span(
+        urlsplit(url).hostname or "http",
+        kind="http",
+        method=request.method,
+        url=url.split("?", 1)[0],
+        request_bytes=len(request.body or b""),
+    )
+
+
+# (owner, attribute, original) of every method patch() replaced
+_originals = []
+_patch_lock = threading.Lock()
+
+
+def patch():
+    """
+    Wraps botocore API calls and requests sends in spans recording the
+    operation, table or URL, status, bytes and latency. Safe to call more
+    than once; missing libraries are skipped. unpatch() restores them
+    """
+    with _patch_lock:
+        if not _originals:
+            _patch()
+
+
+def unpatch():
+    """Puts back the methods patch() replaced"""
+    with _patch_lock:
+        while _originals:
+            owner, attribute, original = _originals.pop()
+            setattr(owner, attribute, original)
+
+
+def patched():
+    return bool(_originals)
+
+
+def _patch():
+    try:
+        from botocore.client import BaseClient
+        from botocore.exceptions import ClientError
+    except ImportError:
+        BaseClient = None
+    if BaseClient is not None:
+        make_api_call = BaseClient._make_api_call
+
+        def traced_api_call(client, operation_name, api_params):
+            if not TRACER.enabled:
+                return make_api_call(client, operation_name, api_params)
+            with _boto_span(client, operation_name, api_params) as span:
+                try:
+                    response = make_api_call(client, operation_name, api_params)
+                except ClientError as e:
+                    _record_boto_response(span, e.response)
+                    raise
+                _record_boto_response(span, response)
+                return response
+
+        _originals.append((BaseClient, "_make_api_call", make_api_call))
+        BaseClient._make_api_call = traced_api_call
+    try:
+        from requests.sessions import Session
+    except ImportError:
+        Session = None
+    if Session is not None:
+        send = Session.send
+
+        def traced_send(session, request, **kwargs):
+            if not TRACER.enabled:
+                return send(session, request, **kwargs)
+            with _request_span(request) as span:
+                response = send(session, request, **kwargs)
+                length = response.headers.get("Content-Length")
+                if length is None and not kwargs.get("stream"):
+                    length = len(response.content)
+                span.set(status=response.status_code, response_bytes=int(length or 0))
+                return response
+
+        _originals.append((Session, "send", send))
+        Session.send = traced_send
+
+
+class TracingMiddleware(Middleware):
+    """Flushes the spans of an invocation when it ends"""
+
+    def after(self, event, context, response):
+        TRACER.flush()
+        return response
+
+    def on_error(self, event, context, error):
+        TRACER.flush()
+        return None
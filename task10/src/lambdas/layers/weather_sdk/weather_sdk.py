@@ -0,0 +1,379 @@
+import collections
+import contextlib
+import contextvars
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+DEFAULT_LATITUDE = 52.52
+DEFAULT_LONGITUDE = 13.41
+DEFAULT_CURRENT = ("temperature_2m", "wind_speed_10m")
+DEFAULT_HOURLY = ("temperature_2m", "relative_humidity_2m", "wind_speed_10m")
+DEFAULT_VARIABLES = {"current": DEFAULT_CURRENT, "hourly": DEFAULT_HOURLY}
+
+CONNECT_TIMEOUT_SECONDS = 3.05
+READ_TIMEOUT_SECONDS = 10
+MAX_ATTEMPTS = 3
+BACKOFF_BASE_SECONDS = 0.1
+BACKOFF_CAP_SECONDS = 2
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+POOL_SIZE = 10
+VALIDATORS_SIZE = 128
+# revalidation keeps whole response bodies: at most this many characters
+# (about bytes, open-meteo answers in ASCII JSON) in all, and none larger
+# than VALIDATED_MAX_ENTRY_CHARS, so multi-location answers of a few MB are
+# not kept
+VALIDATED_MAX_CHARS = 4 * 1024 * 1024
+VALIDATED_MAX_ENTRY_CHARS = 256 * 1024
+# left of the Lambda deadline for the caller to build its response
+DEADLINE_MARGIN_MS = 500
+# an attempt with less time than this left is not started
+MIN_ATTEMPT_SECONDS = 0.2
+# open-meteo takes comma separated coordinates; 100 pairs keep the URL
+# under ~2 KB and the answer to a few MB
+MAX_LOCATIONS_PER_REQUEST = 100
+# at most this many chunk requests run at once, below POOL_SIZE
+MAX_WORKERS = 8
+
+_deadline = contextvars.ContextVar("weather_sdk_deadline", default=None)
+
+
+def new_session(pool_size=POOL_SIZE):
+    """
+    Session with a keep-alive connection pool, asking for gzip. Retries are
+    done by Weather, with jitter and within the deadline, not by urllib3
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Accept": "application/json", "Accept-Encoding": "gzip, deflate"})
+    return session
+
+
+# one per container: connections opened by an invocation serve the next ones
+SESSION = new_session()
+
+
+class DeadlineExceeded(requests.Timeout):
+    """The invocation has no time left for another request"""
+
+
+@contextlib.contextmanager
+def deadline(context, margin_ms=DEADLINE_MARGIN_MS):
+    """
+    Bounds the requests made inside the block by the remaining time of the
+    Lambda context (minus margin_ms), so a hung upstream fails the request
+    instead of the whole invocation:
+
+        with weather_sdk.deadline(context):
+            forecast = WEATHER.get_weather()
+
+    Without a context (or outside the block) the default timeouts apply
+    """
+    remaining = getattr(context, "get_remaining_time_in_millis", None)
+    expires = None
+    if remaining is not None:
+        expires = time.monotonic() + (remaining() - margin_ms) / 1000
+    token = _deadline.set(expires)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_seconds():
+    """Seconds left before the active deadline, None without one"""
+    expires = _deadline.get()
+    return None if expires is None else expires - time.monotonic()
+
+
+class Forecast:
+    """
+    Body of a forecast response. revalidated is True when the upstream
+    answered 304 Not Modified and the body is the one cached from before
+    """
+
+    __slots__ = ("text", "status_code", "revalidated", "attempts")
+
+    def __init__(self, text, status_code=200, revalidated=False, attempts=1):
+        self.text = text
+        self.status_code = status_code
+        self.revalidated = revalidated
+        self.attempts = attempts
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class LocationForecast:
+    """
+    Result of one location of get_weather_many: the forecast (parsed JSON)
+    or the exception that stopped it
+    """
+
+    __slots__ = ("location", "forecast", "error")
+
+    def __init__(self, location, forecast=None, error=None):
+        self.location = location
+        self.forecast = forecast
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        outcome = "ok" if self.ok else f"error={self.error!r}"
+        return f"LocationForecast({self.location}, {outcome})"
+
+
+def _valid_location(location):
+    latitude, longitude = location
+    if not -90 <= latitude <= 90:
+        return ValueError(f"latitude {latitude} is out of range")
+    if not -180 <= longitude <= 180:
+        return ValueError(f"longitude {longitude} is out of range")
+    return None
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _pool():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(MAX_WORKERS, thread_name_prefix="weather-sdk")
+        return _executor
+
+
+class _Validated:
+    __slots__ = ("etag", "last_modified", "text")
+
+    def __init__(self, etag, last_modified, text):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.text = text
+
+
+class Weather:
+    """
+    open-meteo forecast client. Requests go through the pooled SESSION, with
+    (connect, read) timeouts cut to the active deadline, and are retried up
+    to max_attempts times with full-jitter exponential backoff on connection
+    errors, timeouts and 429/5xx. A response carrying an ETag or
+    Last-Modified is kept, and the next request for the same URL revalidates
+    it with If-None-Match / If-Modified-Since
+    """
+
+    def __init__(
+        self,
+        url=FORECAST_URL,
+        session=None,
+        connect_timeout=CONNECT_TIMEOUT_SECONDS,
+        read_timeout=READ_TIMEOUT_SECONDS,
+        max_attempts=MAX_ATTEMPTS,
+        backoff_base=BACKOFF_BASE_SECONDS,
+        backoff_cap=BACKOFF_CAP_SECONDS,
+        sleep=time.sleep,
+    ):
+        self.url = url
+        self.session = session or SESSION
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._sleep = sleep
+        self._validated = collections.OrderedDict()
+        self._validated_chars = 0
+        self._lock = threading.Lock()
+
+    def get_weather(
+        self,
+        latitude=DEFAULT_LATITUDE,
+        longitude=DEFAULT_LONGITUDE,
+        current=DEFAULT_CURRENT,
+        hourly=DEFAULT_HOURLY,
+        **params,
+    ):
+        """
+        Forecast for one location; raises requests exceptions on failure.
+        Other open-meteo parameters (start_hour, end_hour, timezone...) are
+        passed as they are
+        """
+        params = {"latitude": latitude, "longitude": longitude, **params}
+        if current:
+            params["current"] = ",".join(current)
+        if hourly:
+            params["hourly"] = ",".join(hourly)
+        return self.get(params)
+
+    def get_weather_many(
+        self,
+        locations,
+        variables=DEFAULT_VARIABLES,
+        chunk_size=MAX_LOCATIONS_PER_REQUEST,
+    ):
+        """
+        Forecasts for many (latitude, longitude) pairs, as one
+        LocationForecast per location, in order. variables maps sections
+        (current, hourly, daily) to variable names.
+
+        Locations go chunk_size at a time in one request, using open-meteo's
+        comma separated coordinates, and the chunks are fetched concurrently
+        on a pool of MAX_WORKERS threads, within the active deadline. A
+        failed chunk fails only its own locations; a chunk rejected with 400
+        is split in halves until the location it rejects is isolated
+        """
+        locations = [(float(latitude), float(longitude)) for latitude, longitude in locations]
+        results = [LocationForecast(location) for location in locations]
+        valid = []
+        for index, location in enumerate(locations):
+            error = _valid_location(location)
+            if error is None:
+                valid.append(index)
+            else:
+                results[index].error = error
+        params = {section: ",".join(names) for section, names in variables.items() if names}
+        chunks = [valid[i:i + chunk_size] for i in range(0, len(valid), chunk_size)]
+        if len(chunks) == 1:
+            self._fetch_chunk(chunks[0], locations, params, results)
+        elif chunks:
+            pool = _pool()
+            # each task runs in a copy of this context, so it sees the deadline
+            futures = [
+                pool.submit(
+                    contextvars.copy_context().run,
+                    self._fetch_chunk,
+                    chunk,
+                    locations,
+                    params,
+                    results,
+                )
+                for chunk in chunks
+            ]
+            for future in futures:
+                future.result()
+        return results
+
+    def _fetch_chunk(self, chunk, locations, params, results):
+        try:
+            forecast = self.get(
+                {
+                    "latitude": ",".join(f"{locations[i][0]:g}" for i in chunk),
+                    "longitude": ",".join(f"{locations[i][1]:g}" for i in chunk),
+                    **params,
+                }
+            )
+            forecasts = forecast.json()
+            if isinstance(forecasts, dict):
+                forecasts = [forecasts]
+            if len(forecasts) != len(chunk):
+                raise ValueError(
+                    f"{len(forecasts)} forecasts returned for {len(chunk)} locations"
+                )
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code == 400 and len(chunk) > 1:
+                middle = len(chunk) // 2
+                self._fetch_chunk(chunk[:middle], locations, params, results)
+                self._fetch_chunk(chunk[middle:], locations, params, results)
+                return
+            for i in chunk:
+                results[i].error = e
+            return
+        except Exception as e:
+            for i in chunk:
+                results[i].error = e
+            return
+        for i, location_forecast in zip(chunk, forecasts):
+            results[i].forecast = location_forecast
+
+    def timeouts(self):
+        remaining = remaining_seconds()
+        if remaining is None:
+            return self.connect_timeout, self.read_timeout
+        if remaining < MIN_ATTEMPT_SECONDS:
+            raise DeadlineExceeded(f"{remaining:.3f}s left before the Lambda deadline")
+        return min(self.connect_timeout, remaining), min(self.read_timeout, remaining)
+
+    def backoff(self, attempt, response=None):
+        """
+        Sleeps before retry number attempt and returns True, or returns False
+        when attempts or the deadline do not allow another one
+        """
+        if attempt >= self.max_attempts:
+            return False
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** (attempt - 1)))
+        retry_after = response is not None and response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            if int(retry_after) > self.backoff_cap:
+                return False
+            delay = max(delay, int(retry_after))
+        remaining = remaining_seconds()
+        if remaining is not None and delay + MIN_ATTEMPT_SECONDS > remaining:
+            return False
+        self._sleep(delay)
+        return True
+
+    def get(self, params):
+        url = requests.Request("GET", self.url, params=params).prepare().url
+        with self._lock:
+            validated = self._validated.get(url)
+        headers = {}
+        if validated is not None:
+            if validated.etag:
+                headers["If-None-Match"] = validated.etag
+            if validated.last_modified:
+                headers["If-Modified-Since"] = validated.last_modified
+        attempt = 0
+        while True:
+            attempt += 1
+            timeout = self.timeouts()
+            try:
+                response = self.session.get(url, headers=headers, timeout=timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if self.backoff(attempt):
+                    continue
+                raise
+            if response.status_code in RETRY_STATUSES and self.backoff(attempt, response):
+                continue
+            break
+        if response.status_code == 304 and validated is not None:
+            return Forecast(validated.text, 200, revalidated=True, attempts=attempt)
+        response.raise_for_status()
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            self._remember(url, _Validated(etag, last_modified, response.text))
+        return Forecast(response.text, response.status_code, attempts=attempt)
+
+    def _remember(self, url, validated):
+        """
+        Keeps the body and validators of url for revalidation, evicting the
+        least recently stored ones past VALIDATORS_SIZE entries or
+        VALIDATED_MAX_CHARS in all. A body over VALIDATED_MAX_ENTRY_CHARS
+        is not kept and drops the url's older one
+        """
+        with self._lock:
+            previous = self._validated.pop(url, None)
+            if previous is not None:
+                self._validated_chars -= len(previous.text)
+            if len(validated.text) > VALIDATED_MAX_ENTRY_CHARS:
+                return
+            self._validated[url] = validated
+            self._validated_chars += len(validated.text)
+            while (
+                len(self._validated) > VALIDATORS_SIZE
+                or self._validated_chars > VALIDATED_MAX_CHARS
+            ):
+                _, evicted = self._validated.popitem(last=False)
+                self._validated_chars -= len(evicted.text)
@@ -1,72 +1,174 @@
 from commons.log_helper import get_logger
 from commons.abstract_lambda import AbstractLambda
-import json
+from commons import aws_clients
+from commons.router import Router
+from commons import tracing
+from commons.forecast_store import ForecastRepository, HourlyRepository, local_seconds, local_time, location_key
+from functools import cached_property
 import os
-import uuid
-import boto3
-from decimal import Decimal
 import requests
+try:
+    # deployed: the weather_sdk layer is on sys.path
+    import weather_sdk
+except ImportError:
+    from lambdas.layers.weather_sdk import weather_sdk
 _LOG = get_logger(__name__)
 
+ROUTER = Router()
+WEATHER = weather_sdk.Weather(os.environ.get('open_meteo_url', weather_sdk.FORECAST_URL))
+# the open-meteo call and the DynamoDB writes become X-Ray subsegments
+tracing.patch()
+
+HOUR = 3600
+# open-meteo forecasts reach 16 days ahead
+MAX_WINDOW_DAYS = 16
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def _moment(params, name, end_of_day=False):
+    value = params.get(name)
+    if value is None:
+        return None
+    try:
+        if name.endswith('_date'):
+            seconds = local_seconds(value + 'T00:00')
+            return seconds + 23 * HOUR if end_of_day else seconds
+        seconds = local_seconds(value)
+    except ValueError:
+        raise BadRequest(f'{name} must look like ' + ('2024-05-01' if name.endswith('_date') else '2024-05-01T06:00'))
+    return seconds - seconds % HOUR
+
+
+def forecast_window(event):
+    """
+    (start, end) of a GET /weather request for a time window, as local
+    epoch seconds of its first and last hour, or None for the live
+    forecast. Takes open-meteo's own parameters: start_hour/end_hour
+    (2024-05-01T06:00) or start_date/end_date (whole days); without an end
+    the window ends with the start's day
+    """
+    params = event.get('queryStringParameters') or {}
+    start = _moment(params, 'start_hour')
+    if start is None:
+        start = _moment(params, 'start_date')
+    end = _moment(params, 'end_hour')
+    if end is None:
+        end = _moment(params, 'end_date', end_of_day=True)
+    if start is None:
+        if end is not None:
+            raise BadRequest('end_hour and end_date need a start_hour or start_date')
+        return None
+    if end is None:
+        end = start - start % (24 * HOUR) + 23 * HOUR
+    if end < start:
+        raise BadRequest('the window ends before it starts')
+    if end - start >= MAX_WINDOW_DAYS * 24 * HOUR:
+        raise BadRequest(f'the window is longer than {MAX_WINDOW_DAYS} days')
+    return start, end
+
+
+def _response(status_code, body):
+    return {
+        "headers": {
+            "Content-Type": "application/json"
+        },
+        "statusCode": status_code,
+        "body": body
+    }
 
 
 class Processor(AbstractLambda):
+    middlewares = (tracing.TracingMiddleware(),)
 
     def validate_request(self, event) -> dict:
         pass
-        
+
+    def prime(self):
+        aws_clients.prime(aws_clients.resource('dynamodb'))
+
+    # kept for the container's lifetime: they remember the fingerprints of
+    # what is stored, so unchanged forecasts are not written again
+    @cached_property
+    def forecasts(self):
+        table_name = os.getenv('table_name')
+        _LOG.info(f"{table_name=}")
+        table = aws_clients.resource('dynamodb').Table(table_name)
+        return ForecastRepository(table, compress=os.getenv('forecast_compression', 'zlib') != 'off')
+
+    @cached_property
+    def hourly_forecasts(self):
+        table = aws_clients.resource('dynamodb').Table(os.getenv('hourly_table_name', 'WeatherHourly'))
+        return HourlyRepository(table,
+                                compress=os.getenv('forecast_compression', 'zlib') != 'off',
+                                bucket_hours=int(os.getenv('forecast_bucket_hours', '24')),
+                                retention_days=int(os.getenv('hourly_retention_days', '30')),
+                                max_age=int(os.getenv('forecast_max_age', '3600')),
+                                window_cache_seconds=int(os.getenv('window_cache_seconds', '60')))
+
+    def fetch_hours(self, first, last):
+        """open-meteo's hourly forecast of the default location for hours first..last"""
+        return WEATHER.get_weather(current=(),
+                                   hourly=self.hourly_forecasts.variables,
+                                   start_hour=local_time(first),
+                                   end_hour=local_time(last)).json()
+
+    def get_weather_window(self, start, end):
+        location = location_key(weather_sdk.DEFAULT_LATITUDE, weather_sdk.DEFAULT_LONGITUDE)
+        try:
+            with tracing.span('read_window') as span:
+                window = self.hourly_forecasts.window(location, start, end, self.fetch_hours)
+                span.set(cached=window.cached,
+                         buckets_stored=len(window.stored),
+                         buckets_fetched=len(window.fetched))
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code == 400:
+                # open-meteo rejects hours outside of what it forecasts
+                return _response(400, {'message': 'the window is outside of the forecast range'})
+            _LOG.error('Forecast request failed: %s', e)
+            return _response(502, {'message': 'Forecast service unavailable'})
+        except requests.RequestException as e:
+            _LOG.error('Forecast request failed: %s', e)
+            return _response(502, {'message': 'Forecast service unavailable'})
+        self.put_metric('ForecastWindowCached', int(window.cached))
+        self.put_metric('ForecastBucketsStored', len(window.stored))
+        self.put_metric('ForecastBucketsFetched', len(window.fetched))
+        return _response(200, window.forecast)
+
+    @ROUTER.route('GET', '/weather')
+    @ROUTER.route('GET', '/')
+    def get_weather(self, event):
+        try:
+            window = forecast_window(event)
+        except BadRequest as e:
+            return _response(400, {'message': str(e)})
+        if window is not None:
+            return self.get_weather_window(*window)
+        weather = WEATHER.get_weather().json()
+        location = location_key(weather_sdk.DEFAULT_LATITUDE, weather_sdk.DEFAULT_LONGITUDE)
+        res = _response(200, weather)
+        with tracing.span('save_forecast') as span:
+            latest = self.forecasts.save(weather, location)
+            buckets = self.hourly_forecasts.save(weather, location)
+            span.set(forecast_hours=len(weather['hourly']['time']),
+                     forecast_written=bool(latest.written),
+                     buckets_written=len(buckets.written),
+                     buckets_skipped=len(buckets.skipped))
+        self.put_metric('ForecastBucketsWritten', len(buckets.written))
+        self.put_metric('ForecastBucketsSkipped', len(buckets.skipped))
+
+        return res
+
     def handle_request(self, event, context):
         """
         Explain incoming event here
         """
         _LOG.info(event)
-        method = event.get('requestContext', {}).get('http', {}).get('method')
-        path = event.get('requestContext', {}).get('http', {}).get('path')
-
-        if path in ["/weather", "/"]:
-            table_name = os.getenv('table_name')
-            dynamodb = boto3.resource('dynamodb')
-            _LOG.info(f"{table_name=}")
-            table = dynamodb.Table(table_name)
-            response = requests.get("https://api.open-meteo.com/v1/forecast?latitude=52.52&longitude=13.41&current=temperature_2m,wind_speed_10m&hourly=temperature_2m,relative_humidity_2m,wind_speed_10m")
-            weather = response.json()
-            res = {
-                    "headers": {
-                        "Content-Type": "application/json"
-                        },
-                    "statusCode": 200,
-                    "body": weather
-                    }
-            record = {}
-            forecast = {
-                "elevation": weather['elevation'],
-                "generationtime_ms": weather['generationtime_ms'],
-                "hourly": {
-                    "temperature_2m": weather['hourly']['temperature_2m'],
-                    "time": weather['hourly']['time']
-                },
-                "hourly_units": {
-                    "temperature_2m":  weather['hourly_units']['temperature_2m'],
-                    "time": weather['hourly_units']['time']
-                },
-                "latitude": weather['latitude'],
-                "longitude": weather['longitude'],
-                "timezone": weather['timezone'],
-                "timezone_abbreviation": weather['timezone_abbreviation'],
-                "utc_offset_seconds": weather['utc_offset_seconds']
-            }
-            record["id"] = str(uuid.uuid4())
-            record["forecast"] = forecast
-            _LOG.info(record)
-            _LOG.info(forecast)
-
-            item = json.loads(json.dumps(record), parse_float=Decimal)
-
-           
-            table.put_item(Item=item)
-
-            return res
-        return 200
+        # the open-meteo call gives up before the function times out
+        with weather_sdk.deadline(context):
+            return ROUTER.dispatch(self, event)
     
 
 HANDLER = Processor()
@@ -0,0 +1,6 @@
+import importlib
+from tests import ImportFromSourceContext
+
+with ImportFromSourceContext():
+    FORECAST_STORE = importlib.import_module("commons.forecast_store")
+    TRACING = importlib.import_module("commons.tracing")
@@ -0,0 +1,275 @@
+import math
+import unittest
+from decimal import Decimal
+
+from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.types import Binary
+
+from tests.local_dynamodb import LocalTable
+from tests.test_commons import FORECAST_STORE
+
+
+def open_meteo_forecast(hours=168):
+    return {
+        "latitude": 52.52,
+        "longitude": 13.419998,
+        "generationtime_ms": 0.0560283660888672,
+        "utc_offset_seconds": 0,
+        "timezone": "GMT",
+        "timezone_abbreviation": "GMT",
+        "elevation": 38.0,
+        "hourly_units": {"time": "iso8601", "temperature_2m": "°C"},
+        "hourly": {
+            "time": [f"2024-05-{1 + h // 24:02d}T{h % 24:02d}:00" for h in range(hours)],
+            "temperature_2m": [round(9.4 + (h % 24) * 0.6 - (h // 24) * 0.3, 1) for h in range(hours)],
+        },
+    }
+
+
+class TestColumns(unittest.TestCase):
+
+    def test_tenths_pack_as_int16(self):
+        values = [18.2, -3.5, None, 0.0, 31.9]
+        packed = FORECAST_STORE.pack_column(values, compress=False)
+        self.assertEqual(packed[:2], bytes((FORECAST_STORE.CODEC_INT16, 1)))
+        self.assertEqual(len(packed), 2 + 2 * len(values))
+        self.assertEqual(FORECAST_STORE.unpack_column(packed), values)
+
+    def test_whole_numbers_keep_no_decimals(self):
+        values = [55, 61, 100, 0]
+        packed = FORECAST_STORE.pack_column(values, compress=False)
+        self.assertEqual(packed[1], 0)
+        self.assertEqual(FORECAST_STORE.unpack_column(packed), values)
+
+    def test_other_values_fall_back_to_float32(self):
+        values = [1013.25678, 1e6, None]
+        packed = FORECAST_STORE.pack_column(values, compress=False)
+        self.assertEqual(packed[0], FORECAST_STORE.CODEC_FLOAT32)
+        self.assertEqual(FORECAST_STORE.unpack_column(packed), [1013.257, 1000000.0, None])
+
+    def test_compression_only_when_smaller(self):
+        smooth = [round((10 + h * 0.1) % 20, 1) for h in range(168)]
+        packed = FORECAST_STORE.pack_column(smooth)
+        self.assertTrue(packed[0] & FORECAST_STORE.FLAG_ZLIB)
+        self.assertLess(len(packed), 2 * 168)
+        self.assertEqual(FORECAST_STORE.unpack_column(packed), smooth)
+        short = FORECAST_STORE.pack_column([1.5, 2.5])
+        self.assertFalse(short[0] & FORECAST_STORE.FLAG_ZLIB)
+
+    def test_binary_attribute_values_unpack(self):
+        packed = FORECAST_STORE.pack_column([1.5, 2.5])
+        self.assertEqual(FORECAST_STORE.unpack_column(Binary(packed)), [1.5, 2.5])
+
+    def test_nan_is_missing(self):
+        packed = FORECAST_STORE.pack_column([0.123456789, math.nan])
+        self.assertEqual(FORECAST_STORE.unpack_column(packed), [0.1234568, None])
+
+
+class TestTimes(unittest.TestCase):
+
+    def test_even_times_pack_to_start_and_step(self):
+        times = open_meteo_forecast(48)["hourly"]["time"]
+        start, step = FORECAST_STORE.pack_times(times)
+        self.assertEqual((start, step), (1714521600, 3600))
+        self.assertEqual(FORECAST_STORE.unpack_times(start, step, len(times)), times)
+
+    def test_uneven_times_do_not_pack(self):
+        self.assertIsNone(
+            FORECAST_STORE.pack_times(["2024-05-01T00:00", "2024-05-01T01:00", "2024-05-01T03:00"])
+        )
+
+
+class TestForecastRepository(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.table = LocalTable("Weather", hash_key="id")
+        self.repository = FORECAST_STORE.ForecastRepository(self.table)
+
+    def test_round_trip(self):
+        weather = open_meteo_forecast()
+        item = self.repository.put(weather)
+        stored = self.table.get_item(Key={"id": item["id"]})["Item"]["forecast"]
+        self.assertEqual(stored["hourly"]["count"], 168)
+        self.assertIsInstance(stored["hourly"]["temperature_2m"], bytes)
+        self.assertNotIn("time", stored["hourly"])
+
+        forecast = self.repository.get(item["id"])["forecast"]
+        self.assertEqual(forecast["hourly"], weather["hourly"])
+        self.assertEqual(forecast["hourly_units"], weather["hourly_units"])
+        self.assertEqual(forecast["latitude"], 52.52)
+        self.assertEqual(forecast["utc_offset_seconds"], 0)
+
+    def test_item_is_much_smaller(self):
+        item = self.repository.item(open_meteo_forecast())
+        # 168 Decimal temperatures and 168 time strings before
+        self.assertLess(len(item["forecast"]["hourly"]["temperature_2m"]), 2 + 2 * 168)
+
+    def test_items_written_before_the_encoding_still_decode(self):
+        weather = open_meteo_forecast(3)
+        self.table.put_item(
+            Item={
+                "id": "legacy",
+                "forecast": {
+                    "latitude": Decimal("52.52"),
+                    "hourly": {
+                        "time": weather["hourly"]["time"],
+                        "temperature_2m": [Decimal(str(v)) for v in weather["hourly"]["temperature_2m"]],
+                    },
+                },
+            }
+        )
+        forecast = self.repository.get("legacy")["forecast"]
+        self.assertEqual(forecast["hourly"], weather["hourly"])
+        self.assertIsNone(self.repository.get("missing"))
+
+    def test_save_skips_an_unchanged_forecast(self):
+        weather = open_meteo_forecast()
+        self.assertEqual(self.repository.save(weather, "52.52,13.41").written, ["52.52,13.41"])
+        # only open-meteo's timing differs
+        again = {**weather, "generationtime_ms": 0.071}
+        self.assertEqual(self.repository.save(again, "52.52,13.41").skipped, ["52.52,13.41"])
+        self.assertEqual(self.table.calls, ["GetItem", "PutItem"])
+
+        changed = open_meteo_forecast()
+        changed["hourly"]["temperature_2m"][100] = 30.5
+        self.assertTrue(self.repository.save(changed, "52.52,13.41").written)
+        self.assertEqual(len(self.table.scan()["Items"]), 1)
+        forecast = self.repository.get("52.52,13.41")["forecast"]
+        self.assertEqual(forecast["hourly"]["temperature_2m"][100], 30.5)
+
+    def test_a_new_container_reads_the_stored_fingerprint(self):
+        weather = open_meteo_forecast()
+        self.repository.save(weather, "52.52,13.41")
+        self.table.reset_metrics()
+        repository = FORECAST_STORE.ForecastRepository(self.table)
+        self.assertFalse(repository.save(weather, "52.52,13.41").written)
+        self.assertEqual(self.table.calls, ["GetItem"])
+
+
+class TestHourlyRepository(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.table = LocalTable("WeatherHourly", hash_key="locationId", range_key="bucketStart")
+        self.repository = FORECAST_STORE.HourlyRepository(self.table, clock=lambda: 1714521600)
+
+    def test_one_item_per_day(self):
+        weather = open_meteo_forecast()
+        result = self.repository.save(weather, "52.52,13.41")
+        self.assertEqual(result.written, [1714521600 + day * 86400 for day in range(7)])
+        item = self.table.get_item(Key={"locationId": "52.52,13.41", "bucketStart": 1714608000})["Item"]
+        self.assertEqual(item["hourly"]["count"], 24)
+        self.assertEqual(item["hourly"]["start"], 1714608000)
+        self.assertEqual(item["expiration"], 1714608000 + 86400 + 30 * 86400)
+        self.assertEqual(
+            FORECAST_STORE.decode_hourly(item["hourly"])["temperature_2m"],
+            weather["hourly"]["temperature_2m"][24:48],
+        )
+
+    def test_a_time_range_is_one_query(self):
+        self.repository.save(open_meteo_forecast(), "52.52,13.41")
+        self.repository.save(open_meteo_forecast(48), "50.06,19.94")
+        response = self.table.query(
+            KeyConditionExpression=Key("locationId").eq("52.52,13.41")
+            & Key("bucketStart").between(1714608000, 1714780800)
+        )
+        self.assertEqual([item["bucketStart"] for item in response["Items"]], [1714608000, 1714694400, 1714780800])
+
+    def test_only_changed_buckets_are_written(self):
+        weather = open_meteo_forecast()
+        self.repository.save(weather, "52.52,13.41")
+        self.table.reset_metrics()
+
+        self.assertEqual(self.repository.save(weather, "52.52,13.41").written, [])
+        self.assertEqual(self.table.calls, [])
+
+        changed = open_meteo_forecast()
+        changed["hourly"]["temperature_2m"][50] = 30.5
+        result = self.repository.save(changed, "52.52,13.41")
+        self.assertEqual(result.written, [1714694400])
+        self.assertEqual(len(result.skipped), 6)
+        self.assertEqual(self.table.calls, ["PutItem"])
+
+    def test_a_new_container_reads_fingerprints_with_one_query(self):
+        weather = open_meteo_forecast()
+        self.repository.save(weather, "52.52,13.41")
+        self.table.reset_metrics()
+        repository = FORECAST_STORE.HourlyRepository(self.table)
+        # the window moved on by a day: one new bucket, six stored
+        moved = open_meteo_forecast(192)
+        moved["hourly"] = {name: column[24:] for name, column in moved["hourly"].items()}
+        result = repository.save(moved, "52.52,13.41")
+        self.assertEqual(result.written, [1714521600 + 7 * 86400])
+        self.assertEqual(self.table.calls, ["Query", "PutItem"])
+
+    def test_bucket_hours(self):
+        repository = FORECAST_STORE.HourlyRepository(self.table, bucket_hours=6)
+        result = repository.save(open_meteo_forecast(24), "52.52,13.41")
+        self.assertEqual(len(result.written), 4)
+
+
+class TestWindows(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.table = LocalTable("WeatherHourly", hash_key="locationId", range_key="bucketStart")
+        self.now = 1714521600
+        self.repository = FORECAST_STORE.HourlyRepository(self.table, clock=lambda: self.now)
+        self.repository.save(open_meteo_forecast(72), "52.52,13.41")
+        self.fetches = []
+        self.table.reset_metrics()
+
+    def fetch(self, first, last):
+        self.fetches.append((first, last))
+        weather = open_meteo_forecast(168)
+        times = weather["hourly"]["time"]
+        keep = [FORECAST_STORE.local_seconds(t) for t in times]
+        indexes = [i for i, seconds in enumerate(keep) if first <= seconds <= last]
+        weather["hourly"] = {name: [column[i] for i in indexes] for name, column in weather["hourly"].items()}
+        return weather
+
+    def test_stored_window_is_one_projected_query(self):
+        window = self.repository.window("52.52,13.41", 1714543200, 1714626000, self.fetch)
+        self.assertEqual(self.table.calls, ["Query"])
+        self.assertEqual(self.fetches, [])
+        self.assertEqual(window.stored, [1714521600, 1714608000])
+        hourly = window.forecast["hourly"]
+        self.assertEqual((hourly["time"][0], hourly["time"][-1]), ("2024-05-01T06:00", "2024-05-02T05:00"))
+        expected = open_meteo_forecast(72)["hourly"]["temperature_2m"][6:30]
+        self.assertEqual(hourly["temperature_2m"], expected)
+        self.assertEqual(window.forecast["timezone"], "GMT")
+        self.assertEqual(window.forecast["hourly_units"]["temperature_2m"], "°C")
+
+        items = self.repository.read("52.52,13.41", 1714521600, 1714521600)
+        self.assertNotIn("fingerprint", items[1714521600])
+
+    def test_only_missing_buckets_are_fetched(self):
+        window = self.repository.window("52.52,13.41", 1714608000, 1714867199, self.fetch)
+        self.assertEqual(self.fetches, [(1714694400 + 86400, 1714780800 + 86400 - 3600)])
+        self.assertEqual(window.fetched, [1714780800])
+        self.assertEqual(len(window.forecast["hourly"]["time"]), 72)
+        # the fetched day is stored for the next reads
+        self.assertIn(("52.52,13.41", 1714780800), self.table._items)
+
+    def test_stale_forecasts_are_fetched_again(self):
+        for bucket in (1714521600, 1714608000):
+            self.table.update_item(
+                Key={"locationId": "52.52,13.41", "bucketStart": bucket},
+                UpdateExpression="SET fetchedAt = :fetched",
+                ExpressionAttributeValues={":fetched": 1714608060},
+            )
+        self.table.reset_metrics()
+        self.now = 1714608060 + FORECAST_STORE.FORECAST_MAX_AGE_SECONDS
+        window = self.repository.window("52.52,13.41", 1714521600, 1714608000 + 23 * 3600, self.fetch)
+        # the first day was over when fetched, the second was still ahead
+        self.assertEqual(window.fetched, [1714608000])
+        # it came back unchanged: no put, the fetch time moves on
+        self.assertEqual(self.table.calls, ["Query", "UpdateItem"])
+        stored = self.table.get_item(Key={"locationId": "52.52,13.41", "bucketStart": 1714608000})["Item"]
+        self.assertEqual(stored["fetchedAt"], self.now)
+
+    def test_windows_are_cached(self):
+        self.repository.window("52.52,13.41", 1714521600, 1714550400, self.fetch)
+        window = self.repository.window("52.52,13.41", 1714521600, 1714550400, self.fetch)
+        self.assertTrue(window.cached)
+        self.assertEqual(self.table.calls, ["Query"])
+        self.now += FORECAST_STORE.WINDOW_CACHE_SECONDS
+        self.assertFalse(self.repository.window("52.52,13.41", 1714521600, 1714550400, self.fetch).cached)
@@ -0,0 +1,263 @@
+import json
+import os
+import socket
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import boto3
+import requests
+from botocore.client import BaseClient
+from botocore.stub import Stubber
+
+from tests.test_commons import TRACING
+
+TRACE_HEADER = "Root=1-5759e988-bd862e3fe1be46a994272793;Parent=53995c3f42cd8ad8;Sampled=1"
+
+
+class Collector:
+    """In-memory exporter"""
+
+    def __init__(self):
+        self.spans = []
+        self.flushes = 0
+
+    def export(self, span):
+        self.spans.append(span)
+
+    def flush(self):
+        self.flushes += 1
+
+
+class FixedAdapter(requests.adapters.BaseAdapter):
+    def __init__(self, status=200, content=b'{"ok": true}'):
+        super().__init__()
+        self.status = status
+        self.content = content
+
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = self.status
+        response._content = self.content
+        response.headers["Content-Length"] = str(len(self.content))
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+def finished_span(kind="local", error=None, **attributes):
+    span = TRACING.Span(TRACING.Tracer(exporter=Collector(), enabled=True), "op", kind, attributes)
+    span.id, span.parent_id, span.trace_id, span.sampled = "a" * 16, "b" * 16, "1-abc", True
+    span.start, span.end, span.error = 10.0, 10.25, error
+    return span
+
+
+class TestSpans(unittest.TestCase):
+
+    def setUp(self) -> None:
+        patcher = mock.patch.dict(os.environ, {"_X_AMZN_TRACE_ID": TRACE_HEADER})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.exporter = Collector()
+        self.tracer = TRACING.Tracer(exporter=self.exporter, enabled=True)
+
+    def test_nested_spans_point_at_their_parent(self):
+        with self.tracer.span("outer") as outer:
+            with self.tracer.span("inner", kind="aws") as inner:
+                inner.set(items=3)
+            with self.tracer.span("sibling"):
+                pass
+
+        self.assertEqual([span.name for span in self.exporter.spans], ["inner", "sibling", "outer"])
+        self.assertEqual(outer.parent_id, "53995c3f42cd8ad8")
+        self.assertEqual(outer.trace_id, "1-5759e988-bd862e3fe1be46a994272793")
+        self.assertTrue(outer.sampled)
+        for child in self.exporter.spans[:2]:
+            self.assertEqual(child.parent_id, outer.id)
+            self.assertEqual(child.trace_id, outer.trace_id)
+        self.assertNotEqual(inner.id, outer.id)
+        self.assertEqual(inner.to_record()["items"], 3)
+
+    def test_span_after_nesting_is_a_root_again(self):
+        with self.tracer.span("first"):
+            pass
+        with self.tracer.span("second") as second:
+            pass
+        self.assertEqual(second.parent_id, "53995c3f42cd8ad8")
+
+    def test_exception_is_recorded_and_raised(self):
+        with self.assertRaises(KeyError):
+            with self.tracer.span("failing"):
+                raise KeyError("id")
+        self.assertEqual(self.exporter.spans[0].to_record()["error"], "KeyError: 'id'")
+
+    def test_disabled_tracer_exports_nothing(self):
+        tracer = TRACING.Tracer(exporter=self.exporter, enabled=False)
+        with tracer.span("skipped") as span:
+            span.set(items=1)
+        self.assertIs(span, TRACING.NOOP_SPAN)
+        self.assertEqual(self.exporter.spans, [])
+
+
+class TestExporters(unittest.TestCase):
+
+    def test_no_file_is_written_without_trace_file(self):
+        with mock.patch.dict(os.environ, {}, clear=True):
+            tracer = TRACING.Tracer(enabled=True)
+        self.assertIsInstance(tracer.exporter, TRACING.NoopExporter)
+
+    def test_trace_file_is_opt_in(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory, "traces.jsonl")
+            with mock.patch.dict(os.environ, {"trace_file": str(path)}, clear=True):
+                tracer = TRACING.Tracer(enabled=True)
+                with tracer.span("convert") as span:
+                    span.set(items=2)
+                tracer.flush()
+            records = [json.loads(line) for line in path.read_text().splitlines()]
+            tracer.exporter._file.close()
+        self.assertEqual([(r["name"], r["items"]) for r in records], [("convert", 2)])
+
+    def test_daemon_address_selects_xray(self):
+        with mock.patch.dict(os.environ, {"AWS_XRAY_DAEMON_ADDRESS": "127.0.0.1:2000"}):
+            tracer = TRACING.Tracer(enabled=True)
+        self.addCleanup(tracer.exporter._socket.close)
+        self.assertIsInstance(tracer.exporter, TRACING.XRayExporter)
+        self.assertEqual(tracer.exporter.address, ("127.0.0.1", 2000))
+
+    def test_aws_subsegment(self):
+        span = finished_span(
+            "aws", operation="GetItem", table_name="Weather", region="eu-west-1",
+            request_id="R1", status=200, response_bytes=512, retries=0,
+        )
+        document = TRACING.XRayExporter.subsegment(span)
+        self.assertEqual(
+            document,
+            {
+                "name": "op",
+                "id": "a" * 16,
+                "trace_id": "1-abc",
+                "parent_id": "b" * 16,
+                "start_time": 10.0,
+                "end_time": 10.25,
+                "type": "subsegment",
+                "namespace": "aws",
+                "aws": {
+                    "operation": "GetItem",
+                    "table_name": "Weather",
+                    "region": "eu-west-1",
+                    "request_id": "R1",
+                },
+                "http": {"response": {"status": 200, "content_length": 512}},
+                "metadata": {"default": {"retries": 0}},
+            },
+        )
+
+    def test_http_subsegment_errors_and_faults(self):
+        client_error = TRACING.XRayExporter.subsegment(
+            finished_span("http", method="GET", url="https://api.open-meteo.com/v1/forecast", status=404)
+        )
+        self.assertEqual(client_error["namespace"], "remote")
+        self.assertEqual(
+            client_error["http"],
+            {
+                "request": {"method": "GET", "url": "https://api.open-meteo.com/v1/forecast"},
+                "response": {"status": 404, "content_length": None},
+            },
+        )
+        self.assertTrue(client_error["error"])
+        self.assertNotIn("fault", client_error)
+
+        server_error = TRACING.XRayExporter.subsegment(finished_span("http", status=503))
+        self.assertTrue(server_error["fault"])
+
+        no_response = TRACING.XRayExporter.subsegment(finished_span("http", error="ConnectTimeout: x"))
+        self.assertTrue(no_response["fault"])
+        self.assertEqual(no_response["cause"]["exceptions"][0]["message"], "ConnectTimeout: x")
+
+    def test_xray_exporter_sends_sampled_spans_to_the_daemon(self):
+        daemon = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.addCleanup(daemon.close)
+        daemon.bind(("127.0.0.1", 0))
+        daemon.settimeout(2)
+        exporter = TRACING.XRayExporter(f"127.0.0.1:{daemon.getsockname()[1]}")
+        self.addCleanup(exporter._socket.close)
+
+        unsampled = finished_span()
+        unsampled.sampled = False
+        exporter.export(unsampled)
+        exporter.export(finished_span(items=1))
+
+        payload = daemon.recv(65536)
+        header, _, document = payload.partition(b"\n")
+        self.assertEqual(header + b"\n", TRACING.XRAY_HEADER)
+        self.assertEqual(json.loads(document)["metadata"], {"default": {"items": 1}})
+
+
+class TestPatch(unittest.TestCase):
+
+    def setUp(self) -> None:
+        was_patched = TRACING.patched()
+        exporter = TRACING.TRACER.exporter
+        enabled = TRACING.TRACER.enabled
+        TRACING.unpatch()
+        self.original_api_call = BaseClient._make_api_call
+        self.original_send = requests.Session.send
+
+        def restore():
+            TRACING.unpatch()
+            if was_patched:
+                TRACING.patch()
+            TRACING.TRACER.exporter = exporter
+            TRACING.TRACER.enabled = enabled
+
+        self.addCleanup(restore)
+        self.exporter = Collector()
+        TRACING.TRACER.exporter = self.exporter
+        TRACING.TRACER.enabled = True
+
+    def get_item(self):
+        client = boto3.client(
+            "dynamodb",
+            region_name="eu-west-1",
+            aws_access_key_id="test",
+            aws_secret_access_key="test",
+        )
+        with Stubber(client) as stubber:
+            stubber.add_response("get_item", {"Item": {"id": {"S": "1"}}})
+            client.get_item(TableName="Weather", Key={"id": {"S": "1"}})
+
+    def fetch(self, status=200):
+        session = requests.Session()
+        session.mount("https://", FixedAdapter(status))
+        return session.get("https://api.open-meteo.com/v1/forecast?latitude=52.52")
+
+    def test_patch_traces_boto_and_requests_calls(self):
+        TRACING.patch()
+        TRACING.patch()
+        self.get_item()
+        self.fetch(status=502)
+
+        aws, http = self.exporter.spans
+        self.assertEqual((aws.name, aws.kind), ("DynamoDB", "aws"))
+        self.assertEqual(aws.attributes["operation"], "GetItem")
+        self.assertEqual(aws.attributes["table_name"], "Weather")
+        self.assertEqual((http.name, http.kind), ("api.open-meteo.com", "http"))
+        self.assertEqual(http.attributes["url"], "https://api.open-meteo.com/v1/forecast")
+        self.assertEqual(http.attributes["status"], 502)
+        self.assertEqual(http.attributes["response_bytes"], len(b'{"ok": true}'))
+
+    def test_unpatch_restores_the_originals(self):
+        TRACING.patch()
+        self.assertIsNot(BaseClient._make_api_call, self.original_api_call)
+        TRACING.unpatch()
+        self.assertFalse(TRACING.patched())
+        self.assertIs(BaseClient._make_api_call, self.original_api_call)
+        self.assertIs(requests.Session.send, self.original_send)
+        self.get_item()
+        self.fetch()
+        self.assertEqual(self.exporter.spans, [])
@@ -0,0 +1,28 @@
+import os
+import unittest
+import importlib
+from tests import ImportFromSourceContext
+from tests.local_dynamodb import LocalTable
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "eu-west-1")
+
+with ImportFromSourceContext():
+    LAMBDA_HANDLER = importlib.import_module("lambdas.processor.handler")
+    FORECAST_STORE = importlib.import_module("commons.forecast_store")
+
+
+def local_handler(table, hourly_table, **hourly_options):
+    """Processor whose repositories are backed by local tables"""
+    handler = LAMBDA_HANDLER.Processor()
+    handler.forecasts = FORECAST_STORE.ForecastRepository(table)
+    handler.hourly_forecasts = FORECAST_STORE.HourlyRepository(hourly_table, **hourly_options)
+    return handler
+
+
+class ProcessorLambdaTestCase(unittest.TestCase):
+    """Common setups for this lambda"""
+
+    def setUp(self) -> None:
+        self.table = LocalTable("Weather", hash_key="id")
+        self.hourly_table = LocalTable("WeatherHourly", hash_key="locationId", range_key="bucketStart")
+        self.HANDLER = local_handler(self.table, self.hourly_table)
@@ -0,0 +1,108 @@
+import io
+import json
+from unittest import mock
+
+from tests.local_open_meteo import LocalOpenMeteo
+from tests.test_processor import LAMBDA_HANDLER, ProcessorLambdaTestCase
+
+
+def weather_event(**params):
+    return {
+        "httpMethod": "GET",
+        "path": "/weather",
+        "resource": "/weather",
+        "queryStringParameters": params or None,
+    }
+
+
+class TestForecastWindow(ProcessorLambdaTestCase):
+
+    def test_no_window_is_the_live_forecast(self):
+        self.assertIsNone(LAMBDA_HANDLER.forecast_window(weather_event()))
+
+    def test_hours(self):
+        window = LAMBDA_HANDLER.forecast_window(
+            weather_event(start_hour="2024-05-02T06:30", end_hour="2024-05-03T18:00")
+        )
+        self.assertEqual(window, (1714629600, 1714759200))
+
+    def test_dates_are_whole_days(self):
+        window = LAMBDA_HANDLER.forecast_window(weather_event(start_date="2024-05-02"))
+        self.assertEqual(window, (1714608000, 1714608000 + 23 * 3600))
+
+    def test_invalid_windows(self):
+        for params in (
+            {"start_hour": "tomorrow"},
+            {"end_date": "2024-05-02"},
+            {"start_date": "2024-05-03", "end_date": "2024-05-02"},
+            {"start_date": "2024-05-01", "end_date": "2024-05-20"},
+        ):
+            with self.subTest(params):
+                with self.assertRaises(LAMBDA_HANDLER.BadRequest):
+                    LAMBDA_HANDLER.forecast_window(weather_event(**params))
+
+
+class TestWeather(ProcessorLambdaTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.open_meteo = LocalOpenMeteo().__enter__()
+        self.addCleanup(self.open_meteo.__exit__, None, None, None)
+        patcher = mock.patch.object(LAMBDA_HANDLER.WEATHER, "url", self.open_meteo.url)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, **params):
+        self.HANDLER.metrics_stream = io.StringIO()
+        response = self.HANDLER.lambda_handler(weather_event(**params), None)
+        (line,) = [json.loads(line) for line in self.HANDLER.metrics_stream.getvalue().splitlines()]
+        return response, line
+
+    def test_live_forecast_is_stored_once(self):
+        first, metrics = self.get()
+        self.assertEqual(first["statusCode"], 200)
+        self.assertIn("current", first["body"])
+        self.assertEqual(metrics["ForecastBucketsWritten"], 1)
+        _, metrics = self.get()
+        self.assertEqual((metrics["ForecastBucketsWritten"], metrics["ForecastBucketsSkipped"]), (0, 1))
+        self.assertEqual(self.table.calls.count("PutItem"), 1)
+
+    def test_window_is_read_from_the_table(self):
+        self.get()
+        self.open_meteo.requests.clear()
+        response, metrics = self.get(start_hour="2024-05-01T06:00", end_hour="2024-05-01T08:00")
+        self.assertEqual(response["statusCode"], 200)
+        self.assertEqual(
+            response["body"]["hourly"],
+            {"time": ["2024-05-01T06:00", "2024-05-01T07:00", "2024-05-01T08:00"], "temperature_2m": [13.0, 13.5, 14.0]},
+        )
+        self.assertEqual(self.open_meteo.requests, [])
+        self.assertEqual((metrics["ForecastBucketsStored"], metrics["ForecastBucketsFetched"]), (1, 0))
+
+    def test_missing_days_are_fetched_and_stored(self):
+        self.get()
+        self.open_meteo.requests.clear()
+        response, metrics = self.get(start_date="2024-05-01", end_date="2024-05-03")
+        self.assertEqual(len(response["body"]["hourly"]["time"]), 72)
+        (request,) = self.open_meteo.requests
+        self.assertEqual((request["start_hour"], request["end_hour"]), ("2024-05-02T00:00", "2024-05-03T23:00"))
+        self.assertEqual(request["hourly"], "temperature_2m")
+        self.assertEqual((metrics["ForecastBucketsStored"], metrics["ForecastBucketsFetched"]), (1, 2))
+        self.assertEqual(len(self.hourly_table.scan()["Items"]), 3)
+
+        _, metrics = self.get(start_date="2024-05-01", end_date="2024-05-03")
+        self.assertEqual(metrics["ForecastWindowCached"], 1)
+        self.assertEqual(len(self.open_meteo.requests), 1)
+
+    def test_bad_window(self):
+        response, _ = self.get(start_hour="soon")
+        self.assertEqual(response["statusCode"], 400)
+        self.assertEqual(self.open_meteo.requests, [])
+
+    def test_upstream_failures(self):
+        self.open_meteo.rejects = {52.52: 400}
+        response, _ = self.get(start_date="2024-08-01")
+        self.assertEqual(response["statusCode"], 400)
+        self.open_meteo.rejects = {52.52: 503}
+        response, _ = self.get(start_date="2024-08-01")
+        self.assertEqual(response["statusCode"], 502)
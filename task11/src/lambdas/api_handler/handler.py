@@ -1,6 +1,7 @@
 from commons.log_helper import get_logger
 from commons.abstract_lambda import AbstractLambda
 import boto3
+from boto3.dynamodb.conditions import Key
 import json
 import uuid
 import os
@@ -10,6 +11,9 @@ import datetime
 
 _LOG = get_logger("ApiHandler-handler")
 
+TABLES_NUMBER_INDEX = "number-index"
+RESERVATIONS_TABLE_DATE_INDEX = "tableNumber-date-index"
+
 
 class DecimalEncoder(json.JSONEncoder):
     def default(self, obj):
@@ -38,8 +42,8 @@ class ApiHandler(AbstractLambda):
         }
 
     def signup(self, event):
-        body = json.loads(event["body"])
         try:
+            body = json.loads(event["body"])
             response = self.cognito.sign_up(
                 ClientId=self.client_id,
                 Username=body["email"],
@@ -50,13 +54,19 @@ class ApiHandler(AbstractLambda):
                     {"Name": "family_name", "Value": body["lastName"]},
                 ],
             )
-            _LOG.info(f"Sign-up response: {response}")
+            _LOG.info(
+                "Sign-up completed",
+                extra={"user_sub": response.get("UserSub"), "confirmed": response.get("UserConfirmed")},
+            )
 
             if not response.get("UserConfirmed"):
                 confirm_resp = self.cognito.admin_confirm_sign_up(
                     UserPoolId=self.user_pool_id, Username=body["email"]
                 )
-                _LOG.info(f"Confirm response: {confirm_resp}")
+                _LOG.info(
+                    "Sign-up confirmed",
+                    extra={"status": confirm_resp["ResponseMetadata"].get("HTTPStatusCode")},
+                )
                 response["UserConfirmed"] = True
 
             return self._json_response(
@@ -66,17 +76,19 @@ class ApiHandler(AbstractLambda):
             return self._json_response(400, {"message": "Bad request", "error": str(e)})
 
     def signin(self, event):
-        body = json.loads(event["body"])
-        auth_params = {"USERNAME": body["email"], "PASSWORD": body["password"]}
-
         try:
+            body = json.loads(event["body"])
+            auth_params = {"USERNAME": body["email"], "PASSWORD": body["password"]}
             response = self.cognito.admin_initiate_auth(
                 UserPoolId=self.user_pool_id,
                 ClientId=self.client_id,
                 AuthFlow="ADMIN_NO_SRP_AUTH",
                 AuthParameters=auth_params,
             )
-            _LOG.info(f"Authentication response: {response}")
+            _LOG.info(
+                "Authentication completed",
+                extra={"authenticated": "AuthenticationResult" in (response or {})},
+            )
 
             if response:
                 return self._json_response(
@@ -85,7 +97,7 @@ class ApiHandler(AbstractLambda):
             else:
                 return self._json_response(200, {"idToken": None})
         except Exception as e:
-            _LOG.error(f"Error in signin: {e}")
+            _LOG.error("Error in signin: %s", e)
             return self._json_response(400, {"message": "Bad request", "error": str(e)})
 
     def get_tables(self, event):
@@ -124,6 +136,29 @@ class ApiHandler(AbstractLambda):
         except Exception as e:
             return self._json_response(400, {"message": "Bad request", "error": str(e)})
 
+    def _table_number_exists(self, table_number):
+        response = self.tables_table.query(
+            IndexName=TABLES_NUMBER_INDEX,
+            KeyConditionExpression=Key("number").eq(table_number),
+            Select="COUNT",
+            Limit=1,
+        )
+        return response["Count"] > 0
+
+    def _query_reservations(self, table_number, date):
+        query_kwargs = {
+            "IndexName": RESERVATIONS_TABLE_DATE_INDEX,
+            "KeyConditionExpression": Key("tableNumber").eq(table_number)
+            & Key("date").eq(date),
+            "ProjectionExpression": "slotTimeStart, slotTimeEnd",
+        }
+        while True:
+            response = self.reservations_table.query(**query_kwargs)
+            yield from response["Items"]
+            if "LastEvaluatedKey" not in response:
+                return
+            query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
     def create_reservation(self, event):
         try:
             body = json.loads(event['body'])
@@ -137,17 +172,10 @@ class ApiHandler(AbstractLambda):
             slot_start = body["slotTimeStart"]
             slot_end = body["slotTimeEnd"]
 
-            tables = self.tables_table.scan()['Items']
-            if table_number not in [table["number"] for table in tables]:
+            if not self._table_number_exists(table_number):
                 return self._json_response(400, {'message': 'Table does not exist'})
 
-            reservations = self.reservations_table.scan(
-                FilterExpression="#tn = :table_number AND #d = :date",
-                ExpressionAttributeNames={"#tn": "tableNumber", "#d": "date"},
-                ExpressionAttributeValues={":table_number": table_number, ":date": date}
-            )['Items']
-
-            for res in reservations:
+            for res in self._query_reservations(table_number, date):
                 if slot_start < res["slotTimeEnd"] and slot_end > res["slotTimeStart"]:
                     return self._json_response(400, {'message': 'Time conflict: Table is already reserved.'})
 
@@ -191,4 +219,4 @@ HANDLER = ApiHandler()
 
 
 def lambda_handler(event, context):
-    return HANDLER.handle_request(event, context)
+    return HANDLER.lambda_handler(event=event, context=context)
@@ -1,6 +1,10 @@
+import atexit
+import json
 import logging
 import os
-from sys import stdout
+import random
+import sys
+import threading
 
 _name_to_level = {
     "CRITICAL": logging.CRITICAL,
@@ -11,13 +15,137 @@ _name_to_level = {
     "DEBUG": logging.DEBUG,
 }
 
+FIELD_MAX_CHARS = 2048
+BUFFER_CAPACITY = 200
+
+# attributes every LogRecord has; anything else was passed through extra=
+_RECORD_ATTRIBUTES = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+_ENCODER = json.JSONEncoder(default=str, ensure_ascii=False, separators=(",", ":"))
+_encode = _ENCODER.encode
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per record: timestamp, level, logger, message and the
+    fields passed with extra=. Formatting happens only for records that pass
+    the level check, and every field (the message too) is capped at
+    max_field_chars of JSON, larger values are replaced by a truncated string:
+
+        _LOG.debug("Request", extra={"event": event})
+    """
+
+    def __init__(self, max_field_chars=FIELD_MAX_CHARS):
+        super().__init__()
+        self.max_field_chars = max_field_chars
+
+    def _field(self, value):
+        limit = self.max_field_chars
+        if isinstance(value, str):
+            if len(value) <= limit:
+                return _encode(value)
+            return _encode(f"{value[:limit]}...[{len(value) - limit} chars truncated]")
+        # encode incrementally so a large event costs only what is logged
+        chunks = []
+        size = 0
+        for chunk in _ENCODER.iterencode(value):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > limit:
+                return _encode(f"{''.join(chunks)[:limit]}...[truncated]")
+        return "".join(chunks)
+
+    def format(self, record):
+        fields = [
+            ("timestamp", _encode(self.formatTime(record))),
+            ("level", _encode(record.levelname)),
+            ("logger", _encode(record.name)),
+            ("message", self._field(record.getMessage())),
+        ]
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRIBUTES:
+                fields.append((name, self._field(value)))
+        if record.exc_info:
+            fields.append(("exception", _encode(self.formatException(record.exc_info))))
+        return "{" + ",".join(f"{_encode(name)}:{value}" for name, value in fields) + "}"
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps records of a level with the configured probability, e.g.
+    {logging.DEBUG: 0.01}. Levels without a rate are always kept
+    """
+
+    def __init__(self, rates, rng=random.random):
+        super().__init__()
+        self.rates = rates
+        self._rng = rng
+
+    def filter(self, record):
+        rate = self.rates.get(record.levelno)
+        return rate is None or self._rng() < rate
+
+
+def parse_sampling(value):
+    """
+    "DEBUG=0.01,INFO=0.5" -> {logging.DEBUG: 0.01, logging.INFO: 0.5}
+    """
+    rates = {}
+    for part in filter(None, (part.strip() for part in (value or "").split(","))):
+        name, rate = part.split("=", 1)
+        rates[_name_to_level[name.strip().upper()]] = float(rate)
+    return rates
+
+
+class BufferedStreamHandler(logging.Handler):
+    """
+    Keeps formatted records in memory and writes them in one call on
+    flush(), which AbstractLambda calls at the end of every invocation.
+    Records at flush_level or above, or a full buffer, flush immediately so
+    errors are not lost if the invocation dies afterwards
+    """
+
+    def __init__(self, stream=None, capacity=BUFFER_CAPACITY, flush_level=logging.ERROR):
+        super().__init__()
+        self.stream = stream
+        self.capacity = capacity
+        self.flush_level = flush_level
+        self.buffer = []
+        self._buffer_lock = threading.Lock()
+
+    def emit(self, record):
+        try:
+            line = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        with self._buffer_lock:
+            self.buffer.append(line)
+            full = len(self.buffer) >= self.capacity
+        if full or record.levelno >= self.flush_level:
+            self.flush()
+
+    def flush(self):
+        with self._buffer_lock:
+            lines, self.buffer = self.buffer, []
+        if lines:
+            stream = self.stream or sys.stdout
+            stream.write("\n".join(lines) + "\n")
+            stream.flush()
+
+
 logger = logging.getLogger(__name__)
 logger.propagate = False
-console_handler = logging.StreamHandler(stream=stdout)
+console_handler = BufferedStreamHandler()
 console_handler.setFormatter(
-    logging.Formatter("%(asctime)s - %(levelname)s - %(name)s - %(message)s")
+    JsonFormatter(int(os.environ.get("log_field_max_chars", FIELD_MAX_CHARS)))
 )
+_sampling = parse_sampling(os.environ.get("log_sampling"))
+if _sampling:
+    console_handler.addFilter(SamplingFilter(_sampling))
 logger.addHandler(console_handler)
+atexit.register(console_handler.flush)
 
 
 log_level = _name_to_level.get(os.environ.get("log_level"))
@@ -31,3 +159,7 @@ def get_logger(log_name, level=log_level):
     if level:
         module_logger.setLevel(level)
     return module_logger
+
+
+def flush_logs():
+    console_handler.flush()
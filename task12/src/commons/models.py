@@ -0,0 +1,153 @@
+from decimal import Decimal
+
+
+def _int_value(name, value):
+    if isinstance(value, bool):
+        raise ValueError(f"{name} must be an integer")
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, (str, Decimal)):
+        try:
+            number = Decimal(value)
+        except ArithmeticError:
+            raise ValueError(f"{name} must be an integer")
+        if number.is_finite() and number == number.to_integral_value():
+            return int(number)
+    raise ValueError(f"{name} must be an integer")
+
+
+def _number_value(name, value):
+    if isinstance(value, bool) or not isinstance(value, (int, float, str, Decimal)):
+        raise ValueError(f"{name} must be a number")
+    try:
+        number = Decimal(str(value))
+    except ArithmeticError:
+        raise ValueError(f"{name} must be a number")
+    if not number.is_finite():
+        raise ValueError(f"{name} must be a number")
+    return number
+
+
+def _str_value(name, value):
+    if not isinstance(value, str):
+        raise ValueError(f"{name} must be a string")
+    return value
+
+
+def _bool_value(name, value):
+    if not isinstance(value, bool):
+        raise ValueError(f"{name} must be a boolean")
+    return value
+
+
+# field type -> (attribute value type, request validator, from_item expression)
+_FIELD_TYPES = {
+    "int": ("N", _int_value, "int({0}['N'])"),
+    "number": ("N", _number_value, "Decimal({0}['N'])"),
+    "str": ("S", _str_value, "{0}['S']"),
+    "bool": ("BOOL", _bool_value, "{0}['BOOL']"),
+}
+
+_TO_ITEM_EXPRESSIONS = {
+    "N": "{{'N': str(self.{0})}}",
+    "S": "{{'S': self.{0}}}",
+    "BOOL": "{{'BOOL': self.{0}}}",
+}
+
+
+def _compile(name, source, namespace):
+    exec(compile(source, f"<model {name}>", "exec"), namespace)
+    return namespace
+
+
+class Model:
+    """
+    Base of the __slots__ models stored in DynamoDB.
+
+    Subclasses declare FIELDS as {attribute name: field type} with field
+    types from _FIELD_TYPES, and __slots__ = tuple(FIELDS). Specialised
+    __init__, to_item, from_item, to_dict and from_request functions are
+    generated once per class, so marshalling to and from the low-level
+    client's attribute-value format does no per-attribute type inspection
+    """
+
+    __slots__ = ()
+    FIELDS = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if tuple(cls.FIELDS) != cls.__slots__:
+            raise TypeError(f"{cls.__name__}.__slots__ must be tuple(FIELDS)")
+        names = list(cls.FIELDS)
+        kinds = [_FIELD_TYPES[kind] for kind in cls.FIELDS.values()]
+        validators = {f"_validate_{name}": kind[1] for name, kind in zip(names, kinds)}
+        source = "\n".join(
+            [
+                f"def __init__(self, {', '.join(names)}):",
+                *(f"    self.{name} = {name}" for name in names),
+                "def to_item(self):",
+                "    return {",
+                *(
+                    f"        {name!r}: {_TO_ITEM_EXPRESSIONS[kind[0]].format(name)},"
+                    for name, kind in zip(names, kinds)
+                ),
+                "    }",
+                "def from_item(cls, item):",
+                "    self = cls.__new__(cls)",
+                *(
+                    f"    self.{name} = {kind[2].format(f'item[{name!r}]')}"
+                    for name, kind in zip(names, kinds)
+                ),
+                "    return self",
+                "def to_dict(self):",
+                f"    return {{{', '.join(f'{n!r}: self.{n}' for n in names)}}}",
+                "def from_request(cls, body):",
+                "    self = cls.__new__(cls)",
+                *(
+                    f"    self.{name} = _validate_{name}({name!r}, body[{name!r}])"
+                    for name in names
+                ),
+                "    return self",
+            ]
+        )
+        namespace = _compile(cls.__name__, source, {"Decimal": Decimal, **validators})
+        cls.__init__ = namespace["__init__"]
+        cls.to_item = namespace["to_item"]
+        cls.from_item = classmethod(namespace["from_item"])
+        cls.to_dict = namespace["to_dict"]
+        cls.from_request = classmethod(namespace["from_request"])
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.FIELDS)
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.FIELDS)
+        return f"{type(self).__name__}({fields})"
+
+
+class Table(Model):
+    FIELDS = {
+        "id": "int",
+        "number": "int",
+        "places": "int",
+        "isVip": "bool",
+        "minOrder": "number",
+    }
+    __slots__ = tuple(FIELDS)
+
+
+class Reservation(Model):
+    FIELDS = {
+        "id": "str",
+        "tableNumber": "int",
+        "clientName": "str",
+        "phoneNumber": "str",
+        "date": "str",
+        "slotTimeStart": "str",
+        "slotTimeEnd": "str",
+    }
+    __slots__ = tuple(FIELDS)
@@ -0,0 +1,146 @@
+import json
+
+RESPONSE_RESOURCE_NOT_FOUND_CODE = 404
+RESPONSE_METHOD_NOT_ALLOWED_CODE = 405
+
+
+def request_line(event) -> tuple:
+    """
+    Returns (method, path) for API Gateway REST (v1) events as well as
+    HTTP API (v2) and Function URL events
+    """
+    http = event.get("requestContext", {}).get("http")
+    if http:
+        return http.get("method"), http.get("path") or event.get("rawPath")
+    return event.get("httpMethod"), event.get("path")
+
+
+def default_error_response(status_code, method, path, headers=None):
+    return {
+        "statusCode": status_code,
+        "headers": {"Content-Type": "application/json", **(headers or {})},
+        "body": json.dumps(
+            {
+                "statusCode": status_code,
+                "message": "Bad request syntax or unsupported method. "
+                f"Request path: {path}. HTTP method: {method}",
+            }
+        ),
+        "isBase64Encoded": False,
+    }
+
+
+class _Node:
+    __slots__ = ("literals", "param_name", "param_node", "handlers")
+
+    def __init__(self):
+        self.literals = {}
+        self.param_name = None
+        self.param_node = None
+        self.handlers = {}
+
+
+def _segments(path):
+    return [segment for segment in path.split("/") if segment]
+
+
+class Router:
+    """
+    Method and path-template dispatch compiled into a segment trie.
+
+    Routes are declared once at import, usually on handler methods:
+
+        ROUTER = Router()
+
+        class ApiHandler(AbstractLambda):
+            @ROUTER.route("GET", "/tables/{tableId}")
+            def get_table_by_id(self, event, tableId):
+                ...
+
+            def handle_request(self, event, context):
+                return ROUTER.dispatch(self, event)
+
+    Literal segments take precedence over {param} segments. Unknown paths
+    get a 404 response and known paths with another method a 405
+    """
+
+    def __init__(self, error_response=default_error_response):
+        self._root = _Node()
+        self.error_response = error_response
+        self.routes = []
+
+    def add(self, method, path, handler):
+        node = self._root
+        for segment in _segments(path):
+            if segment.startswith("{") and segment.endswith("}"):
+                name = segment[1:-1]
+                if node.param_node is None:
+                    node.param_name = name
+                    node.param_node = _Node()
+                elif node.param_name != name:
+                    raise ValueError(
+                        f"Route {path} names parameter {{{name}}} where "
+                        f"{{{node.param_name}}} is already declared"
+                    )
+                node = node.param_node
+            else:
+                node = node.literals.setdefault(segment, _Node())
+        method = method.upper()
+        if method in node.handlers:
+            raise ValueError(f"Route {method} {path} is already declared")
+        node.handlers[method] = handler
+        self.routes.append((method, path))
+
+    def route(self, method, path):
+        def decorator(handler):
+            self.add(method, path, handler)
+            return handler
+
+        return decorator
+
+    def _find(self, node, segments, index, params):
+        if index == len(segments):
+            return node if node.handlers else None
+        segment = segments[index]
+        child = node.literals.get(segment)
+        if child is not None:
+            found = self._find(child, segments, index + 1, params)
+            if found is not None:
+                return found
+        if node.param_node is not None:
+            found = self._find(node.param_node, segments, index + 1, params)
+            if found is not None:
+                params[node.param_name] = segment
+                return found
+        return None
+
+    def match(self, method, path):
+        """
+        Returns (handler, path_params, allowed_methods). handler is None
+        when nothing matches; allowed_methods is empty for unknown paths
+        """
+        params = {}
+        node = self._find(self._root, _segments(path or ""), 0, params)
+        if node is None:
+            return None, params, ()
+        return node.handlers.get((method or "").upper()), params, node.handlers.keys()
+
+    def dispatch(self, target, event):
+        """
+        Calls the matching handler as handler(target, event, **path_params),
+        or handler(event, **path_params) when target is None
+        """
+        method, path = request_line(event)
+        handler, params, allowed = self.match(method, path)
+        if handler is None:
+            if allowed:
+                return self.error_response(
+                    RESPONSE_METHOD_NOT_ALLOWED_CODE,
+                    method,
+                    path,
+                    {"Allow": ", ".join(sorted(allowed))},
+                )
+            return self.error_response(RESPONSE_RESOURCE_NOT_FOUND_CODE, method, path)
+        if target is None:
+            return handler(event, **params)
+        return handler(target, event, **params)
@@ -0,0 +1,50 @@
+import json
+from decimal import Decimal
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj):
+    if isinstance(obj, Decimal):
+        if obj.is_finite() and obj == obj.to_integral_value():
+            return int(obj)
+        return float(obj)
+    if isinstance(obj, set):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+# built once per container so every call reuses the C encoder of the json
+# module instead of constructing a JSONEncoder per response
+_encoder = json.JSONEncoder(default=_default, separators=(",", ":"))
+
+
+def _dumps_json(obj) -> str:
+    return _encoder.encode(obj)
+
+
+def _dumps_orjson(obj) -> str:
+    try:
+        return orjson.dumps(obj, default=_default).decode()
+    except orjson.JSONEncodeError:
+        # orjson is limited to 64-bit integers; defer to the json module
+        return _dumps_json(obj)
+
+
+if orjson is not None:
+    BACKEND = "orjson"
+    _dumps = _dumps_orjson
+else:
+    BACKEND = "json"
+    _dumps = _dumps_json
+
+
+def dumps(obj) -> str:
+    """
+    Serializes DynamoDB-shaped data to a JSON string, writing integral
+    Decimals as ints and the rest as floats
+    """
+    return _dumps(obj)
@@ -0,0 +1,207 @@
+import base64
+import hashlib
+import hmac
+import json
+import threading
+import time
+import urllib.request
+
+from commons import RESPONSE_UNAUTHORIZED
+from commons.exception import ApplicationException
+from commons.log_helper import get_logger
+
+_LOG = get_logger(__name__)
+
+JWKS_TTL_SECONDS = 3600
+JWKS_MIN_REFRESH_SECONDS = 60
+JWKS_FETCH_TIMEOUT_SECONDS = 3
+
+# DER prefix of a SHA-256 DigestInfo, see RFC 8017 section 9.2
+_SHA256_DIGEST_INFO = bytes.fromhex("3031300d060960864801650304020105000420")
+
+
+def _b64url_decode(value):
+    if isinstance(value, str):
+        value = value.encode("ascii")
+    return base64.urlsafe_b64decode(value + b"=" * (-len(value) % 4))
+
+
+def _b64url_int(value):
+    return int.from_bytes(_b64url_decode(value), "big")
+
+
+def _unauthorized(message):
+    return ApplicationException(code=RESPONSE_UNAUTHORIZED, content=message)
+
+
+def verify_rs256(public_numbers, signing_input, signature):
+    """
+    RSASSA-PKCS1-v1_5 SHA-256 signature check (RFC 8017 section 8.2.2)
+    :param public_numbers: (modulus, public exponent) tuple
+    """
+    modulus, exponent = public_numbers
+    size = (modulus.bit_length() + 7) // 8
+    if len(signature) != size:
+        return False
+    value = int.from_bytes(signature, "big")
+    if value >= modulus:
+        return False
+    encoded = pow(value, exponent, modulus).to_bytes(size, "big")
+    digest_info = _SHA256_DIGEST_INFO + hashlib.sha256(signing_input).digest()
+    padding = size - len(digest_info) - 3
+    if padding < 8:
+        return False
+    expected = b"\x00\x01" + b"\xff" * padding + b"\x00" + digest_info
+    return hmac.compare_digest(encoded, expected)
+
+
+def fetch_jwks(url, timeout=JWKS_FETCH_TIMEOUT_SECONDS):
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+class JwksCache:
+    """
+    Parsed RSA keys of a JWKS document, kept for ttl seconds per container.
+    An unknown kid triggers one early refresh (key rotation), rate limited
+    by min_refresh so forged kids cannot make every request fetch
+    """
+
+    def __init__(
+        self,
+        url,
+        ttl=JWKS_TTL_SECONDS,
+        min_refresh=JWKS_MIN_REFRESH_SECONDS,
+        fetch=fetch_jwks,
+        clock=time.monotonic,
+    ):
+        self.url = url
+        self.ttl = ttl
+        self.min_refresh = min_refresh
+        self._fetch = fetch
+        self._clock = clock
+        self._keys = {}
+        self._fetched_at = None
+        self._lock = threading.Lock()
+        self.fetches = 0
+
+    def _refresh(self):
+        document = self._fetch(self.url)
+        keys = {}
+        for jwk in document.get("keys", []):
+            if jwk.get("kty") != "RSA" or jwk.get("use", "sig") != "sig":
+                continue
+            keys[jwk["kid"]] = (_b64url_int(jwk["n"]), _b64url_int(jwk["e"]))
+        self._keys = keys
+        self._fetched_at = self._clock()
+        self.fetches += 1
+
+    def prime(self):
+        """Fetches the keys unless a fresh copy is already held"""
+        with self._lock:
+            if self._fetched_at is None or self._clock() - self._fetched_at >= self.ttl:
+                self._refresh()
+
+    def get(self, kid):
+        with self._lock:
+            now = self._clock()
+            age = None if self._fetched_at is None else now - self._fetched_at
+            if age is None or age >= self.ttl:
+                self._refresh()
+            elif kid not in self._keys and age >= self.min_refresh:
+                _LOG.info("Unknown key id %s, refreshing JWKS", kid)
+                self._refresh()
+            return self._keys.get(kid)
+
+
+class TokenVerifier:
+    """
+    In-process verification of Cognito-issued RS256 JWTs: signature against
+    the cached user pool JWKS, expiry, issuer, audience and token_use
+    """
+
+    def __init__(
+        self,
+        issuer,
+        audience,
+        jwks=None,
+        token_use="id",
+        leeway=0,
+        clock=time.time,
+    ):
+        self.issuer = issuer
+        self.audience = audience
+        self.jwks = jwks or JwksCache(f"{issuer}/.well-known/jwks.json")
+        self.token_use = token_use
+        self.leeway = leeway
+        self._clock = clock
+
+    @classmethod
+    def for_user_pool(cls, region, user_pool_id, client_id, **kwargs):
+        issuer = f"https://cognito-idp.{region}.amazonaws.com/{user_pool_id}"
+        return cls(issuer=issuer, audience=client_id, **kwargs)
+
+    def verify(self, token) -> dict:
+        """
+        Returns the token claims or raises ApplicationException with 401
+        """
+        if not token:
+            raise _unauthorized("Missing token")
+        try:
+            encoded_header, encoded_claims, encoded_signature = token.split(".")
+            header = json.loads(_b64url_decode(encoded_header))
+            claims = json.loads(_b64url_decode(encoded_claims))
+            signature = _b64url_decode(encoded_signature)
+        except ValueError:
+            raise _unauthorized("Malformed token")
+        # valid JSON is not necessarily an object: "[]" or "1" would fail
+        # below with an AttributeError, i.e. a 500
+        if not isinstance(header, dict) or not isinstance(claims, dict):
+            raise _unauthorized("Malformed token")
+
+        if header.get("alg") != "RS256":
+            raise _unauthorized("Unsupported token algorithm")
+        public_numbers = self.jwks.get(header.get("kid"))
+        if public_numbers is None:
+            raise _unauthorized("Unknown signing key")
+        signing_input = f"{encoded_header}.{encoded_claims}".encode("ascii")
+        if not verify_rs256(public_numbers, signing_input, signature):
+            raise _unauthorized("Invalid token signature")
+
+        now = self._clock()
+        if not isinstance(claims.get("exp"), (int, float)):
+            raise _unauthorized("Token has no expiry")
+        if claims["exp"] + self.leeway <= now:
+            raise _unauthorized("Token expired")
+        if not isinstance(claims.get("nbf", 0), (int, float)):
+            raise _unauthorized("Malformed token")
+        if claims.get("nbf", 0) - self.leeway > now:
+            raise _unauthorized("Token not yet valid")
+        if claims.get("iss") != self.issuer:
+            raise _unauthorized("Invalid token issuer")
+        audience = claims.get("aud") if "aud" in claims else claims.get("client_id")
+        audiences = audience if isinstance(audience, list) else [audience]
+        if self.audience not in audiences:
+            raise _unauthorized("Invalid token audience")
+        if self.token_use and claims.get("token_use") != self.token_use:
+            raise _unauthorized("Invalid token use")
+        return claims
+
+    def authenticate(self, event) -> dict:
+        """
+        Verifies the bearer token of an API Gateway event and exposes the
+        claims where the Cognito authorizer puts them:
+        event["requestContext"]["authorizer"]["claims"]
+        """
+        headers = event.get("headers") or {}
+        authorization = next(
+            (value for name, value in headers.items() if name.lower() == "authorization"),
+            None,
+        )
+        token = authorization
+        if authorization and authorization[:7].lower() == "bearer ":
+            token = authorization[7:].strip()
+        claims = self.verify(token)
+        request_context = event.setdefault("requestContext", {})
+        request_context.setdefault("authorizer", {})["claims"] = claims
+        return claims
@@ -1,45 +1,339 @@
 from commons.log_helper import get_logger
 from commons.abstract_lambda import AbstractLambda
-import boto3
+from commons import ApplicationException, aws_clients, serializer
+from commons.http_response import CompressionMiddleware, ResponseBuilder
+from commons.idempotency import IdempotencyStore, body_fingerprint, header_key, idempotent
+from commons.models import Reservation, Table
+from commons.router import Router
+from commons.token_verifier import TokenVerifier
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import BotoCoreError, ClientError
+import base64
+import functools
 import json
+import operator
 import uuid
 import os
 import random
+import time
 from decimal import Decimal
 import datetime
 
 _LOG = get_logger("ApiHandler-handler")
 
+TABLES_NUMBER_INDEX = "number-index"
+RESERVATIONS_TABLE_DATE_INDEX = "tableNumber-date-index"
+TABLES_CATALOG_TTL_SECONDS = 60
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+MAX_PAGE_LIMIT = 1000
+BATCH_WRITE_SIZE = 25
+BATCH_GET_SIZE = 100
+BATCH_MAX_ATTEMPTS = 6
+BATCH_BACKOFF_BASE_SECONDS = 0.05
+BATCH_BACKOFF_CAP_SECONDS = 2
+# AWS errors that a retry of the same request can get past
+TRANSIENT_ERROR_CODES = frozenset(
+    (
+        "InternalServerError",
+        "ProvisionedThroughputExceededException",
+        "RequestLimitExceeded",
+        "ServiceUnavailable",
+        "ThrottlingException",
+        "TransactionConflictException",
+    )
+)
 
-class DecimalEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return float(obj)
-        return super().default(obj)
+ROUTER = Router()
+RESPONSES = ResponseBuilder()
+
+
+def minutes_since_midnight(value):
+    hours, minutes = (int(part) for part in value.split(":"))
+    if not (0 <= hours <= 24 and 0 <= minutes < 60) or hours * 60 + minutes > 24 * 60:
+        raise ValueError(f"Invalid time of day: {value}")
+    return hours * 60 + minutes
+
+
+def occupancy_slots(slot_start, slot_end):
+    """
+    Indexes of the SLOT_MINUTES slots covered by [slot_start, slot_end),
+    widened to whole slots
+    """
+    start = minutes_since_midnight(slot_start)
+    end = minutes_since_midnight(slot_end)
+    if start >= end:
+        raise ValueError("slotTimeStart must be before slotTimeEnd")
+    return set(range(start // SLOT_MINUTES, -(-end // SLOT_MINUTES)))
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _backoff_delay(attempt):
+    """Exponential backoff with full jitter"""
+    ceiling = min(BATCH_BACKOFF_CAP_SECONDS, BATCH_BACKOFF_BASE_SECONDS * 2**attempt)
+    return random.uniform(0, ceiling)
+
+
+class UnprocessedKeysError(Exception):
+    """BatchGetItem left keys unprocessed after BATCH_MAX_ATTEMPTS"""
+
+
+def protected(handler):
+    """
+    Verifies the caller's id token in-process before the handler runs when
+    local token verification is enabled (auth_mode=local)
+    """
+
+    @functools.wraps(handler)
+    def wrapper(self, event, **params):
+        if self.token_verifier is not None:
+            try:
+                self.token_verifier.authenticate(event)
+            except ApplicationException as e:
+                return self._json_response(e.code, {"message": e.content})
+        return handler(self, event, **params)
+
+    return wrapper
+
+
+class TablesCatalog:
+    """
+    Warm-container copy of the tables table as Table models, indexed by id
+    and by number.
+    The copy is trusted for `ttl` seconds; after that the shared version
+    marker is read and the table is only re-scanned if the marker changed
+    """
+
+    def __init__(
+        self,
+        load_items,
+        load_version,
+        ttl=TABLES_CATALOG_TTL_SECONDS,
+        clock=time.monotonic,
+    ):
+        self._load_items = load_items
+        self._load_version = load_version
+        self._clock = clock
+        self.ttl = ttl
+        self.version = None
+        self._by_id = None
+        self._by_number = {}
+        self._expires_at = 0
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+
+    def _ensure_fresh(self):
+        now = self._clock()
+        if self._by_id is not None:
+            if now < self._expires_at:
+                self.hits += 1
+                return
+            version = self._load_version()
+            if version == self.version:
+                self.revalidations += 1
+                self._expires_at = now + self.ttl
+                return
+        else:
+            version = self._load_version()
+        self.misses += 1
+        tables = sorted(self._load_items(), key=lambda table: table.id)
+        self._by_id = {table.id: table for table in tables}
+        self._by_number = {table.number: table for table in tables}
+        self.version = version
+        self._expires_at = now + self.ttl
+
+    def tables(self):
+        self._ensure_fresh()
+        return list(self._by_id.values())
+
+    def get(self, table_id):
+        self._ensure_fresh()
+        return self._by_id.get(table_id)
+
+    def has_number(self, table_number):
+        self._ensure_fresh()
+        return table_number in self._by_number
+
+    def invalidate(self):
+        self._by_id = None
+        self._by_number = {}
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "version": self.version,
+        }
 
 
 class ApiHandler(AbstractLambda):
+    # large responses (GET /reservations) are gzip/brotli encoded for
+    # clients that accept it when invoked through a Function URL or HTTP
+    # API; the REST API declares no binaryMediaTypes, so its responses stay
+    # plain JSON
+    middlewares = (CompressionMiddleware(RESPONSES),)
+
     def __init__(self):
-        self.cognito = boto3.client("cognito-idp")
-        self.dynamodb = boto3.resource("dynamodb")
         self.user_pool_id = os.getenv("cup_id")
         self.client_id = os.getenv("cup_client_id")
-        self.tables_table = self._get_table("tables", "test1")
-        self.reservations_table = self._get_table("reservations", "test2")
+        self.catalog_version_parameter = os.environ.get(
+            "tables_catalog_version", "tables-catalog-version"
+        )
+        self.token_verifier = None
+        if os.environ.get("auth_mode") == "local":
+            self.token_verifier = TokenVerifier.for_user_pool(
+                os.environ.get("AWS_REGION"), self.user_pool_id, self.client_id
+            )
+        self.tables_catalog = TablesCatalog(
+            load_items=self._scan_tables,
+            load_version=self._get_catalog_version,
+            ttl=int(os.environ.get("tables_catalog_ttl", TABLES_CATALOG_TTL_SECONDS)),
+        )
+
+    # clients are created on first use and shared through commons.aws_clients,
+    # so routes that never touch a service do not pay for its client
+    @functools.cached_property
+    def cognito(self):
+        return aws_clients.client("cognito-idp")
+
+    @functools.cached_property
+    def dynamodb(self):
+        return aws_clients.resource("dynamodb")
+
+    @functools.cached_property
+    def dynamodb_client(self):
+        # items are read and written in attribute-value format through the
+        # low-level client and marshalled by commons.models, skipping the
+        # resource layer's generic per-attribute type conversion. It must be
+        # a client of its own: the resource's meta.client has the resource's
+        # (de)serialization hooks registered on it, which would encode the
+        # attribute values a second time
+        return aws_clients.client("dynamodb")
+
+    @functools.cached_property
+    def ssm(self):
+        return aws_clients.client("ssm")
+
+    @functools.cached_property
+    def tables_table(self):
+        return self._get_table("tables", "test1")
+
+    @functools.cached_property
+    def reservations_table(self):
+        return self._get_table("reservations", "test2")
+
+    @functools.cached_property
+    def occupancy_table(self):
+        return self._get_table("occupancy", "test3")
+
+    @functools.cached_property
+    def idempotency_table(self):
+        return self._get_table("idempotency", "test4")
+
+    @functools.cached_property
+    def idempotency_store(self):
+        return IdempotencyStore(self.idempotency_table)
 
     def _get_table(self, env_var, default):
         return self.dynamodb.Table(os.environ.get(env_var, default))
 
+    def _scan_pages(self, table, limit=None, start_key=None):
+        """
+        Yields (items, last_evaluated_key) per scan page, in attribute-value
+        format. With a limit only one page is read, otherwise
+        LastEvaluatedKey is followed to the end
+        """
+        scan_kwargs = {"TableName": table.name}
+        if limit is not None:
+            scan_kwargs["Limit"] = limit
+        if start_key is not None:
+            scan_kwargs["ExclusiveStartKey"] = start_key
+        while True:
+            response = self.dynamodb_client.scan(**scan_kwargs)
+            yield response["Items"], response.get("LastEvaluatedKey")
+            if limit is not None or "LastEvaluatedKey" not in response:
+                return
+            scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    def _scan_tables(self):
+        for items, _ in self._scan_pages(self.tables_table):
+            yield from map(Table.from_item, items)
+
+    def _get_catalog_version(self):
+        try:
+            response = self.ssm.get_parameter(Name=self.catalog_version_parameter)
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ParameterNotFound":
+                return None
+            raise
+        return response["Parameter"]["Value"]
+
+    def _bump_catalog_version(self):
+        self.tables_catalog.invalidate()
+        try:
+            self.ssm.put_parameter(
+                Name=self.catalog_version_parameter,
+                Value=str(uuid.uuid4()),
+                Type="String",
+                Overwrite=True,
+            )
+        except ClientError as e:
+            _LOG.error("Failed to bump tables catalog version: %s", e)
+
     def _json_response(self, status_code, body):
-        return {
-            "statusCode": status_code,
-            "body": json.dumps(body, cls=DecimalEncoder),
-            "isBase64Encoded": False,
-        }
+        return RESPONSES.build(status_code, serializer.dumps(body))
+
+    def _json_stream_response(self, status_code, key, items, trailer=None):
+        """
+        Encodes items one by one into {key: [...], **trailer()} so only the
+        current page of items is held as Python objects. trailer is called
+        after the items are consumed
+        """
+        dumps = serializer.dumps
+        chunks = [f"{{{dumps(key)}:["]
+        separator = ""
+        for item in items:
+            chunks.append(separator)
+            chunks.append(dumps(item))
+            separator = ","
+        chunks.append("]")
+        for name, value in (trailer() if trailer else {}).items():
+            chunks.append(f",{dumps(name)}:{dumps(value)}")
+        chunks.append("}")
+        return RESPONSES.build(status_code, "".join(chunks))
+
+    @staticmethod
+    def _encode_cursor(last_evaluated_key):
+        raw = serializer.dumps(last_evaluated_key)
+        return base64.urlsafe_b64encode(raw.encode()).decode()
 
+    @staticmethod
+    def _decode_cursor(cursor):
+        raw = base64.urlsafe_b64decode(cursor.encode())
+        return json.loads(raw, parse_float=Decimal)
+
+    def _page_params(self, event):
+        params = event.get("queryStringParameters") or {}
+        limit = params.get("limit")
+        if limit is not None:
+            limit = int(limit)
+            if not 0 < limit <= MAX_PAGE_LIMIT:
+                raise ValueError(f"limit must be between 1 and {MAX_PAGE_LIMIT}")
+        cursor = params.get("cursor")
+        if cursor is not None:
+            cursor = self._decode_cursor(cursor)
+        return limit, cursor
+
+    @ROUTER.route("POST", "/signup")
     def signup(self, event):
-        body = json.loads(event["body"])
         try:
+            body = json.loads(event["body"])
             response = self.cognito.sign_up(
                 ClientId=self.client_id,
                 Username=body["email"],
@@ -50,13 +344,19 @@ class ApiHandler(AbstractLambda):
                     {"Name": "family_name", "Value": body["lastName"]},
                 ],
             )
-            _LOG.info(f"Sign-up response: {response}")
+            _LOG.info(
+                "Sign-up completed",
+                extra={"user_sub": response.get("UserSub"), "confirmed": response.get("UserConfirmed")},
+            )
 
             if not response.get("UserConfirmed"):
                 confirm_resp = self.cognito.admin_confirm_sign_up(
                     UserPoolId=self.user_pool_id, Username=body["email"]
                 )
-                _LOG.info(f"Confirm response: {confirm_resp}")
+                _LOG.info(
+                    "Sign-up confirmed",
+                    extra={"status": confirm_resp["ResponseMetadata"].get("HTTPStatusCode")},
+                )
                 response["UserConfirmed"] = True
 
             return self._json_response(
@@ -65,18 +365,21 @@ class ApiHandler(AbstractLambda):
         except Exception as e:
             return self._json_response(400, {"message": "Bad request", "error": str(e)})
 
+    @ROUTER.route("POST", "/signin")
     def signin(self, event):
-        body = json.loads(event["body"])
-        auth_params = {"USERNAME": body["email"], "PASSWORD": body["password"]}
-
         try:
+            body = json.loads(event["body"])
+            auth_params = {"USERNAME": body["email"], "PASSWORD": body["password"]}
             response = self.cognito.admin_initiate_auth(
                 UserPoolId=self.user_pool_id,
                 ClientId=self.client_id,
                 AuthFlow="ADMIN_NO_SRP_AUTH",
                 AuthParameters=auth_params,
             )
-            _LOG.info(f"Authentication response: {response}")
+            _LOG.info(
+                "Authentication completed",
+                extra={"authenticated": "AuthenticationResult" in (response or {})},
+            )
 
             if response:
                 return self._json_response(
@@ -85,110 +388,338 @@ class ApiHandler(AbstractLambda):
             else:
                 return self._json_response(200, {"idToken": None})
         except Exception as e:
-            _LOG.error(f"Error in signin: {e}")
+            _LOG.error("Error in signin: %s", e)
             return self._json_response(400, {"message": "Bad request", "error": str(e)})
 
+    def _batch_write(self, table, items):
+        """
+        Puts models in BatchWriteItem calls of BATCH_WRITE_SIZE, retrying
+        UnprocessedItems with jittered backoff. Returns the models that are
+        still unprocessed after BATCH_MAX_ATTEMPTS
+        """
+        unprocessed = []
+        for chunk in _chunks(items, BATCH_WRITE_SIZE):
+            requests = [{"PutRequest": {"Item": item.to_item()}} for item in chunk]
+            for attempt in range(BATCH_MAX_ATTEMPTS):
+                if attempt:
+                    time.sleep(_backoff_delay(attempt))
+                response = self.dynamodb_client.batch_write_item(
+                    RequestItems={table.name: requests}
+                )
+                requests = response.get("UnprocessedItems", {}).get(table.name, [])
+                if not requests:
+                    break
+            model = type(chunk[0])
+            unprocessed.extend(
+                model.from_item(request["PutRequest"]["Item"]) for request in requests
+            )
+        return unprocessed
+
+    def _batch_get(self, table, keys):
+        """
+        Reads keys in BatchGetItem calls of BATCH_GET_SIZE, retrying
+        UnprocessedKeys with jittered backoff. Keys and items are in
+        attribute-value format. Raises UnprocessedKeysError when keys are
+        still unprocessed after BATCH_MAX_ATTEMPTS
+        """
+        items = []
+        for chunk in _chunks(keys, BATCH_GET_SIZE):
+            request = {"Keys": chunk}
+            for attempt in range(BATCH_MAX_ATTEMPTS):
+                if attempt:
+                    time.sleep(_backoff_delay(attempt))
+                response = self.dynamodb_client.batch_get_item(
+                    RequestItems={table.name: request}
+                )
+                items.extend(response["Responses"].get(table.name, []))
+                request = response.get("UnprocessedKeys", {}).get(table.name)
+                if not request:
+                    break
+            else:
+                raise UnprocessedKeysError(f"{len(request['Keys'])} keys left unprocessed")
+        return items
+
+    def _get_tables_by_ids(self, ids):
+        found = {}
+        missing = []
+        for table_id in ids:
+            table = self.tables_catalog.get(table_id)
+            if table is not None:
+                found[table_id] = table
+            else:
+                missing.append({"id": {"N": str(table_id)}})
+        for item in self._batch_get(self.tables_table, missing):
+            table = Table.from_item(item)
+            found[table.id] = table
+        return [found[table_id].to_dict() for table_id in sorted(found)]
+
+    @ROUTER.route("GET", "/tables")
+    @protected
     def get_tables(self, event):
         try:
-            response = self.tables_table.scan()
-            items = response["Items"]
-            return self._json_response(
-                200, {"tables": sorted(items, key=lambda item: item["id"])}
-            )
+            ids = (event.get("queryStringParameters") or {}).get("ids")
+            if ids is not None:
+                ids = list(dict.fromkeys(int(table_id) for table_id in ids.split(",")))
+                if len(ids) > MAX_PAGE_LIMIT:
+                    raise ValueError(f"At most {MAX_PAGE_LIMIT} ids can be requested")
+                return self._json_response(200, {"tables": self._get_tables_by_ids(ids)})
+            limit, cursor = self._page_params(event)
+            tables = self.tables_catalog.tables()
+            _LOG.debug("Tables catalog", extra={"catalog": self.tables_catalog.stats()})
+            if cursor is not None:
+                tables = [table for table in tables if table.id > cursor["id"]]
+            body = {"tables": [table.to_dict() for table in tables]}
+            if limit is not None and len(tables) > limit:
+                body["tables"] = body["tables"][:limit]
+                body["nextCursor"] = self._encode_cursor({"id": tables[limit - 1].id})
+            return self._json_response(200, body)
+        except UnprocessedKeysError as e:
+            _LOG.error("Tables read failed: %s", e)
+            return self._json_response(503, {"message": "Service unavailable, try again"})
         except Exception as e:
             return self._json_response(400, {"message": "Bad request", "error": str(e)})
 
+    @ROUTER.route("POST", "/tables")
+    @protected
     def create_table(self, event):
         body = json.loads(event["body"])
         try:
-            item = {
-                "id": int(body["id"]),
-                "number": body["number"],
-                "places": body["places"],
-                "isVip": body["isVip"],
-                "minOrder": body["minOrder"],
-            }
-            item = json.loads(json.dumps(item))
-            self.tables_table.put_item(Item=item)
+            table = Table.from_request(body)
+            self.dynamodb_client.put_item(
+                TableName=self.tables_table.name, Item=table.to_item()
+            )
+            self._bump_catalog_version()
             return self._json_response(200, {"id": body["id"]})
         except Exception as e:
             return self._json_response(400, {"message": "Bad request", "error": str(e)})
 
-    def get_table_by_id(self, event):
+    @ROUTER.route("POST", "/tables/batch")
+    @protected
+    def create_tables_batch(self, event):
+        try:
+            body = json.loads(event["body"])
+            tables = {}
+            for table in map(Table.from_request, body["tables"]):
+                tables[table.id] = table
+            if not tables:
+                raise ValueError("No tables given")
+            unprocessed = self._batch_write(self.tables_table, list(tables.values()))
+            self._bump_catalog_version()
+            unprocessed_ids = [table.id for table in unprocessed]
+            skipped = set(unprocessed_ids)
+            written_ids = [table_id for table_id in tables if table_id not in skipped]
+            if unprocessed_ids:
+                return self._json_response(
+                    503, {"ids": written_ids, "unprocessedIds": unprocessed_ids}
+                )
+            return self._json_response(200, {"ids": written_ids})
+        except Exception as e:
+            return self._json_response(400, {"message": "Bad request", "error": str(e)})
+
+    @ROUTER.route("GET", "/tables/{tableId}")
+    @protected
+    def get_table_by_id(self, event, tableId):
         try:
-            table_id = int(event['path'].split('/')[-1])
-            response = self.tables_table.get_item(Key={"id": table_id})
+            table_id = int(tableId)
+            table = self.tables_catalog.get(table_id)
+            if table is not None:
+                return self._json_response(200, table.to_dict())
+            response = self.dynamodb_client.get_item(
+                TableName=self.tables_table.name, Key={"id": {"N": str(table_id)}}
+            )
             if "Item" in response:
-                return self._json_response(200, response["Item"])
+                return self._json_response(200, Table.from_item(response["Item"]).to_dict())
             return self._json_response(404, {"message": "Table not found"})
         except Exception as e:
             return self._json_response(400, {"message": "Bad request", "error": str(e)})
 
+    def _table_number_exists(self, table_number):
+        if self.tables_catalog.has_number(table_number):
+            return True
+        # the table may have been created by another container since the
+        # catalog was loaded, so a miss is confirmed against the index
+        response = self.tables_table.query(
+            IndexName=TABLES_NUMBER_INDEX,
+            KeyConditionExpression=Key("number").eq(table_number),
+            Select="COUNT",
+            Limit=1,
+        )
+        return response["Count"] > 0
+
+    def _reserve_slots(self, table_number, date, slots):
+        """
+        Marks the slots occupied on the table/date occupancy item in one
+        conditional UpdateItem. DynamoDB conditions have no bitwise
+        operators, so the bitmap is kept as a number set of occupied slot
+        indexes and each requested slot is checked with NOT contains().
+        The update also requires the item to exist: a date without one may
+        have reservations from before occupancy items, so it is seeded from
+        them first
+        """
+        if self._claim_slots(table_number, date, slots):
+            return True
+        if not self._seed_occupancy(table_number, date):
+            return False
+        return self._claim_slots(table_number, date, slots)
+
+    def _claim_slots(self, table_number, date, slots):
+        condition = functools.reduce(
+            operator.and_,
+            (~Attr("slots").contains(slot) for slot in sorted(slots)),
+            Attr("tableNumber").exists(),
+        )
+        try:
+            self.occupancy_table.update_item(
+                Key={"tableNumber": table_number, "date": date},
+                UpdateExpression="ADD slots :slots",
+                ConditionExpression=condition,
+                ExpressionAttributeValues={":slots": slots},
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                return False
+            raise
+        return True
+
+    def _seed_occupancy(self, table_number, date):
+        """
+        Creates the missing occupancy item of a table/date from the
+        reservations already booked for it, read through
+        RESERVATIONS_TABLE_DATE_INDEX. Returns False when the item exists,
+        i.e. the claim failed on a conflict. A conflict costs one extra
+        GetItem, the first booking of a table/date also a Query and a PutItem
+        """
+        key = {"tableNumber": table_number, "date": date}
+        response = self.occupancy_table.get_item(
+            Key=key, ConsistentRead=True, ProjectionExpression="tableNumber"
+        )
+        if "Item" in response:
+            return False
+        occupied = set()
+        query_kwargs = {
+            "IndexName": RESERVATIONS_TABLE_DATE_INDEX,
+            "KeyConditionExpression": Key("tableNumber").eq(table_number)
+            & Key("date").eq(date),
+            "ProjectionExpression": "slotTimeStart, slotTimeEnd",
+        }
+        while True:
+            response = self.reservations_table.query(**query_kwargs)
+            for reservation in response["Items"]:
+                try:
+                    occupied |= occupancy_slots(
+                        reservation["slotTimeStart"], reservation["slotTimeEnd"]
+                    )
+                except (KeyError, ValueError):
+                    _LOG.warning(
+                        "Reservation without valid slot times",
+                        extra={"tableNumber": table_number, "date": date},
+                    )
+            if "LastEvaluatedKey" not in response:
+                break
+            query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        # a number set cannot be empty
+        item = {**key, "slots": occupied} if occupied else key
+        try:
+            self.occupancy_table.put_item(
+                Item=item, ConditionExpression=Attr("tableNumber").not_exists()
+            )
+        except ClientError as e:
+            # another booking seeded it first
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+        return True
+
+    def _release_slots(self, table_number, date, slots):
+        self.occupancy_table.update_item(
+            Key={"tableNumber": table_number, "date": date},
+            UpdateExpression="DELETE slots :slots",
+            ExpressionAttributeValues={":slots": slots},
+        )
+
+    @ROUTER.route("POST", "/reservations")
+    @protected
+    @idempotent(
+        key=header_key("Idempotency-Key"),
+        store=lambda self: self.idempotency_store,
+        fingerprint=body_fingerprint,
+    )
     def create_reservation(self, event):
         try:
             body = json.loads(event['body'])
 
-            required_fields = ['tableNumber', 'date', 'slotTimeStart', 'slotTimeEnd']
+            required_fields = [field for field in Reservation.FIELDS if field != "id"]
             if not all(field in body for field in required_fields):
                 return self._json_response(400, {'message': 'Missing required fields'})
 
-            table_number = body['tableNumber']
-            date = body['date']
-            slot_start = body["slotTimeStart"]
-            slot_end = body["slotTimeEnd"]
+            reservation = Reservation.from_request({**body, "id": str(uuid.uuid4())})
+            table_number = reservation.tableNumber
+            date = reservation.date
+            slots = occupancy_slots(reservation.slotTimeStart, reservation.slotTimeEnd)
 
-            tables = self.tables_table.scan()['Items']
-            if table_number not in [table["number"] for table in tables]:
+            if not self._table_number_exists(table_number):
                 return self._json_response(400, {'message': 'Table does not exist'})
 
-            reservations = self.reservations_table.scan(
-                FilterExpression="#tn = :table_number AND #d = :date",
-                ExpressionAttributeNames={"#tn": "tableNumber", "#d": "date"},
-                ExpressionAttributeValues={":table_number": table_number, ":date": date}
-            )['Items']
-
-            for res in reservations:
-                if slot_start < res["slotTimeEnd"] and slot_end > res["slotTimeStart"]:
-                    return self._json_response(400, {'message': 'Time conflict: Table is already reserved.'})
+            if not self._reserve_slots(table_number, date, slots):
+                return self._json_response(400, {'message': 'Time conflict: Table is already reserved.'})
 
-            reservation_id = str(uuid.uuid4())
-            self.reservations_table.put_item(Item={"id": reservation_id, **body})
+            try:
+                self.dynamodb_client.put_item(
+                    TableName=self.reservations_table.name, Item=reservation.to_item()
+                )
+            except Exception:
+                self._release_slots(table_number, date, slots)
+                raise
 
-            return self._json_response(200, {'reservationId': reservation_id})
+            return self._json_response(200, {'reservationId': reservation.id})
 
+        except (BotoCoreError, ClientError) as e:
+            # not the request's fault: a 5xx, so @idempotent releases the
+            # key and the client's retry runs again instead of replaying it
+            _LOG.error("Reservation failed: %s", e)
+            if isinstance(e, BotoCoreError) or e.response["Error"]["Code"] in TRANSIENT_ERROR_CODES:
+                return self._json_response(503, {'message': 'Service unavailable, try again'})
+            return self._json_response(500, {'message': 'Internal server error'})
         except Exception as e:
             return self._json_response(400, {'message': 'Bad request', 'error': str(e)})
 
+    @ROUTER.route("GET", "/reservations")
+    @protected
     def get_reservations(self, event):
         try:
-            response = self.reservations_table.scan()
-            items = response["Items"]
-            for i in items:
-                del i["id"]
-            items = sorted(items, key=lambda item: item["tableNumber"])
-            return self._json_response(200, {"reservations": response["Items"]})
+            limit, cursor = self._page_params(event)
+            pages = self._scan_pages(self.reservations_table, limit, cursor)
+            page_state = {"last_key": None}
+
+            def items():
+                for page, last_key in pages:
+                    page_state["last_key"] = last_key
+                    for item in page:
+                        reservation = Reservation.from_item(item).to_dict()
+                        del reservation["id"]
+                        yield reservation
+
+            def trailer():
+                if page_state["last_key"] is None:
+                    return {}
+                return {"nextCursor": self._encode_cursor(page_state["last_key"])}
+
+            return self._json_stream_response(200, "reservations", items(), trailer)
         except Exception as e:
             return self._json_response(400, {"message": "Bad request", "error": str(e)})
 
+    def prime(self):
+        for client in (self.dynamodb_client, self.dynamodb, self.ssm, self.cognito):
+            aws_clients.prime(client)
+        self.tables_catalog.tables()
+        if self.token_verifier is not None:
+            self.token_verifier.jwks.prime()
+
     def handle_request(self, event, context):
-        routes = {
-            ("POST", "/signup"): self.signup,
-            ("POST", "/signin"): self.signin,
-            ("GET", "/tables"): self.get_tables,
-            ("GET", "/tables/{tableId}"): self.get_table_by_id,
-            ("POST", "/tables"): self.create_table,
-            ("POST", "/reservations"): self.create_reservation,
-            ("GET", "/reservations"): self.get_reservations,
-        }
-        route_key = (event["httpMethod"], event.get("resource"))
-        handler = routes.get(
-            route_key, lambda _: self._json_response(400, {"message": "Invalid route"})
-        )
-        return handler(event)
+        return ROUTER.dispatch(self, event)
 
 
 HANDLER = ApiHandler()
 
 
 def lambda_handler(event, context):
-    return HANDLER.handle_request(event, context)
+    return HANDLER.lambda_handler(event=event, context=context)
@@ -0,0 +1,502 @@
+import itertools
+import math
+import re
+import threading
+from decimal import Decimal
+from types import SimpleNamespace
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from botocore.exceptions import ClientError
+
+PAGE_SIZE_LIMIT = 1024 * 1024
+READ_UNIT_SIZE = 4 * 1024
+
+
+def conditional_check_failed(operation):
+    return ClientError(
+        {
+            "Error": {
+                "Code": "ConditionalCheckFailedException",
+                "Message": "The conditional request failed",
+            }
+        },
+        operation,
+    )
+
+
+def _item_size(value):
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, bool) or value is None:
+        return 1
+    if isinstance(value, (int, float, Decimal)):
+        return len(str(value).lstrip("-").replace(".", "")) // 2 + 2
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, dict):
+        return 3 + sum(len(k.encode("utf-8")) + _item_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return 3 + sum(_item_size(v) + 1 for v in value)
+    raise TypeError(f"Unsupported attribute value: {value!r}")
+
+
+def item_size(item):
+    return sum(len(k.encode("utf-8")) + _item_size(v) for k, v in item.items())
+
+
+def _read_units(size, consistent=False):
+    units = max(1, math.ceil(size / READ_UNIT_SIZE))
+    return float(units) if consistent else units / 2
+
+
+def _operand(item, operand):
+    name = getattr(operand, "name", None)
+    if name is not None and type(operand).__name__ in ("Attr", "Key"):
+        return item.get(name)
+    if type(operand).__name__ == "Size":
+        value = item.get(operand.name)
+        return None if value is None else len(value)
+    return operand
+
+
+def evaluate(condition, item):
+    """Evaluates a boto3 ``conditions`` object against a plain item dict"""
+    expression = condition.get_expression()
+    operator = expression["operator"]
+    values = expression["values"]
+    if operator == "AND":
+        return evaluate(values[0], item) and evaluate(values[1], item)
+    if operator == "OR":
+        return evaluate(values[0], item) or evaluate(values[1], item)
+    if operator == "NOT":
+        return not evaluate(values[0], item)
+    if operator == "attribute_exists":
+        return values[0].name in item
+    if operator == "attribute_not_exists":
+        return values[0].name not in item
+    left = _operand(item, values[0])
+    args = [_operand(item, value) for value in values[1:]]
+    if left is None:
+        return operator == "<>"
+    try:
+        if operator == "=":
+            return left == args[0]
+        if operator == "<>":
+            return left != args[0]
+        if operator == "<":
+            return left < args[0]
+        if operator == "<=":
+            return left <= args[0]
+        if operator == ">":
+            return left > args[0]
+        if operator == ">=":
+            return left >= args[0]
+        if operator == "BETWEEN":
+            return args[0] <= left <= args[1]
+        if operator == "IN":
+            return left in args[0]
+        if operator == "begins_with":
+            return left.startswith(args[0])
+        if operator == "contains":
+            return args[0] in left
+    except TypeError:
+        return False
+    raise NotImplementedError(f"Operator {operator} is not supported")
+
+
+def _normalise(value):
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return Decimal(str(value))
+    if isinstance(value, dict):
+        return {k: _normalise(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalise(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return {_normalise(v) for v in value}
+    return value
+
+
+_UPDATE_CLAUSE = re.compile(r"\b(SET|ADD|DELETE|REMOVE)\b")
+
+
+def apply_update(item, expression, values, names=None):
+    """Applies SET/ADD/DELETE/REMOVE clauses of an UpdateExpression"""
+    names = names or {}
+    parts = _UPDATE_CLAUSE.split(expression)
+    for action, body in zip(parts[1::2], parts[2::2]):
+        for assignment in filter(None, (a.strip() for a in body.split(","))):
+            if action == "SET":
+                path, value = (t.strip() for t in assignment.split("=", 1))
+                path = names.get(path, path)
+                if "+" in value:
+                    left, right = (t.strip() for t in value.split("+", 1))
+                    item[path] = _update_operand(item, left, values, names) + values[right]
+                else:
+                    item[path] = _update_operand(item, value, values, names)
+            elif action == "REMOVE":
+                item.pop(names.get(assignment, assignment), None)
+            else:
+                path, value = assignment.split()
+                path = names.get(path, path)
+                value = _normalise(values[value])
+                if action == "ADD":
+                    if isinstance(value, set):
+                        item[path] = item.get(path, set()) | value
+                    else:
+                        item[path] = item.get(path, Decimal(0)) + value
+                else:
+                    remaining = item.get(path, set()) - value
+                    if remaining:
+                        item[path] = remaining
+                    else:
+                        item.pop(path, None)
+
+
+def _update_operand(item, token, values, names):
+    if token.startswith(":"):
+        return _normalise(values[token])
+    match = re.fullmatch(r"if_not_exists\((\S+),\s*(:\w+)\)", token)
+    if match:
+        path = names.get(match.group(1), match.group(1))
+        return item.get(path, _normalise(values[match.group(2)]))
+    return item.get(names.get(token, token))
+
+
+class LocalTable:
+    """In-memory stand-in for a boto3 ``dynamodb.Table`` resource.
+
+    Implements the subset of the resource API used by the lambdas, with
+    DynamoDB-like paging (1 MB pages, ``Limit``, ``LastEvaluatedKey``) and
+    read/write capacity accounting, so handlers can be tested and
+    benchmarked without a real table."""
+
+    def __init__(self, name, hash_key, range_key=None, indexes=None):
+        self.name = name
+        self.table_name = name
+        self.hash_key = hash_key
+        self.range_key = range_key
+        self.indexes = indexes or {}
+        self._items = {}
+        self._positions = None
+        self._partitions = None
+        self._lock = threading.Lock()
+        self.consumed_read_units = 0.0
+        self.consumed_write_units = 0.0
+        self.calls = []
+
+    @property
+    def key_names(self):
+        return [k for k in (self.hash_key, self.range_key) if k]
+
+    def _key(self, item):
+        return tuple(item[k] for k in self.key_names)
+
+    def _record(self, operation, read_units=0.0, write_units=0.0):
+        self.consumed_read_units += read_units
+        self.consumed_write_units += write_units
+        self.calls.append(operation)
+        return {"TableName": self.name, "CapacityUnits": read_units + write_units}
+
+    def reset_metrics(self):
+        self.consumed_read_units = 0.0
+        self.consumed_write_units = 0.0
+        self.calls = []
+
+    def load(self, items):
+        """Bulk-loads items without capacity accounting"""
+        for item in items:
+            item = _normalise(item)
+            self._items[self._key(item)] = item
+        self._positions = {k: i for i, k in enumerate(self._items)}
+        self._partitions = None
+
+    def _write(self, operation, key, item, condition, kwargs):
+        existing = self._items.get(key, {})
+        if condition is not None and not evaluate(condition, existing):
+            self._record(operation, write_units=1.0)
+            raise conditional_check_failed(operation)
+        if key not in self._items:
+            self._positions = None
+        self._partitions = None
+        self._items[key] = item
+        units = float(max(1, math.ceil(item_size(item) / 1024)))
+        return self._record(operation, write_units=units)
+
+    def put_item(self, Item, ConditionExpression=None, **kwargs):
+        item = _normalise(Item)
+        with self._lock:
+            capacity = self._write("PutItem", self._key(item), item, ConditionExpression, kwargs)
+        return self._with_capacity({}, capacity, kwargs)
+
+    def update_item(
+        self,
+        Key,
+        UpdateExpression,
+        ConditionExpression=None,
+        ExpressionAttributeValues=None,
+        ExpressionAttributeNames=None,
+        ReturnValues="NONE",
+        **kwargs,
+    ):
+        key_item = _normalise(Key)
+        key = self._key(key_item)
+        with self._lock:
+            item = {**self._items.get(key, key_item)}
+            item = {k: (set(v) if isinstance(v, set) else v) for k, v in item.items()}
+            apply_update(
+                item, UpdateExpression, ExpressionAttributeValues or {}, ExpressionAttributeNames
+            )
+            capacity = self._write("UpdateItem", key, item, ConditionExpression, kwargs)
+        response = {}
+        if ReturnValues == "ALL_NEW":
+            response["Attributes"] = dict(item)
+        return self._with_capacity(response, capacity, kwargs)
+
+    def delete_item(self, Key, ConditionExpression=None, **kwargs):
+        key = self._key(_normalise(Key))
+        with self._lock:
+            existing = self._items.get(key, {})
+            if ConditionExpression is not None and not evaluate(ConditionExpression, existing):
+                self._record("DeleteItem", write_units=1.0)
+                raise conditional_check_failed("DeleteItem")
+            if self._items.pop(key, None) is not None:
+                self._positions = None
+                self._partitions = None
+            capacity = self._record("DeleteItem", write_units=1.0)
+        return self._with_capacity({}, capacity, kwargs)
+
+    def get_item(
+        self,
+        Key,
+        ConsistentRead=False,
+        ProjectionExpression=None,
+        ExpressionAttributeNames=None,
+        **kwargs,
+    ):
+        item = self._items.get(self._key(_normalise(Key)))
+        size = item_size(item) if item else 0
+        capacity = self._record("GetItem", _read_units(size, ConsistentRead))
+        response = {}
+        if item is not None:
+            response["Item"] = self._project(item, ProjectionExpression, ExpressionAttributeNames)
+        return self._with_capacity(response, capacity, kwargs)
+
+    def scan(self, **kwargs):
+        items = iter(self._items.values())
+        start = kwargs.get("ExclusiveStartKey")
+        if start is not None:
+            position = self._position(self._key(_normalise(start)))
+            items = itertools.islice(items, position + 1, None)
+        return self._page("Scan", items, self.key_names, kwargs)
+
+    def query(self, KeyConditionExpression, IndexName=None, ScanIndexForward=True, **kwargs):
+        hash_key, range_key = self.indexes[IndexName] if IndexName else (self.hash_key, self.range_key)
+        items = [
+            item
+            for item in self._partition(hash_key, KeyConditionExpression)
+            if evaluate(KeyConditionExpression, item)
+        ]
+        if range_key:
+            items.sort(key=lambda item: item.get(range_key), reverse=not ScanIndexForward)
+        key_names = list(dict.fromkeys(self.key_names + [k for k in (hash_key, range_key) if k]))
+        start = kwargs.get("ExclusiveStartKey")
+        if start is not None:
+            start = self._key(_normalise(start))
+            positions = [self._key(item) for item in items]
+            items = items[positions.index(start) + 1:]
+        return self._page("Query", items, key_names, kwargs)
+
+    def _partition(self, hash_key, key_condition):
+        expression = key_condition.get_expression()
+        if expression["operator"] == "AND":
+            expression = expression["values"][0].get_expression()
+        value = _normalise(expression["values"][1])
+        if self._partitions is None:
+            self._partitions = {}
+        if hash_key not in self._partitions:
+            partitions = {}
+            for item in self._items.values():
+                if hash_key in item:
+                    partitions.setdefault(item[hash_key], []).append(item)
+            self._partitions[hash_key] = partitions
+        return self._partitions[hash_key].get(value, [])
+
+    def _position(self, key):
+        if self._positions is None:
+            self._positions = {k: i for i, k in enumerate(self._items)}
+        return self._positions[key]
+
+    def _page(self, operation, candidates, key_names, kwargs):
+        limit = kwargs.get("Limit")
+        condition = kwargs.get("FilterExpression")
+        read_size = 0
+        evaluated = 0
+        matched = []
+        last = None
+        truncated = False
+        for item in candidates:
+            if (limit is not None and evaluated >= limit) or read_size >= PAGE_SIZE_LIMIT:
+                truncated = True
+                break
+            read_size += item_size(item)
+            evaluated += 1
+            last = item
+            if condition is None or evaluate(condition, item):
+                matched.append(item)
+        capacity = self._record(operation, _read_units(read_size, kwargs.get("ConsistentRead", False)))
+        response = {"Count": len(matched), "ScannedCount": evaluated}
+        if kwargs.get("Select") != "COUNT":
+            projection = kwargs.get("ProjectionExpression")
+            names = kwargs.get("ExpressionAttributeNames")
+            response["Items"] = [self._project(item, projection, names) for item in matched]
+        if truncated:
+            response["LastEvaluatedKey"] = {k: last[k] for k in key_names}
+        return self._with_capacity(response, capacity, kwargs)
+
+    @staticmethod
+    def _project(item, projection, names=None):
+        if not projection:
+            return dict(item)
+        names = names or {}
+        paths = [names.get(name.strip(), name.strip()) for name in projection.split(",")]
+        return {path: item[path] for path in paths if path in item}
+
+    @staticmethod
+    def _with_capacity(response, capacity, kwargs):
+        if kwargs.get("ReturnConsumedCapacity", "NONE") != "NONE":
+            response["ConsumedCapacity"] = capacity
+        return response
+
+
+class LocalDynamoDB:
+    """In-memory stand-in for the boto3 ``dynamodb`` service resource.
+
+    ``throttled_calls`` makes the next N batch calls process only the first
+    half of their requests, returning the rest as unprocessed."""
+
+    def __init__(self, *tables):
+        self.tables = {table.name: table for table in tables}
+        self.throttled_calls = 0
+        self.calls = []
+        self.meta = SimpleNamespace(client=LocalDynamoDBClient(self))
+
+    def Table(self, name):
+        return self.tables[name]
+
+    def _split(self, requests):
+        if self.throttled_calls > 0:
+            self.throttled_calls -= 1
+            half = len(requests) // 2
+            return requests[:half], requests[half:]
+        return requests, []
+
+    def batch_write_item(self, RequestItems, **kwargs):
+        self.calls.append("BatchWriteItem")
+        if sum(len(requests) for requests in RequestItems.values()) > 25:
+            raise ValueError("Too many items requested for the BatchWriteItem call")
+        unprocessed = {}
+        for name, requests in RequestItems.items():
+            processed, rest = self._split(requests)
+            for request in processed:
+                if "PutRequest" in request:
+                    self.tables[name].put_item(Item=request["PutRequest"]["Item"])
+                else:
+                    key = self.tables[name]._key(_normalise(request["DeleteRequest"]["Key"]))
+                    self.tables[name]._items.pop(key, None)
+            if rest:
+                unprocessed[name] = rest
+        return {"UnprocessedItems": unprocessed}
+
+    def batch_get_item(self, RequestItems, **kwargs):
+        self.calls.append("BatchGetItem")
+        if sum(len(request["Keys"]) for request in RequestItems.values()) > 100:
+            raise ValueError("Too many items requested for the BatchGetItem call")
+        responses = {}
+        unprocessed = {}
+        for name, request in RequestItems.items():
+            processed, rest = self._split(request["Keys"])
+            items = [self.tables[name].get_item(Key=key).get("Item") for key in processed]
+            responses[name] = [item for item in items if item is not None]
+            if rest:
+                unprocessed[name] = {**request, "Keys": rest}
+        return {"Responses": responses, "UnprocessedKeys": unprocessed}
+
+
+_SERIALIZER = TypeSerializer()
+_DESERIALIZER = TypeDeserializer()
+
+
+def to_attribute_values(item):
+    return {k: _SERIALIZER.serialize(v) for k, v in item.items()}
+
+
+def from_attribute_values(item):
+    return {k: _DESERIALIZER.deserialize(v) for k, v in item.items()}
+
+
+class LocalDynamoDBClient:
+    """In-memory stand-in for the low-level boto3 ``dynamodb`` client
+    (``resource.meta.client``). Requests and responses are in attribute-value
+    format; the work is delegated to the tables of the LocalDynamoDB."""
+
+    def __init__(self, resource):
+        self._resource = resource
+
+    def put_item(self, TableName, Item, **kwargs):
+        table = self._resource.Table(TableName)
+        return table.put_item(Item=from_attribute_values(Item), **kwargs)
+
+    def get_item(self, TableName, Key, **kwargs):
+        table = self._resource.Table(TableName)
+        response = table.get_item(Key=from_attribute_values(Key), **kwargs)
+        if "Item" in response:
+            response["Item"] = to_attribute_values(response["Item"])
+        return response
+
+    def scan(self, TableName, **kwargs):
+        if "ExclusiveStartKey" in kwargs:
+            kwargs["ExclusiveStartKey"] = from_attribute_values(kwargs["ExclusiveStartKey"])
+        response = self._resource.Table(TableName).scan(**kwargs)
+        if "Items" in response:
+            response["Items"] = [to_attribute_values(item) for item in response["Items"]]
+        if "LastEvaluatedKey" in response:
+            response["LastEvaluatedKey"] = to_attribute_values(response["LastEvaluatedKey"])
+        return response
+
+    def batch_write_item(self, RequestItems, **kwargs):
+        def convert(requests, items):
+            return {
+                name: [
+                    {
+                        kind: {part: items(value) for part, value in body.items()}
+                        for kind, body in request.items()
+                    }
+                    for request in requests
+                ]
+                for name, requests in requests.items()
+            }
+
+        response = self._resource.batch_write_item(
+            RequestItems=convert(RequestItems, from_attribute_values), **kwargs
+        )
+        return {"UnprocessedItems": convert(response["UnprocessedItems"], to_attribute_values)}
+
+    def batch_get_item(self, RequestItems, **kwargs):
+        def convert(requests, keys):
+            return {
+                name: {**request, "Keys": [keys(key) for key in request["Keys"]]}
+                for name, request in requests.items()
+            }
+
+        response = self._resource.batch_get_item(
+            RequestItems=convert(RequestItems, from_attribute_values), **kwargs
+        )
+        return {
+            "Responses": {
+                name: [to_attribute_values(item) for item in items]
+                for name, items in response["Responses"].items()
+            },
+            "UnprocessedKeys": convert(response["UnprocessedKeys"], to_attribute_values),
+        }
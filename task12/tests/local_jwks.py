@@ -0,0 +1,82 @@
+import base64
+import hashlib
+import json
+import random
+
+_SHA256_DIGEST_INFO = bytes.fromhex("3031300d060960864801650304020105000420")
+_SMALL_PRIMES = [p for p in range(3, 1000, 2) if all(p % d for d in range(3, int(p**0.5) + 1, 2))]
+
+
+def _is_probable_prime(n, rnd, rounds=20):
+    if any(n % p == 0 for p in _SMALL_PRIMES):
+        return n in _SMALL_PRIMES
+    d, r = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        r += 1
+    for _ in range(rounds):
+        x = pow(rnd.randrange(2, n - 2), d, n)
+        if x in (1, n - 1):
+            continue
+        for _ in range(r - 1):
+            x = pow(x, 2, n)
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def _prime(bits, rnd):
+    while True:
+        candidate = rnd.getrandbits(bits) | (1 << (bits - 1)) | 1
+        if _is_probable_prime(candidate, rnd):
+            return candidate
+
+
+class LocalRsaKey:
+    """Locally generated RSA key pair that signs RS256 tokens for tests"""
+
+    def __init__(self, kid, bits=1024, seed=None):
+        rnd = random.Random(seed)
+        self.kid = kid
+        self.e = 65537
+        while True:
+            p, q = _prime(bits // 2, rnd), _prime(bits // 2, rnd)
+            phi = (p - 1) * (q - 1)
+            if p != q and phi % self.e:
+                break
+        self.n = p * q
+        self.d = pow(self.e, -1, phi)
+
+    def jwk(self):
+        return {
+            "kty": "RSA",
+            "alg": "RS256",
+            "use": "sig",
+            "kid": self.kid,
+            "n": _b64url(self.n.to_bytes((self.n.bit_length() + 7) // 8, "big")),
+            "e": _b64url(self.e.to_bytes(3, "big")),
+        }
+
+    def sign(self, claims, header=None):
+        header = {"alg": "RS256", "kid": self.kid, **(header or {})}
+        signing_input = (
+            f"{_b64url(json.dumps(header).encode())}."
+            f"{_b64url(json.dumps(claims).encode())}"
+        )
+        size = (self.n.bit_length() + 7) // 8
+        digest_info = _SHA256_DIGEST_INFO + hashlib.sha256(signing_input.encode()).digest()
+        encoded = b"\x00\x01" + b"\xff" * (size - len(digest_info) - 3) + b"\x00" + digest_info
+        signature = pow(int.from_bytes(encoded, "big"), self.d, self.n).to_bytes(size, "big")
+        return f"{signing_input}.{_b64url(signature)}"
+
+
+def _b64url(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def write_jwks(path, *keys):
+    """Writes a stand-in JWKS document and returns its file:// url"""
+    path.write_text(json.dumps({"keys": [key.jwk() for key in keys]}))
+    return path.resolve().as_uri()
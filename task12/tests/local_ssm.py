@@ -0,0 +1,28 @@
+from botocore.exceptions import ClientError
+
+
+class LocalParameterStore:
+    """In-memory stand-in for the boto3 ``ssm`` client parameter calls"""
+
+    def __init__(self):
+        self.parameters = {}
+        self.calls = []
+
+    def get_parameter(self, Name, **kwargs):
+        self.calls.append("GetParameter")
+        if Name not in self.parameters:
+            raise ClientError(
+                {"Error": {"Code": "ParameterNotFound", "Message": Name}},
+                "GetParameter",
+            )
+        return {"Parameter": {"Name": Name, "Value": self.parameters[Name]}}
+
+    def put_parameter(self, Name, Value, Overwrite=False, **kwargs):
+        self.calls.append("PutParameter")
+        if Name in self.parameters and not Overwrite:
+            raise ClientError(
+                {"Error": {"Code": "ParameterAlreadyExists", "Message": Name}},
+                "PutParameter",
+            )
+        self.parameters[Name] = Value
+        return {"Version": 1}
@@ -0,0 +1,62 @@
+import os
+import unittest
+import importlib
+from tests import ImportFromSourceContext
+from tests.local_dynamodb import LocalDynamoDB, LocalTable
+from tests.local_ssm import LocalParameterStore
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "eu-west-1")
+
+with ImportFromSourceContext():
+    LAMBDA_HANDLER = importlib.import_module("lambdas.api_handler.handler")
+
+
+def local_tables_table():
+    return LocalTable(
+        "tables",
+        hash_key="id",
+        indexes={LAMBDA_HANDLER.TABLES_NUMBER_INDEX: ("number", None)},
+    )
+
+
+def local_reservations_table():
+    return LocalTable(
+        "reservations",
+        hash_key="id",
+        indexes={
+            LAMBDA_HANDLER.RESERVATIONS_TABLE_DATE_INDEX: ("tableNumber", "date")
+        },
+    )
+
+
+def local_occupancy_table():
+    return LocalTable("occupancy", hash_key="tableNumber", range_key="date")
+
+
+def local_idempotency_table():
+    return LocalTable("idempotency", hash_key="id")
+
+
+def local_handler():
+    """ApiHandler with every AWS dependency replaced by a local stand-in"""
+    handler = LAMBDA_HANDLER.ApiHandler()
+    handler.tables_table = local_tables_table()
+    handler.reservations_table = local_reservations_table()
+    handler.occupancy_table = local_occupancy_table()
+    handler.idempotency_table = local_idempotency_table()
+    handler.dynamodb = LocalDynamoDB(
+        handler.tables_table,
+        handler.reservations_table,
+        handler.occupancy_table,
+        handler.idempotency_table,
+    )
+    handler.dynamodb_client = handler.dynamodb.meta.client
+    handler.ssm = LocalParameterStore()
+    return handler
+
+
+class ApiHandlerLambdaTestCase(unittest.TestCase):
+    """Common setups for this lambda"""
+
+    def setUp(self) -> None:
+        self.HANDLER = local_handler()
@@ -0,0 +1,60 @@
+import json
+import tempfile
+from pathlib import Path
+
+from tests.local_jwks import LocalRsaKey, write_jwks
+from tests.test_api_handler import ApiHandlerLambdaTestCase
+from tests.test_commons import TOKEN_VERIFIER
+
+SIGNING_KEY = LocalRsaKey("key-1", seed=3)
+
+
+class TestAuthentication(ApiHandlerLambdaTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        url = write_jwks(Path(self.directory.name, "jwks.json"), SIGNING_KEY)
+        self.HANDLER.token_verifier = TOKEN_VERIFIER.TokenVerifier.for_user_pool(
+            "eu-west-1",
+            "eu-west-1_test",
+            "client-app",
+            jwks=TOKEN_VERIFIER.JwksCache(url),
+        )
+        self.issuer = self.HANDLER.token_verifier.issuer
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def get_tables(self, headers=None):
+        return self.HANDLER.handle_request(
+            {"httpMethod": "GET", "path": "/tables", "headers": headers}, {}
+        )
+
+    def test_missing_token(self):
+        response = self.get_tables()
+        self.assertEqual(response["statusCode"], 401)
+        self.assertNotIn("Scan", self.HANDLER.tables_table.calls)
+
+    def test_valid_token(self):
+        token = SIGNING_KEY.sign(
+            {
+                "sub": "user-1",
+                "iss": self.issuer,
+                "aud": "client-app",
+                "token_use": "id",
+                "exp": 2**31,
+            }
+        )
+        response = self.get_tables({"Authorization": token})
+        self.assertEqual(response["statusCode"], 200)
+        self.assertEqual(json.loads(response["body"]), {"tables": []})
+
+    def test_malformed_sign_in_and_sign_up_bodies(self):
+        self.HANDLER.cognito = None
+        for path in ("/signin", "/signup"):
+            for body in (None, "not json", json.dumps({"password": "hunter2"})):
+                response = self.HANDLER.handle_request(
+                    {"httpMethod": "POST", "path": path, "body": body}, {}
+                )
+                self.assertEqual(response["statusCode"], 400, (path, body))
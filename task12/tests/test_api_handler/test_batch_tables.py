@@ -0,0 +1,90 @@
+import json
+from unittest import mock
+
+from tests.test_api_handler import ApiHandlerLambdaTestCase, LAMBDA_HANDLER
+
+
+def table_body(table_id):
+    return {"id": table_id, "number": table_id, "places": 4, "isVip": False, "minOrder": 0}
+
+
+class TestBatchTables(ApiHandlerLambdaTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        patcher = mock.patch.object(LAMBDA_HANDLER.time, "sleep")
+        self.sleep = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_batch(self, tables):
+        response = self.HANDLER.handle_request(
+            {
+                "httpMethod": "POST",
+                "path": "/tables/batch",
+                "body": json.dumps({"tables": tables}),
+            },
+            {},
+        )
+        return response["statusCode"], json.loads(response["body"])
+
+    def get_by_ids(self, ids):
+        response = self.HANDLER.handle_request(
+            {
+                "httpMethod": "GET",
+                "path": "/tables",
+                "queryStringParameters": {"ids": ids},
+            },
+            {},
+        )
+        return response["statusCode"], json.loads(response["body"])
+
+    def test_batch_create_chunks_by_25(self):
+        status, body = self.create_batch([table_body(i) for i in range(1, 61)])
+        self.assertEqual(status, 200)
+        self.assertEqual(body["ids"], list(range(1, 61)))
+        self.assertEqual(self.HANDLER.dynamodb.calls.count("BatchWriteItem"), 3)
+        self.assertEqual(len(self.HANDLER.tables_table.scan()["Items"]), 60)
+
+    def test_unprocessed_items_are_retried(self):
+        self.HANDLER.dynamodb.throttled_calls = 3
+        status, body = self.create_batch([table_body(i) for i in range(1, 26)])
+        self.assertEqual(status, 200)
+        self.assertEqual(len(self.HANDLER.tables_table.scan()["Items"]), 25)
+        self.assertEqual(self.sleep.call_count, 3)
+
+    def test_items_left_unprocessed_are_reported(self):
+        self.HANDLER.dynamodb.throttled_calls = 100
+        status, body = self.create_batch([table_body(1), table_body(2)])
+        self.assertEqual(status, 503)
+        self.assertEqual((body["ids"], body["unprocessedIds"]), ([1], [2]))
+
+    def test_invalid_table_in_batch(self):
+        status, _ = self.create_batch([table_body(1), {"id": 2}])
+        self.assertEqual(status, 400)
+        self.assertEqual(self.HANDLER.dynamodb.calls, [])
+
+    def test_get_by_ids_uses_batch_get_for_catalog_misses(self):
+        self.HANDLER.tables_table.load([table_body(i) for i in range(1, 4)])
+        self.HANDLER.tables_catalog.tables()
+        self.HANDLER.tables_table.load([table_body(i) for i in range(4, 150)])
+        self.HANDLER.dynamodb.throttled_calls = 1
+        status, body = self.get_by_ids(",".join(str(i) for i in range(1, 150)) + ",999")
+        self.assertEqual(status, 200)
+        self.assertEqual([t["id"] for t in body["tables"]], list(range(1, 150)))
+        self.assertEqual(self.HANDLER.dynamodb.calls.count("BatchGetItem"), 3)
+
+    def test_get_by_ids_keys_left_unprocessed(self):
+        self.HANDLER.tables_catalog.tables()
+        # created after the catalog was loaded
+        self.HANDLER.tables_table.load([table_body(i) for i in range(1, 4)])
+        self.HANDLER.dynamodb.throttled_calls = 100
+        status, body = self.get_by_ids("1,2,3")
+        self.assertEqual(status, 503)
+        self.assertEqual(body["message"], "Service unavailable, try again")
+        self.assertEqual(
+            self.HANDLER.dynamodb.calls.count("BatchGetItem"), LAMBDA_HANDLER.BATCH_MAX_ATTEMPTS
+        )
+
+    def test_get_by_ids_rejects_garbage(self):
+        status, _ = self.get_by_ids("1,two")
+        self.assertEqual(status, 400)
@@ -0,0 +1,180 @@
+import json
+from unittest import mock
+
+from botocore.exceptions import ClientError
+
+from tests.test_api_handler import ApiHandlerLambdaTestCase
+
+
+def reservation_event(**overrides):
+    body = {
+        "tableNumber": 1,
+        "clientName": "John Doe",
+        "phoneNumber": "123-456-789",
+        "date": "2024-05-01",
+        "slotTimeStart": "13:00",
+        "slotTimeEnd": "15:00",
+    }
+    body.update(overrides)
+    return {
+        "httpMethod": "POST",
+        "resource": "/reservations",
+        "path": "/reservations",
+        "body": json.dumps(body),
+    }
+
+
+class TestCreateReservation(ApiHandlerLambdaTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.HANDLER.tables_table.load(
+            [{"id": 1, "number": 1, "places": 4, "isVip": False, "minOrder": 0}]
+        )
+        self.HANDLER.reservations_table.load(
+            [
+                {
+                    "id": "existing",
+                    "tableNumber": 1,
+                    "date": "2024-05-01",
+                    "slotTimeStart": "10:00",
+                    "slotTimeEnd": "12:00",
+                }
+            ]
+        )
+        self.HANDLER.occupancy_table.load(
+            [{"tableNumber": 1, "date": "2024-05-01", "slots": set(range(40, 48))}]
+        )
+
+    def test_success(self):
+        response = self.HANDLER.handle_request(reservation_event(), {})
+        self.assertEqual(response["statusCode"], 200)
+        self.assertIn("reservationId", json.loads(response["body"]))
+
+    def test_unknown_table(self):
+        response = self.HANDLER.handle_request(reservation_event(tableNumber=7), {})
+        self.assertEqual(response["statusCode"], 400)
+        self.assertEqual(json.loads(response["body"])["message"], "Table does not exist")
+
+    def test_time_conflict(self):
+        response = self.HANDLER.handle_request(
+            reservation_event(slotTimeStart="11:00", slotTimeEnd="13:00"), {}
+        )
+        self.assertEqual(response["statusCode"], 400)
+
+    def test_same_slot_other_date(self):
+        response = self.HANDLER.handle_request(
+            reservation_event(date="2024-05-02", slotTimeStart="10:00"), {}
+        )
+        self.assertEqual(response["statusCode"], 200)
+
+    def test_back_to_back_slots(self):
+        response = self.HANDLER.handle_request(
+            reservation_event(slotTimeStart="12:00", slotTimeEnd="13:00"), {}
+        )
+        self.assertEqual(response["statusCode"], 200)
+        response = self.HANDLER.handle_request(
+            reservation_event(slotTimeStart="12:50", slotTimeEnd="14:00"), {}
+        )
+        self.assertEqual(response["statusCode"], 400)
+
+    def test_invalid_slot_times(self):
+        for start, end in (("15:00", "13:00"), ("25:00", "26:00"), ("noon", "13:00")):
+            response = self.HANDLER.handle_request(
+                reservation_event(slotTimeStart=start, slotTimeEnd=end), {}
+            )
+            self.assertEqual(response["statusCode"], 400)
+        self.assertEqual(self.HANDLER.occupancy_table.calls, [])
+
+    def test_failed_write_releases_slots(self):
+        def failing_put_item(**kwargs):
+            raise RuntimeError("throttled")
+
+        self.HANDLER.reservations_table.put_item = failing_put_item
+        response = self.HANDLER.handle_request(reservation_event(), {})
+        self.assertEqual(response["statusCode"], 400)
+        occupancy = self.HANDLER.occupancy_table.get_item(
+            Key={"tableNumber": 1, "date": "2024-05-01"}
+        )["Item"]
+        self.assertEqual(occupancy["slots"], set(range(40, 48)))
+
+    def test_does_not_scan_reservations(self):
+        self.HANDLER.handle_request(reservation_event(), {})
+        self.HANDLER.handle_request(reservation_event(date="2024-05-03"), {})
+        self.HANDLER.handle_request(
+            reservation_event(date="2024-05-03", slotTimeStart="18:00", slotTimeEnd="19:00"), {}
+        )
+        self.assertNotIn("Scan", self.HANDLER.reservations_table.calls)
+        # only to seed the occupancy item of the new date
+        self.assertEqual(self.HANDLER.reservations_table.calls.count("Query"), 1)
+        self.assertEqual(self.HANDLER.tables_table.calls.count("Scan"), 1)
+
+    def test_date_booked_before_occupancy_items(self):
+        self.HANDLER.reservations_table.load(
+            [
+                {
+                    "id": "legacy",
+                    "tableNumber": 1,
+                    "date": "2024-05-04",
+                    "slotTimeStart": "19:00",
+                    "slotTimeEnd": "21:00",
+                }
+            ]
+        )
+        response = self.HANDLER.handle_request(
+            reservation_event(date="2024-05-04", slotTimeStart="20:00", slotTimeEnd="22:00"), {}
+        )
+        self.assertEqual(response["statusCode"], 400)
+        response = self.HANDLER.handle_request(
+            reservation_event(date="2024-05-04", slotTimeStart="21:00", slotTimeEnd="22:00"), {}
+        )
+        self.assertEqual(response["statusCode"], 200)
+        occupancy = self.HANDLER.occupancy_table.get_item(
+            Key={"tableNumber": 1, "date": "2024-05-04"}
+        )["Item"]
+        self.assertEqual(occupancy["slots"], set(range(76, 88)))
+
+    def test_invalid_field_types(self):
+        for overrides in ({"tableNumber": "one"}, {"clientName": 7}, {"date": None}):
+            response = self.HANDLER.handle_request(reservation_event(**overrides), {})
+            self.assertEqual(response["statusCode"], 400)
+        self.assertEqual(self.HANDLER.occupancy_table.calls, [])
+
+    def test_stores_only_reservation_fields(self):
+        response = self.HANDLER.handle_request(
+            reservation_event(id="chosen-by-client", isAdmin=True), {}
+        )
+        reservation_id = json.loads(response["body"])["reservationId"]
+        self.assertNotEqual(reservation_id, "chosen-by-client")
+        item = self.HANDLER.reservations_table.get_item(Key={"id": reservation_id})["Item"]
+        self.assertNotIn("isAdmin", item)
+        self.assertEqual(item["tableNumber"], 1)
+
+    def test_retried_post_books_once(self):
+        event = reservation_event()
+        event["headers"] = {"Idempotency-Key": "retry-1"}
+        first = self.HANDLER.handle_request(event, {})
+        second = self.HANDLER.handle_request(dict(event), {})
+        self.assertEqual(second, first)
+        self.assertEqual(len(self.HANDLER.reservations_table.scan()["Items"]), 2)
+        self.assertEqual(self.HANDLER.occupancy_table.calls, ["UpdateItem"])
+
+    def test_throttled_booking_is_not_replayed(self):
+        event = reservation_event()
+        event["headers"] = {"Idempotency-Key": "retry-2"}
+        throttled = ClientError(
+            {"Error": {"Code": "ProvisionedThroughputExceededException", "Message": "slow down"}},
+            "UpdateItem",
+        )
+        with mock.patch.object(self.HANDLER.occupancy_table, "update_item", side_effect=throttled):
+            first = self.HANDLER.handle_request(event, {})
+        self.assertEqual(first["statusCode"], 503)
+        # the claim was released: the retry books instead of replaying the 503
+        second = self.HANDLER.handle_request(dict(event), {})
+        self.assertEqual(second["statusCode"], 200)
+
+    def test_other_aws_errors_are_server_errors(self):
+        denied = ClientError({"Error": {"Code": "AccessDeniedException", "Message": "no"}}, "UpdateItem")
+        with mock.patch.object(self.HANDLER.occupancy_table, "update_item", side_effect=denied):
+            response = self.HANDLER.handle_request(reservation_event(), {})
+        self.assertEqual(response["statusCode"], 500)
@@ -0,0 +1,71 @@
+import json
+import os
+import unittest
+from unittest import mock
+
+from botocore.awsrequest import AWSResponse
+
+from tests.test_api_handler import LAMBDA_HANDLER
+from tests.test_commons import AWS_CLIENTS, MODELS
+
+
+class _Raw:
+    def __init__(self, body):
+        self.body = body
+
+    def stream(self, **kwargs):
+        yield self.body
+
+
+class TestDynamoDBWireFormat(unittest.TestCase):
+    """
+    What the handler's low-level client sends and returns over HTTP: model
+    items must go out as attribute values exactly once, and come back as
+    attribute values
+    """
+
+    def setUp(self) -> None:
+        patcher = mock.patch.dict(
+            os.environ,
+            {
+                "AWS_DEFAULT_REGION": "eu-west-1",
+                "AWS_ACCESS_KEY_ID": "testing",
+                "AWS_SECRET_ACCESS_KEY": "testing",
+            },
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(AWS_CLIENTS.REGISTRY.clear)
+        AWS_CLIENTS.REGISTRY.clear()
+        self.handler = LAMBDA_HANDLER.ApiHandler()
+        # the resource exists too, as on a container that used both
+        self.handler.dynamodb
+        self.client = self.handler.dynamodb_client
+        self.sent = []
+        self.response_body = b"{}"
+        self.client.meta.events.register("before-send.dynamodb", self.capture)
+
+    def capture(self, request, **kwargs):
+        self.sent.append(json.loads(request.body))
+        return AWSResponse(request.url, 200, {}, _Raw(self.response_body))
+
+    def test_put_item_sends_attribute_values_once(self):
+        reservation = MODELS.Reservation(
+            id="r-1",
+            tableNumber=1,
+            clientName="John Doe",
+            phoneNumber="123-456-789",
+            date="2024-05-01",
+            slotTimeStart="13:00",
+            slotTimeEnd="15:00",
+        )
+        self.client.put_item(TableName="Reservations", Item=reservation.to_item())
+        (body,) = self.sent
+        self.assertEqual(body["Item"]["id"], {"S": "r-1"})
+        self.assertEqual(body["Item"]["tableNumber"], {"N": "1"})
+
+    def test_get_item_returns_attribute_values(self):
+        self.response_body = json.dumps({"Item": {"id": {"N": "1"}, "isVip": {"BOOL": True}}}).encode()
+        response = self.client.get_item(TableName="Tables", Key={"id": {"N": "1"}})
+        self.assertEqual(self.sent[0]["Key"], {"id": {"N": "1"}})
+        self.assertEqual(response["Item"], {"id": {"N": "1"}, "isVip": {"BOOL": True}})
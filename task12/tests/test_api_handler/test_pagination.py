@@ -0,0 +1,145 @@
+import base64
+import gzip
+import io
+import json
+import tracemalloc
+
+from tests.local_dynamodb import item_size
+from tests.test_api_handler import ApiHandlerLambdaTestCase
+
+# reading all ~1.5 MB of reservations at once peaks at about 23 MB, a page
+# of 500 at about 1 MB
+PAGE_PEAK_BYTES = 2 * 1024 * 1024
+
+
+def reservation(i):
+    return {
+        "id": f"reservation-{i:06d}",
+        "tableNumber": i % 20 + 1,
+        "clientName": f"Client {i:06d}",
+        "phoneNumber": "123-456-789",
+        "date": "2024-05-01",
+        "slotTimeStart": "13:00",
+        "slotTimeEnd": "15:00",
+    }
+
+
+class TestPagination(ApiHandlerLambdaTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        items = []
+        size = 0
+        while size <= 1024 * 1024 * 1.5:
+            items.append(reservation(len(items)))
+            size += item_size(items[-1])
+        self.HANDLER.reservations_table.load(items)
+        self.total = len(items)
+
+    def get_reservations(self, **params):
+        response = self.HANDLER.handle_request(
+            {
+                "httpMethod": "GET",
+                "resource": "/reservations",
+                "path": "/reservations",
+                "queryStringParameters": params or None,
+            },
+            {},
+        )
+        self.assertEqual(response["statusCode"], 200)
+        return json.loads(response["body"])
+
+    def test_unpaged_request_reads_past_1mb(self):
+        # clients that send no limit get every reservation, as before
+        # pagination; the scan pages are still encoded one at a time
+        body = self.get_reservations()
+        self.assertEqual(len(body["reservations"]), self.total)
+        self.assertNotIn("nextCursor", body)
+        self.assertGreater(self.HANDLER.reservations_table.calls.count("Scan"), 1)
+
+    def test_cursor_walks_every_item_with_flat_memory(self):
+        names = []
+        peaks = []
+        params = {"limit": "500"}
+        while True:
+            tracemalloc.start()
+            body = self.get_reservations(**params)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            names.extend(r["clientName"] for r in body["reservations"])
+            if "nextCursor" not in body:
+                break
+            params = {"limit": "500", "cursor": body["nextCursor"]}
+
+        self.assertEqual(len(names), self.total)
+        self.assertEqual(len(set(names)), self.total)
+        self.assertGreater(len(peaks), 10)
+        self.assertLess(max(peaks), PAGE_PEAK_BYTES)
+
+    def test_table_pages(self):
+        self.HANDLER.tables_table.load(
+            {"id": n, "number": n, "places": 4, "isVip": False, "minOrder": 0}
+            for n in range(1, 6)
+        )
+        ids = []
+        params = {"limit": "2"}
+        while True:
+            response = self.HANDLER.handle_request(
+                {
+                    "httpMethod": "GET",
+                    "resource": "/tables",
+                    "path": "/tables",
+                    "queryStringParameters": params,
+                },
+                {},
+            )
+            body = json.loads(response["body"])
+            ids.extend(table["id"] for table in body["tables"])
+            if "nextCursor" not in body:
+                break
+            params = {"limit": "2", "cursor": body["nextCursor"]}
+        self.assertEqual(ids, [1, 2, 3, 4, 5])
+
+    def test_invalid_limit(self):
+        response = self.HANDLER.handle_request(
+            {
+                "httpMethod": "GET",
+                "resource": "/reservations",
+                "path": "/reservations",
+                "queryStringParameters": {"limit": "0"},
+            },
+            {},
+        )
+        self.assertEqual(response["statusCode"], 400)
+
+    def test_rest_api_page_is_not_compressed(self):
+        # the REST API declares no binaryMediaTypes
+        event = {
+            "httpMethod": "GET",
+            "resource": "/reservations",
+            "path": "/reservations",
+            "headers": {"Accept-Encoding": "gzip"},
+            "queryStringParameters": {"limit": "500"},
+        }
+        self.HANDLER.metrics_stream = io.StringIO()
+        response = self.HANDLER.lambda_handler(event, {})
+
+        self.assertFalse(response.get("isBase64Encoded"))
+        self.assertNotIn("Content-Encoding", response["headers"])
+        self.assertEqual(len(json.loads(response["body"])["reservations"]), 500)
+
+    def test_page_is_compressed_for_accepting_clients(self):
+        event = {
+            "version": "2.0",
+            "rawPath": "/reservations",
+            "requestContext": {"http": {"method": "GET", "path": "/reservations"}},
+            "headers": {"accept-encoding": "gzip"},
+            "queryStringParameters": {"limit": "500"},
+        }
+        self.HANDLER.metrics_stream = io.StringIO()
+        response = self.HANDLER.lambda_handler(event, {})
+
+        self.assertTrue(response["isBase64Encoded"])
+        self.assertEqual(response["headers"]["Content-Encoding"], "gzip")
+        body = json.loads(gzip.decompress(base64.b64decode(response["body"])))
+        self.assertEqual(len(body["reservations"]), 500)
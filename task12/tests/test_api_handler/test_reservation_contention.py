@@ -0,0 +1,58 @@
+import json
+import threading
+
+from tests.test_api_handler import ApiHandlerLambdaTestCase
+from tests.test_api_handler.test_create_reservation import reservation_event
+
+THREADS = 16
+
+
+class TestReservationContention(ApiHandlerLambdaTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.HANDLER.tables_table.load(
+            [{"id": 1, "number": 1, "places": 4, "isVip": False, "minOrder": 0}]
+        )
+
+    def book_concurrently(self, events):
+        barrier = threading.Barrier(len(events))
+        responses = [None] * len(events)
+
+        def book(index):
+            barrier.wait()
+            responses[index] = self.HANDLER.handle_request(events[index], {})
+
+        threads = [threading.Thread(target=book, args=(i,)) for i in range(len(events))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return [response["statusCode"] for response in responses]
+
+    def test_only_one_overlapping_booking_wins(self):
+        events = [
+            reservation_event(clientName=f"Client {i}", slotTimeStart="18:00", slotTimeEnd="20:00")
+            for i in range(THREADS)
+        ]
+        statuses = self.book_concurrently(events)
+        self.assertEqual(statuses.count(200), 1)
+        self.assertEqual(len(self.HANDLER.reservations_table.scan()["Items"]), 1)
+
+    def test_disjoint_bookings_all_win(self):
+        events = [
+            reservation_event(
+                clientName=f"Client {i}",
+                slotTimeStart=f"{8 + i:02d}:00",
+                slotTimeEnd=f"{8 + i:02d}:45",
+            )
+            for i in range(THREADS)
+        ]
+        statuses = self.book_concurrently(events)
+        self.assertEqual(statuses, [200] * THREADS)
+        occupancy = self.HANDLER.occupancy_table.get_item(
+            Key={"tableNumber": 1, "date": "2024-05-01"}
+        )["Item"]
+        self.assertEqual(len(occupancy["slots"]), THREADS * 3)
+        bodies = self.HANDLER.reservations_table.scan()["Items"]
+        self.assertEqual(len({json.dumps(b["clientName"]) for b in bodies}), THREADS)
@@ -0,0 +1,100 @@
+import io
+import json
+
+from tests.test_api_handler import ApiHandlerLambdaTestCase, LAMBDA_HANDLER
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def table_item(table_id, number=None):
+    return {
+        "id": table_id,
+        "number": number or table_id,
+        "places": 4,
+        "isVip": False,
+        "minOrder": 0,
+    }
+
+
+class TestTablesCatalog(ApiHandlerLambdaTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.clock = FakeClock()
+        self.HANDLER.tables_catalog = LAMBDA_HANDLER.TablesCatalog(
+            load_items=self.HANDLER._scan_tables,
+            load_version=self.HANDLER._get_catalog_version,
+            ttl=60,
+            clock=self.clock,
+        )
+        self.HANDLER.tables_table.load([table_item(2), table_item(1)])
+        self.catalog = self.HANDLER.tables_catalog
+
+    def get_tables(self):
+        response = self.HANDLER.handle_request(
+            {"httpMethod": "GET", "resource": "/tables", "path": "/tables"}, {}
+        )
+        return json.loads(response["body"])["tables"]
+
+    def test_warm_reads_do_not_scan(self):
+        self.assertEqual([t["id"] for t in self.get_tables()], [1, 2])
+        self.get_tables()
+        self.assertEqual(self.HANDLER.tables_table.calls.count("Scan"), 1)
+        self.assertEqual((self.catalog.hits, self.catalog.misses), (1, 1))
+
+    def test_warm_up_fills_the_catalog(self):
+        # no local stand-in for Cognito; priming skips what it cannot prime
+        self.HANDLER.cognito = None
+        self.HANDLER.metrics_stream = io.StringIO()
+        self.HANDLER.lambda_handler({"warm_up": True}, {})
+        self.assertEqual(self.HANDLER.tables_table.calls.count("Scan"), 1)
+
+        self.assertEqual([t["id"] for t in self.get_tables()], [1, 2])
+        self.assertEqual(self.HANDLER.tables_table.calls.count("Scan"), 1)
+
+    def test_expired_catalog_is_revalidated_by_version(self):
+        self.get_tables()
+        self.clock.now += 61
+        self.get_tables()
+        self.assertEqual(self.HANDLER.tables_table.calls.count("Scan"), 1)
+        self.assertEqual(self.catalog.revalidations, 1)
+
+    def test_version_change_from_other_container_reloads(self):
+        self.get_tables()
+        self.HANDLER.tables_table.load([table_item(3)])
+        self.HANDLER.ssm.put_parameter(
+            Name=self.HANDLER.catalog_version_parameter, Value="other", Overwrite=True
+        )
+        self.clock.now += 61
+        self.assertEqual([t["id"] for t in self.get_tables()], [1, 2, 3])
+        self.assertEqual(self.catalog.misses, 2)
+
+    def test_create_table_invalidates(self):
+        self.get_tables()
+        self.HANDLER.handle_request(
+            {
+                "httpMethod": "POST",
+                "resource": "/tables",
+                "path": "/tables",
+                "body": json.dumps(table_item(5)),
+            },
+            {},
+        )
+        self.assertEqual([t["id"] for t in self.get_tables()], [1, 2, 5])
+        self.assertIsNotNone(self.catalog.version)
+
+    def test_table_by_id_falls_back_to_get_item(self):
+        self.get_tables()
+        self.HANDLER.tables_table.load([table_item(9)])
+        response = self.HANDLER.handle_request(
+            {"httpMethod": "GET", "resource": "/tables/{tableId}", "path": "/tables/9"},
+            {},
+        )
+        self.assertEqual(response["statusCode"], 200)
+        self.assertIn("GetItem", self.HANDLER.tables_table.calls)
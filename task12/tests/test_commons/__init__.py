@@ -0,0 +1,14 @@
+import importlib
+from tests import ImportFromSourceContext
+
+with ImportFromSourceContext():
+    SERIALIZER = importlib.import_module("commons.serializer")
+    ROUTER = importlib.import_module("commons.router")
+    TOKEN_VERIFIER = importlib.import_module("commons.token_verifier")
+    AWS_CLIENTS = importlib.import_module("commons.aws_clients")
+    MODELS = importlib.import_module("commons.models")
+    ABSTRACT_LAMBDA = importlib.import_module("commons.abstract_lambda")
+    LOG_HELPER = importlib.import_module("commons.log_helper")
+    IDEMPOTENCY = importlib.import_module("commons.idempotency")
+    HTTP_RESPONSE = importlib.import_module("commons.http_response")
+    COMMONS = importlib.import_module("commons")
@@ -0,0 +1,218 @@
+import io
+import json
+import unittest
+
+from tests.test_commons import ABSTRACT_LAMBDA, COMMONS, LOG_HELPER
+
+
+class Recorder(ABSTRACT_LAMBDA.Middleware):
+    def __init__(self, name, calls, short_circuit=None, handle_errors=False):
+        self.name = name
+        self.calls = calls
+        self.short_circuit = short_circuit
+        self.handle_errors = handle_errors
+
+    def before(self, event, context):
+        self.calls.append(f"{self.name}.before")
+        return self.short_circuit
+
+    def after(self, event, context, response):
+        self.calls.append(f"{self.name}.after")
+        return {**response, self.name: True}
+
+    def on_error(self, event, context, error):
+        self.calls.append(f"{self.name}.on_error")
+        if self.handle_errors:
+            return {"statusCode": 502, "error": str(error)}
+        return None
+
+
+class TimingOnly(ABSTRACT_LAMBDA.Middleware):
+    def after(self, event, context, response):
+        return response
+
+
+class Lambda(ABSTRACT_LAMBDA.AbstractLambda):
+    def __init__(self, middlewares=(), error=None):
+        self.middlewares = middlewares
+        self.error = error
+        self.metrics_stream = io.StringIO()
+        self.emit_stage_metrics = True
+
+    def validate_request(self, event) -> dict:
+        pass
+
+    def handle_request(self, event, context):
+        if self.error:
+            raise self.error
+        return {"statusCode": 200}
+
+    def metric_lines(self):
+        return [json.loads(line) for line in self.metrics_stream.getvalue().splitlines()]
+
+
+class PrimedLambda(Lambda):
+    def __init__(self, prime_error=None):
+        super().__init__()
+        self.prime_error = prime_error
+        self.primes = 0
+
+    def prime(self):
+        self.primes += 1
+        if self.prime_error:
+            raise self.prime_error
+
+
+class CountingLambda(Lambda):
+    def handle_request(self, event, context):
+        self.put_metric("CacheHit", 1)
+        self.put_metric("CacheAge", 12.5, "Seconds")
+        self.put_metric("CacheAge", 3, "Seconds")
+        return {"statusCode": 200}
+
+
+class TestMiddlewarePipeline(unittest.TestCase):
+
+    def test_hook_order(self):
+        calls = []
+        handler = Lambda([Recorder("a", calls), Recorder("b", calls)])
+        response = handler.lambda_handler({}, None)
+        self.assertEqual(calls, ["a.before", "b.before", "b.after", "a.after"])
+        self.assertEqual(response, {"statusCode": 200, "a": True, "b": True})
+
+    def test_before_hook_short_circuits(self):
+        calls = []
+        handler = Lambda(
+            [Recorder("a", calls, short_circuit={"statusCode": 401}), Recorder("b", calls)]
+        )
+        response = handler.lambda_handler({}, None)
+        self.assertEqual(calls, ["a.before", "a.after"])
+        self.assertEqual(response, {"statusCode": 401, "a": True})
+        self.assertNotIn("handle", handler.metric_lines()[0])
+
+    def test_error_hooks(self):
+        calls = []
+        handler = Lambda(
+            [Recorder("a", calls, handle_errors=True), Recorder("b", calls)],
+            error=RuntimeError("boom"),
+        )
+        response = handler.lambda_handler({}, None)
+        self.assertEqual(calls, ["a.before", "b.before", "b.on_error", "a.on_error"])
+        self.assertEqual(response, {"statusCode": 502, "error": "boom"})
+
+    def test_error_log_leaves_out_body_and_headers(self):
+        stream = io.StringIO()
+        LOG_HELPER.console_handler.stream = stream
+        self.addCleanup(setattr, LOG_HELPER.console_handler, "stream", None)
+        event = {
+            "httpMethod": "POST",
+            "path": "/signin",
+            "headers": {"Authorization": "Bearer secret-token"},
+            "body": '{"password": "hunter2"}',
+            "requestContext": {"requestId": "req-1"},
+        }
+        with self.assertRaises(COMMONS.ApplicationException) as raised:
+            Lambda(error=KeyError("email")).lambda_handler(event, None)
+
+        self.assertEqual(raised.exception.code, 500)
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        error = next(line for line in lines if line["level"] == "ERROR")
+        self.assertEqual(
+            error["request"], {"method": "POST", "path": "/signin", "requestId": "req-1"}
+        )
+        self.assertNotIn("hunter2", stream.getvalue())
+        self.assertNotIn("secret-token", stream.getvalue())
+
+    def test_unhandled_application_error_keeps_default_handling(self):
+        handler = Lambda(error=COMMONS.ApplicationException(code=404, content="missing"))
+        with self.assertRaises(COMMONS.ApplicationException) as raised:
+            handler.lambda_handler({}, None)
+        self.assertEqual(raised.exception.code, 404)
+        self.assertEqual(len(handler.metric_lines()), 1)
+
+    def test_one_emf_line_per_invocation(self):
+        handler = Lambda([TimingOnly()])
+        handler.lambda_handler({}, None)
+        handler.lambda_handler({}, None)
+        first, second = handler.metric_lines()
+        metrics = first["_aws"]["CloudWatchMetrics"][0]
+        self.assertEqual(metrics["Dimensions"], [["Function", "Start"]])
+        self.assertEqual(
+            [metric["Name"] for metric in metrics["Metrics"]],
+            ["validate", "handle", "TimingOnly.after", "total"],
+        )
+        self.assertEqual(first["Function"], "Lambda")
+        self.assertEqual(second["Start"], "warm")
+        self.assertGreaterEqual(first["total"], first["handle"])
+
+    def test_cold_start_is_reported_once_per_process(self):
+        ABSTRACT_LAMBDA._first_request, ABSTRACT_LAMBDA._primed = True, False
+        handler = Lambda()
+        handler.lambda_handler({}, None)
+        Lambda().lambda_handler({}, None)
+        handler.lambda_handler({}, None)
+        self.assertEqual([line["Start"] for line in handler.metric_lines()], ["cold", "warm"])
+
+    def test_warm_up_primes_before_the_first_request(self):
+        ABSTRACT_LAMBDA._first_request, ABSTRACT_LAMBDA._primed = True, False
+        handler = PrimedLambda()
+        self.assertIsNone(handler.lambda_handler({"warm_up": True}, None))
+        handler.lambda_handler({}, None)
+        handler.lambda_handler({}, None)
+
+        self.assertEqual(handler.primes, 1)
+        ping, first, second = handler.metric_lines()
+        self.assertEqual(
+            [line["Start"] for line in (ping, first, second)], ["warm-up", "primed", "warm"]
+        )
+        self.assertIn("prime", ping)
+        self.assertNotIn("handle", ping)
+
+    def test_failed_priming_leaves_the_first_request_cold(self):
+        ABSTRACT_LAMBDA._first_request, ABSTRACT_LAMBDA._primed = True, False
+        handler = PrimedLambda(prime_error=ConnectionError("no route"))
+        self.assertIsNone(handler.lambda_handler({"warm_up": True}, None))
+        handler.lambda_handler({}, None)
+        self.assertEqual([line["Start"] for line in handler.metric_lines()], ["warm-up", "cold"])
+
+    def test_warm_up_without_prime_leaves_the_first_request_cold(self):
+        ABSTRACT_LAMBDA._first_request, ABSTRACT_LAMBDA._primed = True, False
+        handler = Lambda()
+        self.assertIsNone(handler.lambda_handler({"warm_up": True}, None))
+        handler.lambda_handler({}, None)
+        self.assertEqual([line["Start"] for line in handler.metric_lines()], ["warm-up", "cold"])
+
+    def test_function_name_from_context(self):
+        class Context:
+            function_name = "api_handler"
+
+        handler = Lambda()
+        handler.lambda_handler({}, Context())
+        self.assertEqual(handler.metric_lines()[0]["Function"], "api_handler")
+
+    def test_put_metrics_join_the_emf_line(self):
+        handler = CountingLambda()
+        handler.lambda_handler({}, None)
+        handler.lambda_handler({}, None)
+        first, second = handler.metric_lines()
+        definitions = first["_aws"]["CloudWatchMetrics"][0]["Metrics"]
+        self.assertIn({"Name": "CacheHit", "Unit": "Count"}, definitions)
+        self.assertIn({"Name": "CacheAge", "Unit": "Seconds"}, definitions)
+        self.assertEqual((first["CacheHit"], first["CacheAge"]), (1, [12.5, 3]))
+        # metrics do not leak into the next invocation
+        self.assertEqual(second["CacheAge"], [12.5, 3])
+
+    def test_put_metrics_without_stage_metrics(self):
+        handler = CountingLambda()
+        handler.emit_stage_metrics = False
+        handler.lambda_handler({}, None)
+        (line,) = handler.metric_lines()
+        self.assertEqual(
+            [metric["Name"] for metric in line["_aws"]["CloudWatchMetrics"][0]["Metrics"]],
+            ["CacheHit", "CacheAge"],
+        )
+        self.assertNotIn("total", line)
+        plain = Lambda()
+        plain.emit_stage_metrics = False
+        plain.lambda_handler({}, None)
+        self.assertEqual(plain.metric_lines(), [])
@@ -0,0 +1,57 @@
+import unittest
+
+from botocore.stub import Stubber
+
+from tests.test_commons import AWS_CLIENTS
+
+
+class TestClientRegistry(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.registry = AWS_CLIENTS.ClientRegistry()
+
+    def test_nothing_is_created_up_front(self):
+        self.assertEqual(self.registry.created(), [])
+
+    def test_clients_are_reused(self):
+        first = self.registry.client("s3", region_name="eu-west-1")
+        self.assertIs(self.registry.client("s3", region_name="eu-west-1"), first)
+        self.assertIsNot(self.registry.client("s3", region_name="eu-central-1"), first)
+        self.assertEqual(len(self.registry.created()), 2)
+
+    def test_shared_config_is_applied(self):
+        dynamodb = self.registry.resource("dynamodb", region_name="eu-west-1")
+        config = dynamodb.meta.client.meta.config
+        self.assertEqual(config.retries["mode"], "adaptive")
+        self.assertEqual(config.max_pool_connections, AWS_CLIENTS.MAX_POOL_CONNECTIONS)
+        self.assertTrue(config.tcp_keepalive)
+        self.assertEqual(config.connect_timeout, AWS_CLIENTS.CONNECT_TIMEOUT_SECONDS)
+
+    def test_clear(self):
+        first = self.registry.client("s3", region_name="eu-west-1")
+        self.registry.clear()
+        self.assertIsNot(self.registry.client("s3", region_name="eu-west-1"), first)
+
+
+class TestPrime(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.registry = AWS_CLIENTS.ClientRegistry()
+
+    def test_prime_makes_the_cheap_call(self):
+        dynamodb = self.registry.resource("dynamodb", region_name="eu-west-1")
+        with Stubber(dynamodb.meta.client) as stubber:
+            stubber.add_response("describe_endpoints", {"Endpoints": []})
+            self.assertEqual(self.registry.prime(), {("resource", "dynamodb", "eu-west-1", None): True})
+            stubber.assert_no_pending_responses()
+
+    def test_access_errors_still_prime(self):
+        ssm = self.registry.client("ssm", region_name="eu-west-1")
+        with Stubber(ssm) as stubber:
+            stubber.add_client_error("describe_parameters", service_error_code="AccessDeniedException")
+            self.assertTrue(AWS_CLIENTS.prime(ssm))
+
+    def test_unknown_services_and_stand_ins_are_skipped(self):
+        self.assertFalse(AWS_CLIENTS.prime(self.registry.client("kms", region_name="eu-west-1")))
+        self.assertFalse(AWS_CLIENTS.prime(object()))
+        self.assertFalse(AWS_CLIENTS.prime(None))
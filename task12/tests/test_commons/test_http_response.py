@@ -0,0 +1,113 @@
+import base64
+import gzip
+import json
+import random
+import unittest
+
+from tests.test_commons import HTTP_RESPONSE
+
+BODY = json.dumps({"reservations": [{"clientName": f"Client {i}"} for i in range(200)]})
+
+
+def decode(response):
+    data = base64.b64decode(response["body"])
+    coding = response["headers"]["Content-Encoding"]
+    if coding == "gzip":
+        return gzip.decompress(data).decode()
+    return HTTP_RESPONSE.brotli.decompress(data).decode()
+
+
+class TestNegotiation(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.builder = HTTP_RESPONSE.ResponseBuilder()
+
+    def test_server_preference_on_equal_quality(self):
+        self.assertEqual(self.builder.negotiate("gzip, deflate, br"), self.builder.encodings[0])
+
+    def test_quality_values(self):
+        self.assertEqual(self.builder.negotiate("br;q=0.5, gzip;q=0.9"), "gzip")
+        self.assertIsNone(self.builder.negotiate("gzip;q=0, br;q=0"))
+
+    def test_wildcard_and_identity(self):
+        self.assertEqual(self.builder.negotiate("*"), self.builder.encodings[0])
+        self.assertIsNone(self.builder.negotiate("identity"))
+        self.assertIsNone(self.builder.negotiate(None))
+
+    def test_header_lookup_is_case_insensitive(self):
+        for name in ("Accept-Encoding", "accept-encoding", "ACCEPT-ENCODING"):
+            self.assertEqual(HTTP_RESPONSE.accept_encoding({"headers": {name: "gzip"}}), "gzip")
+        self.assertIsNone(HTTP_RESPONSE.accept_encoding({"headers": None}))
+
+
+class TestCompress(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.builder = HTTP_RESPONSE.ResponseBuilder()
+
+    def test_gzip_round_trip(self):
+        response = self.builder.compress(self.builder.build(200, BODY), "gzip")
+
+        self.assertTrue(response["isBase64Encoded"])
+        self.assertEqual(response["headers"]["Content-Encoding"], "gzip")
+        self.assertEqual(response["headers"]["Vary"], "Accept-Encoding")
+        self.assertEqual(decode(response), BODY)
+        self.assertLess(len(response["body"]), len(BODY) / 4)
+
+    @unittest.skipIf(HTTP_RESPONSE.brotli is None, "brotli is not installed")
+    def test_brotli_round_trip(self):
+        response = self.builder.compress(self.builder.build(200, BODY), "gzip, br")
+        self.assertEqual(response["headers"]["Content-Encoding"], "br")
+        self.assertEqual(decode(response), BODY)
+
+    def test_small_and_unaccepted_bodies_are_left_alone(self):
+        small = self.builder.build(200, '{"id":"1"}')
+        self.assertIs(self.builder.compress(small, "gzip"), small)
+        large = self.builder.build(200, BODY)
+        self.assertIs(self.builder.compress(large, None), large)
+        self.assertIs(self.builder.compress(None, "gzip"), None)
+
+    def test_incompressible_body_is_left_alone(self):
+        noise = base64.b64encode(random.Random(0).randbytes(4096)).decode()
+        response = self.builder.build(200, json.dumps({"blob": noise}))
+        self.assertFalse(self.builder.compress(response, "gzip")["isBase64Encoded"])
+
+    def test_headers_are_shared_and_other_headers_copied(self):
+        first = self.builder.compress(self.builder.build(200, BODY), "gzip")
+        second = self.builder.compress(self.builder.build(200, BODY), "gzip")
+        self.assertIs(first["headers"], second["headers"])
+        self.assertNotIn("Content-Encoding", self.builder.headers)
+
+        custom = {"statusCode": 200, "headers": {"Allow": "GET"}, "body": BODY}
+        compressed = self.builder.compress(custom, "gzip")
+        self.assertEqual(compressed["headers"]["Allow"], "GET")
+        self.assertEqual(custom["headers"], {"Allow": "GET"})
+
+    def test_middleware_reads_request_header(self):
+        middleware = HTTP_RESPONSE.CompressionMiddleware(self.builder)
+        event = {"version": "2.0", "headers": {"accept-encoding": "gzip"}}
+        response = middleware.after(event, None, self.builder.build(200, BODY))
+        self.assertEqual(decode(response), BODY)
+
+    def test_function_url_events_are_compressed(self):
+        middleware = HTTP_RESPONSE.CompressionMiddleware(self.builder)
+        event = {
+            "headers": {"accept-encoding": "gzip"},
+            "requestContext": {"http": {"method": "GET", "path": "/reservations"}},
+        }
+        response = middleware.after(event, None, self.builder.build(200, BODY))
+        self.assertTrue(response["isBase64Encoded"])
+
+    def test_rest_api_events_are_not_compressed(self):
+        # a REST API without binaryMediaTypes would send the base64 as text
+        event = {
+            "httpMethod": "GET",
+            "path": "/reservations",
+            "headers": {"Accept-Encoding": "gzip"},
+            "requestContext": {"resourcePath": "/reservations", "stage": "api"},
+        }
+        plain = self.builder.build(200, BODY)
+        middleware = HTTP_RESPONSE.CompressionMiddleware(self.builder)
+        self.assertIs(middleware.after(event, None, plain), plain)
+        opted_in = HTTP_RESPONSE.CompressionMiddleware(self.builder, rest_api=True)
+        self.assertEqual(decode(opted_in.after(event, None, plain)), BODY)
@@ -0,0 +1,133 @@
+import json
+import unittest
+
+from tests.local_dynamodb import LocalTable
+from tests.test_commons import COMMONS, IDEMPOTENCY
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000
+
+    def __call__(self):
+        return self.now
+
+
+def api_event(key="key-1", body=None):
+    return {
+        "httpMethod": "POST",
+        "path": "/orders",
+        "headers": {"Idempotency-Key": key} if key else {},
+        "body": json.dumps(body or {"item": "soup"}),
+    }
+
+
+class Orders:
+    def __init__(self, store):
+        self.store = store
+        self.runs = 0
+        self.fail_with = None
+
+    @IDEMPOTENCY.idempotent(
+        key=IDEMPOTENCY.header_key(),
+        store=lambda self: self.store,
+        fingerprint=IDEMPOTENCY.body_fingerprint,
+    )
+    def create(self, event):
+        self.runs += 1
+        if self.fail_with is not None:
+            raise self.fail_with
+        return {"statusCode": 200, "body": json.dumps({"order": self.runs})}
+
+
+class TestIdempotency(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.clock = FakeClock()
+        self.table = LocalTable("idempotency", hash_key="id")
+        self.store = IDEMPOTENCY.IdempotencyStore(self.table, ttl=600, clock=self.clock)
+        self.orders = Orders(self.store)
+
+    def new_container(self):
+        """Another container: same table, empty in-memory tier"""
+        return Orders(IDEMPOTENCY.IdempotencyStore(self.table, ttl=600, clock=self.clock))
+
+    def test_duplicate_returns_stored_result(self):
+        first = self.orders.create(api_event())
+        self.table.reset_metrics()
+        second = self.orders.create(api_event())
+        self.assertEqual(first, second)
+        self.assertEqual(self.orders.runs, 1)
+        self.assertEqual(self.table.calls, [])
+
+    def test_duplicate_in_another_container(self):
+        first = self.orders.create(api_event())
+        other = self.new_container()
+        self.assertEqual(other.create(api_event()), first)
+        self.assertEqual(other.runs, 0)
+        self.table.reset_metrics()
+        other.create(api_event())
+        self.assertEqual(self.table.calls, [])
+
+    def test_distinct_keys_and_no_key_run(self):
+        self.orders.create(api_event("key-1"))
+        self.orders.create(api_event("key-2"))
+        self.orders.create(api_event(None))
+        self.orders.create(api_event(None))
+        self.assertEqual(self.orders.runs, 4)
+
+    def test_key_reused_with_other_body(self):
+        self.orders.create(api_event())
+        response = self.orders.create(api_event(body={"item": "steak"}))
+        self.assertEqual(response["statusCode"], 422)
+        self.assertEqual(response["headers"]["Content-Type"], "application/json")
+        self.assertIn("different request", json.loads(response["body"])["message"])
+        self.assertEqual(self.orders.runs, 1)
+
+    def test_in_progress_key_conflicts(self):
+        self.store.begin("Orders.create#POST /orders  key-1")
+        other = self.new_container()
+        response = other.create(api_event())
+        self.assertEqual(response["statusCode"], 409)
+        self.assertIn("in progress", json.loads(response["body"])["message"])
+        self.assertEqual(other.runs, 0)
+
+    def test_store_still_raises_for_direct_callers(self):
+        self.store.begin("k")
+        with self.assertRaises(COMMONS.ApplicationException) as raised:
+            self.store.begin("k")
+        self.assertEqual(raised.exception.code, 409)
+
+    def test_stale_claim_expires(self):
+        self.store.begin("Orders.create#POST /orders  key-1")
+        self.clock.now += IDEMPOTENCY.IN_PROGRESS_TTL_SECONDS
+        other = self.new_container()
+        other.create(api_event())
+        self.assertEqual(other.runs, 1)
+
+    def test_failure_releases_the_key(self):
+        self.orders.fail_with = RuntimeError("throttled")
+        with self.assertRaises(RuntimeError):
+            self.orders.create(api_event())
+        self.orders.fail_with = None
+        self.orders.create(api_event())
+        self.assertEqual(self.orders.runs, 2)
+
+    def test_completed_result_expires(self):
+        self.orders.create(api_event())
+        self.clock.now += 600
+        other = self.new_container()
+        other.create(api_event())
+        self.assertEqual(other.runs, 1)
+        # the expired local copy is dropped and the fresh result replayed
+        self.orders.create(api_event())
+        self.assertEqual(self.orders.runs, 1)
+
+    def test_lru_is_bounded(self):
+        self.store.cache_size = 2
+        for key in ("a", "b", "c"):
+            self.orders.create(api_event(key))
+        self.table.reset_metrics()
+        self.orders.create(api_event("a"))
+        self.assertEqual(self.table.calls, ["PutItem", "GetItem"])
+        self.assertEqual(self.orders.runs, 3)
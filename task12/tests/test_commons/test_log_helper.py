@@ -0,0 +1,84 @@
+import io
+import json
+import logging
+import unittest
+
+from tests.test_commons import LOG_HELPER
+
+
+def make_logger(name, stream, **handler_kwargs):
+    handler = LOG_HELPER.BufferedStreamHandler(stream=stream, **handler_kwargs)
+    handler.setFormatter(LOG_HELPER.JsonFormatter(max_field_chars=64))
+    logger = logging.getLogger(f"test_log_helper.{name}")
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger, handler
+
+
+class TestLogHelper(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.stream = io.StringIO()
+
+    def lines(self):
+        return [json.loads(line) for line in self.stream.getvalue().splitlines()]
+
+    def test_records_are_buffered_until_flush(self):
+        logger, handler = make_logger("buffered", self.stream)
+        logger.info("first")
+        logger.info("second %s", 2)
+        self.assertEqual(self.stream.getvalue(), "")
+        handler.flush()
+        self.assertEqual([line["message"] for line in self.lines()], ["first", "second 2"])
+
+    def test_errors_and_full_buffer_flush_immediately(self):
+        logger, _ = make_logger("eager", self.stream, capacity=3)
+        logger.info("queued")
+        logger.error("failed")
+        self.assertEqual(len(self.lines()), 2)
+        for i in range(3):
+            logger.info("filler %s", i)
+        self.assertEqual(len(self.lines()), 5)
+
+    def test_extra_fields_are_structured_and_capped(self):
+        logger, handler = make_logger("fields", self.stream)
+        logger.info("Request", extra={"event": {"path": "/tables"}, "body": "x" * 1000})
+        handler.flush()
+        line = self.lines()[0]
+        self.assertEqual(line["level"], "INFO")
+        self.assertEqual(line["event"], {"path": "/tables"})
+        self.assertTrue(line["body"].startswith("x" * 64))
+        self.assertTrue(line["body"].endswith("[936 chars truncated]"))
+
+    def test_disabled_levels_are_not_formatted(self):
+        class Exploding:
+            def __str__(self):
+                raise AssertionError("formatted")
+
+        logger, handler = make_logger("lazy", self.stream)
+        logger.debug("Request %s", Exploding(), extra={"event": Exploding()})
+        handler.flush()
+        self.assertEqual(self.stream.getvalue(), "")
+
+    def test_sampling(self):
+        logger, handler = make_logger("sampled", self.stream)
+        draws = iter([0.05, 0.5, 0.05])
+        handler.addFilter(
+            LOG_HELPER.SamplingFilter({logging.INFO: 0.1}, rng=lambda: next(draws))
+        )
+        for i in range(3):
+            logger.info("sampled %s", i)
+        logger.warning("always kept")
+        handler.flush()
+        self.assertEqual(
+            [line["message"] for line in self.lines()],
+            ["sampled 0", "sampled 2", "always kept"],
+        )
+
+    def test_parse_sampling(self):
+        self.assertEqual(
+            LOG_HELPER.parse_sampling("debug=0.01, INFO=0.5"),
+            {logging.DEBUG: 0.01, logging.INFO: 0.5},
+        )
+        self.assertEqual(LOG_HELPER.parse_sampling(None), {})
@@ -0,0 +1,64 @@
+import unittest
+from decimal import Decimal
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from tests.test_commons import MODELS
+
+TABLE_BODY = {"id": 3, "number": 12, "places": 4, "isVip": True, "minOrder": 25.5}
+
+
+class TestModels(unittest.TestCase):
+
+    def test_table_round_trip(self):
+        table = MODELS.Table.from_request(TABLE_BODY)
+        self.assertEqual(MODELS.Table.from_item(table.to_item()), table)
+        self.assertEqual(table.to_dict(), {**TABLE_BODY, "minOrder": Decimal("25.5")})
+
+    def test_items_match_the_resource_layer(self):
+        table = MODELS.Table.from_request(TABLE_BODY)
+        serializer = TypeSerializer()
+        expected = {k: serializer.serialize(v) for k, v in table.to_dict().items()}
+        self.assertEqual(table.to_item(), expected)
+
+        deserializer = TypeDeserializer()
+        item = table.to_item()
+        self.assertEqual(
+            MODELS.Table.from_item(item).to_dict(),
+            {k: deserializer.deserialize(v) for k, v in item.items()},
+        )
+
+    def test_request_values_are_coerced(self):
+        table = MODELS.Table.from_request({**TABLE_BODY, "id": "3", "places": 4.0})
+        self.assertEqual((table.id, table.places), (3, 4))
+
+    def test_invalid_request_values(self):
+        for field, value in (
+            ("id", "three"),
+            ("id", True),
+            ("places", 4.5),
+            ("isVip", "yes"),
+            ("minOrder", None),
+            ("minOrder", "NaN"),
+        ):
+            with self.subTest(field=field, value=value):
+                with self.assertRaises(ValueError):
+                    MODELS.Table.from_request({**TABLE_BODY, field: value})
+
+    def test_missing_request_value(self):
+        body = dict(TABLE_BODY)
+        del body["places"]
+        with self.assertRaises(KeyError):
+            MODELS.Table.from_request(body)
+
+    def test_models_have_no_instance_dict(self):
+        table = MODELS.Table.from_request(TABLE_BODY)
+        with self.assertRaises(AttributeError):
+            table.extra = 1
+
+    def test_slots_must_follow_fields(self):
+        with self.assertRaises(TypeError):
+
+            class Broken(MODELS.Model):
+                FIELDS = {"id": "str"}
+                __slots__ = ("name",)
@@ -0,0 +1,77 @@
+import json
+import unittest
+
+from tests.test_commons import ROUTER
+
+
+class Target:
+    router = ROUTER.Router()
+
+    @router.route("GET", "/tables")
+    def list_tables(self, event):
+        return "list"
+
+    @router.route("GET", "/tables/{tableId}")
+    def get_table(self, event, tableId):
+        return f"table {tableId}"
+
+    @router.route("GET", "/tables/batch")
+    def batch(self, event):
+        return "batch"
+
+    @router.route("DELETE", "/tables/{tableId}/reservations/{reservationId}")
+    def delete_reservation(self, event, tableId, reservationId):
+        return f"{tableId}/{reservationId}"
+
+    @router.route("GET", "/")
+    def root(self, event):
+        return "root"
+
+
+def v1_event(method, path):
+    return {"httpMethod": method, "path": path, "resource": path}
+
+
+def v2_event(method, path):
+    return {"rawPath": path, "requestContext": {"http": {"method": method, "path": path}}}
+
+
+class TestRouter(unittest.TestCase):
+
+    def dispatch(self, method, path, event_factory=v1_event):
+        return Target.router.dispatch(Target(), event_factory(method, path))
+
+    def test_literal_routes(self):
+        self.assertEqual(self.dispatch("GET", "/tables"), "list")
+        self.assertEqual(self.dispatch("GET", "/"), "root")
+        self.assertEqual(self.dispatch("GET", "/tables/"), "list")
+
+    def test_path_params(self):
+        self.assertEqual(self.dispatch("GET", "/tables/7"), "table 7")
+        self.assertEqual(
+            self.dispatch("DELETE", "/tables/7/reservations/abc"), "7/abc"
+        )
+
+    def test_literal_wins_over_param(self):
+        self.assertEqual(self.dispatch("GET", "/tables/batch"), "batch")
+
+    def test_http_api_events(self):
+        self.assertEqual(self.dispatch("GET", "/tables/3", v2_event), "table 3")
+
+    def test_not_found(self):
+        response = self.dispatch("GET", "/chairs")
+        self.assertEqual(response["statusCode"], 404)
+        self.assertIn("/chairs", json.loads(response["body"])["message"])
+
+    def test_method_not_allowed(self):
+        response = self.dispatch("POST", "/tables/7")
+        self.assertEqual(response["statusCode"], 405)
+        self.assertEqual(response["headers"]["Allow"], "GET")
+
+    def test_conflicting_declarations(self):
+        router = ROUTER.Router()
+        router.add("GET", "/tables/{tableId}", print)
+        with self.assertRaises(ValueError):
+            router.add("POST", "/tables/{id}", print)
+        with self.assertRaises(ValueError):
+            router.add("GET", "/tables/{tableId}", print)
@@ -0,0 +1,43 @@
+import json
+import unittest
+from decimal import Decimal
+
+from tests.test_commons import SERIALIZER
+
+
+ITEM = {
+    "id": Decimal("1"),
+    "number": Decimal("12"),
+    "minOrder": Decimal("25.5"),
+    "isVip": True,
+    "tags": [Decimal("1E+2"), "x", None],
+    "nested": {"big": Decimal(2**70)},
+}
+
+EXPECTED = {
+    "id": 1,
+    "number": 12,
+    "minOrder": 25.5,
+    "isVip": True,
+    "tags": [100, "x", None],
+    "nested": {"big": 2**70},
+}
+
+
+class TestSerializer(unittest.TestCase):
+
+    def test_integral_decimals_become_ints(self):
+        body = SERIALIZER.dumps(ITEM)
+        self.assertEqual(json.loads(body), EXPECTED)
+        self.assertIn('"id":1,', body)
+
+    def test_json_backend(self):
+        self.assertEqual(json.loads(SERIALIZER._dumps_json(ITEM)), EXPECTED)
+
+    @unittest.skipIf(SERIALIZER.orjson is None, "orjson is not installed")
+    def test_orjson_backend_matches_json_backend(self):
+        self.assertEqual(SERIALIZER._dumps_orjson(ITEM), SERIALIZER._dumps_json(ITEM))
+
+    def test_unsupported_type(self):
+        with self.assertRaises(TypeError):
+            SERIALIZER.dumps({"value": object()})
@@ -0,0 +1,100 @@
+import base64
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from tests.local_jwks import LocalRsaKey, write_jwks
+from tests.test_commons import TOKEN_VERIFIER
+
+ISSUER = "https://cognito-idp.eu-west-1.amazonaws.com/eu-west-1_test"
+CLIENT_ID = "client-app"
+
+SIGNING_KEY = LocalRsaKey("key-1", seed=1)
+ROTATED_KEY = LocalRsaKey("key-2", seed=2)
+
+
+def id_claims(**overrides):
+    claims = {
+        "sub": "user-1",
+        "email": "user@example.com",
+        "iss": ISSUER,
+        "aud": CLIENT_ID,
+        "token_use": "id",
+        "exp": int(time.time()) + 3600,
+    }
+    claims.update(overrides)
+    return claims
+
+
+class TestTokenVerifier(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.jwks_path = Path(self.directory.name, "jwks.json")
+        url = write_jwks(self.jwks_path, SIGNING_KEY)
+        self.jwks = TOKEN_VERIFIER.JwksCache(url, min_refresh=0)
+        self.verifier = TOKEN_VERIFIER.TokenVerifier(ISSUER, CLIENT_ID, jwks=self.jwks)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def assertUnauthorized(self, token):
+        with self.assertRaises(TOKEN_VERIFIER.ApplicationException) as raised:
+            self.verifier.verify(token)
+        self.assertEqual(raised.exception.code, 401)
+
+    def test_valid_token(self):
+        claims = self.verifier.verify(SIGNING_KEY.sign(id_claims()))
+        self.assertEqual(claims["email"], "user@example.com")
+
+    def test_jwks_fetched_once(self):
+        for _ in range(5):
+            self.verifier.verify(SIGNING_KEY.sign(id_claims()))
+        self.assertEqual(self.jwks.fetches, 1)
+
+    def test_prime_fetches_keys_once(self):
+        self.jwks.prime()
+        self.jwks.prime()
+        self.verifier.verify(SIGNING_KEY.sign(id_claims()))
+        self.assertEqual(self.jwks.fetches, 1)
+
+    def test_tampered_claims(self):
+        header, _, signature = SIGNING_KEY.sign(id_claims()).split(".")
+        forged = SIGNING_KEY.sign(id_claims(sub="admin")).split(".")[1]
+        self.assertUnauthorized(f"{header}.{forged}.{signature}")
+
+    def test_expired(self):
+        self.assertUnauthorized(SIGNING_KEY.sign(id_claims(exp=int(time.time()) - 1)))
+
+    def test_wrong_audience_and_issuer(self):
+        self.assertUnauthorized(SIGNING_KEY.sign(id_claims(aud="other")))
+        self.assertUnauthorized(SIGNING_KEY.sign(id_claims(iss="https://evil")))
+
+    def test_access_token_rejected(self):
+        self.assertUnauthorized(SIGNING_KEY.sign(id_claims(token_use="access")))
+
+    def test_alg_none_rejected(self):
+        self.assertUnauthorized(SIGNING_KEY.sign(id_claims(), header={"alg": "none"}))
+        self.assertUnauthorized("not-a-token")
+        self.assertUnauthorized(None)
+
+    def test_json_that_is_not_an_object(self):
+        # validly signed, so only the shape of the claims can reject it
+        self.assertUnauthorized(SIGNING_KEY.sign(["sub", "user-1"]))
+        self.assertUnauthorized(SIGNING_KEY.sign(1))
+        self.assertUnauthorized(SIGNING_KEY.sign(id_claims(nbf="now")))
+        _, claims, signature = SIGNING_KEY.sign(id_claims()).split(".")
+        header = base64.urlsafe_b64encode(b'["RS256"]').rstrip(b"=").decode()
+        self.assertUnauthorized(f"{header}.{claims}.{signature}")
+
+    def test_rotated_key_triggers_refresh(self):
+        self.verifier.verify(SIGNING_KEY.sign(id_claims()))
+        write_jwks(self.jwks_path, SIGNING_KEY, ROTATED_KEY)
+        self.verifier.verify(ROTATED_KEY.sign(id_claims()))
+        self.assertEqual(self.jwks.fetches, 2)
+
+    def test_authenticate_exposes_claims(self):
+        event = {"headers": {"Authorization": f"Bearer {SIGNING_KEY.sign(id_claims())}"}}
+        self.verifier.authenticate(event)
+        self.assertEqual(event["requestContext"]["authorizer"]["claims"]["sub"], "user-1")